@@ -0,0 +1,322 @@
+"""Command throughput, latency and reconnect benchmark for the coordinator.
+
+Runs the real ``LionelTrainCoordinator`` against a simulated locomotive
+(see ``simulator.py``) and reports:
+
+- throughput: commands/s through ``async_send_command``, sequential and concurrent
+- slider_drag: end-to-end latency of a speed slider drag, from the set call
+  to the decoded status notification updating the coordinator state
+- lock_contention: lock wait and call latency when entities call at once
+- notification_decode: status notifications decoded and published per second
+- connect: cold-connect and reconnect times
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_coordinator.py [--write-latency 0.005] [--output run.json]
+    python benchmarks/bench_coordinator.py --compare baseline.json
+
+The report is JSON; ``--compare`` prints the ratio of every numeric result
+to a previous report so hot-path regressions stand out between runs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from dataclasses import asdict
+import logging
+import math
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import (  # noqa: E402
+    async_create_hass,
+    async_stop_hass,
+    create_coordinator,
+    environment,
+    print_comparison,
+    summarize,
+    write_report,
+)
+from simulator import SimulatedLocomotive, SimulationProfile, simulated_trains  # noqa: E402
+
+from custom_components.lionel_controller.const import (  # noqa: E402
+    CMD_SPEED,
+    build_simple_command,
+)
+
+SCENARIOS = ("throughput", "slider_drag", "lock_contention", "notification_decode", "connect")
+
+# Entities subscribed to a train's updates in a typical setup
+ENTITY_CALLBACKS = 24
+
+_ADDRESS = "AA:BB:CC:00:00:{:02X}"
+
+
+def _create_train(hass, profile: SimulationProfile, index: int = 0, **options: Any):
+    """Return a simulated locomotive and a (not yet connected) coordinator for it."""
+    loco = SimulatedLocomotive(_ADDRESS.format(index), f"LC-Bench {index}", profile, seed=index)
+    coordinator = create_coordinator(hass, loco, **options)
+    return loco, coordinator
+
+
+async def async_bench_throughput(hass, profile: SimulationProfile, args) -> dict[str, Any]:
+    """Measure commands/s through async_send_command."""
+    loco, coordinator = _create_train(hass, profile)
+    commands = [build_simple_command(CMD_SPEED, [i % 32]) for i in range(args.commands)]
+    with simulated_trains(loco):
+        await coordinator.async_ensure_connected()
+
+        # Best of several passes; the first also warms up the code paths
+        sequential = concurrent = math.inf
+        concurrency = args.concurrency
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for command in commands:
+                await coordinator.async_send_command(command)
+            sequential = min(sequential, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                asyncio.gather(*(coordinator.async_send_command(c) for c in commands[i::concurrency]))
+                for i in range(concurrency)
+            ))
+            concurrent = min(concurrent, time.perf_counter() - started)
+        await coordinator.async_shutdown()
+
+    return {
+        "commands": args.commands,
+        "sequential_commands_per_s": round(args.commands / sequential, 1),
+        "sequential_us_per_command": round(sequential / args.commands * 1e6, 1),
+        "concurrency": concurrency,
+        "concurrent_commands_per_s": round(args.commands / concurrent, 1),
+        "failed_commands": coordinator.failed_commands,
+        "write": coordinator.metrics.write.as_dict(),
+    }
+
+
+async def async_bench_slider_drag(hass, profile: SimulationProfile, args) -> dict[str, Any]:
+    """Drag the speed slider up and down at a fixed rate; time each step end to end."""
+    loco, coordinator = _create_train(hass, profile)
+    # Slider positions that map onto distinct raw speed steps, up and back down
+    raw_steps = list(range(1, 32)) + list(range(30, -1, -1))
+    steps = [math.ceil(raw * 100 / 31) for raw in raw_steps]
+    pending: deque[tuple[int, float]] = deque()
+    latencies: list[float] = []
+    missed = 0
+
+    def on_update() -> None:
+        nonlocal missed
+        speed = coordinator.speed
+        if not any(shown == speed for shown, _ in pending):
+            return
+        # Notifications arrive in order; anything queued ahead of a match was lost
+        while pending:
+            shown, called = pending.popleft()
+            if shown == speed:
+                latencies.append((time.perf_counter() - called) * 1000)
+                return
+            missed += 1
+
+    with simulated_trains(loco):
+        await coordinator.async_ensure_connected()
+        coordinator.add_update_callback(on_update)
+        interval = 1 / args.drag_rate
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = []
+        for index, speed in enumerate(steps):
+            if (delay := start + index * interval - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            pending.append((int(int(speed / 100 * 31) / 31 * 100), time.perf_counter()))
+            # Each slider event is its own service call, as from the frontend
+            tasks.append(asyncio.ensure_future(coordinator.async_set_speed(speed)))
+        await asyncio.gather(*tasks)
+        await asyncio.sleep(profile.notify_latency + 0.05)
+        coordinator.remove_update_callback(on_update)
+        await coordinator.async_shutdown()
+
+    return {
+        "steps": len(steps),
+        "rate_hz": args.drag_rate,
+        "end_to_end": summarize(latencies),
+        "unconfirmed_steps": missed + len(pending),
+        "lock_wait": coordinator.metrics.lock_wait.as_dict(),
+    }
+
+
+async def async_bench_lock_contention(hass, profile: SimulationProfile, args) -> dict[str, Any]:
+    """Fire one call from each kind of entity at once, round after round."""
+    loco, coordinator = _create_train(hass, profile)
+    calls: list[float] = []
+
+    async def timed(call) -> None:
+        started = time.perf_counter()
+        await call
+        calls.append((time.perf_counter() - started) * 1000)
+
+    with simulated_trains(loco):
+        await coordinator.async_ensure_connected()
+        started = time.perf_counter()
+        for round_index in range(args.rounds):
+            on = bool(round_index % 2)
+            await asyncio.gather(
+                timed(coordinator.async_set_speed(round_index % 100)),
+                timed(coordinator.async_set_direction(on)),
+                timed(coordinator.async_set_lights(on)),
+                timed(coordinator.async_set_horn(on)),
+                timed(coordinator.async_set_bell(on)),
+                timed(coordinator.async_set_master_volume(round_index % 8)),
+                timed(coordinator.async_set_smoke(on)),
+            )
+        elapsed = time.perf_counter() - started
+        await coordinator.async_shutdown()
+
+    return {
+        "rounds": args.rounds,
+        "calls_per_round": 7,
+        "round_ms": round(elapsed / args.rounds * 1000, 3),
+        "call": summarize(calls),
+        "lock_wait": coordinator.metrics.lock_wait.as_dict(),
+    }
+
+
+async def async_bench_notification_decode(hass, profile: SimulationProfile, args) -> dict[str, Any]:
+    """Push status notifications through the decoder and entity fan-out."""
+    loco, coordinator = _create_train(hass, profile)
+    published = 0
+
+    def on_update() -> None:
+        nonlocal published
+        published += 1
+
+    for _ in range(ENTITY_CALLBACKS):
+        # Distinct callables, as each entity registers its own
+        coordinator.add_update_callback(lambda: on_update())
+    frames = []
+    for raw in range(32):
+        loco.speed = raw
+        loco.forward = raw % 2 == 0
+        loco.bell = raw % 3 == 0
+        frames.append(bytearray(loco.status_frame()))
+    count = args.notifications
+    handler = coordinator._notification_handler
+
+    elapsed = math.inf
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        for index in range(count):
+            await handler(0, frames[index % 32])
+        elapsed = min(elapsed, time.perf_counter() - started)
+
+    return {
+        "notifications": count,
+        "entity_callbacks": ENTITY_CALLBACKS,
+        "frames_per_s": round(count / elapsed, 1),
+        "us_per_frame": round(elapsed / count * 1e6, 2),
+        "callbacks_run": published // args.repeat,
+    }
+
+
+async def async_bench_connect(hass, profile: SimulationProfile, args) -> dict[str, Any]:
+    """Time cold connects of fresh coordinators and reconnects after a dropped link."""
+    cold: list[float] = []
+    reconnect: list[float] = []
+    first_command: list[float] = []
+    for index in range(args.connects):
+        loco, coordinator = _create_train(hass, profile, index)
+        with simulated_trains(loco):
+            started = time.perf_counter()
+            await coordinator.async_ensure_connected()
+            cold.append((time.perf_counter() - started) * 1000)
+            # Non-default settings are replayed on every reconnect
+            await coordinator.async_set_master_volume(3)
+
+            loco.drop_link()
+            await asyncio.sleep(0)
+            started = time.perf_counter()
+            await coordinator.async_ensure_connected()
+            reconnect.append((time.perf_counter() - started) * 1000)
+
+            loco.drop_link()
+            await asyncio.sleep(0)
+            started = time.perf_counter()
+            await coordinator.async_set_speed(25)
+            first_command.append((time.perf_counter() - started) * 1000)
+            await coordinator.async_shutdown()
+
+    return {
+        "connects": args.connects,
+        "simulated_connect_latency_ms": profile.connect_latency * 1000,
+        "cold_connect": summarize(cold),
+        "reconnect": summarize(reconnect),
+        "command_after_drop": summarize(first_command),
+    }
+
+
+BENCHMARKS = {
+    "throughput": async_bench_throughput,
+    "slider_drag": async_bench_slider_drag,
+    "lock_contention": async_bench_lock_contention,
+    "notification_decode": async_bench_notification_decode,
+    "connect": async_bench_connect,
+}
+
+
+async def async_run(args) -> dict[str, Any]:
+    """Run the selected scenarios and return the report."""
+    profile = SimulationProfile(
+        write_latency=args.write_latency,
+        write_jitter=args.write_jitter,
+        notify_latency=args.notify_latency,
+        connect_latency=args.connect_latency,
+    )
+    hass = await async_create_hass()
+    results = {}
+    try:
+        for name in args.scenario or SCENARIOS:
+            results[name] = await BENCHMARKS[name](hass, profile, args)
+    finally:
+        await async_stop_hass(hass)
+    return {
+        "benchmark": "coordinator",
+        "environment": environment(),
+        "profile": asdict(profile),
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run (repeatable; default all)")
+    parser.add_argument("--commands", type=int, default=2000, help="Commands per throughput run")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per rate measurement (best is kept)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent senders")
+    parser.add_argument("--drag-rate", type=float, default=50.0, help="Slider events per second")
+    parser.add_argument("--rounds", type=int, default=200, help="Lock contention rounds")
+    parser.add_argument("--notifications", type=int, default=20000, help="Notifications decoded")
+    parser.add_argument("--connects", type=int, default=20, help="Connect/reconnect cycles")
+    parser.add_argument("--write-latency", type=float, default=0.0, help="Simulated write latency (s)")
+    parser.add_argument("--write-jitter", type=float, default=0.0, help="Extra random write latency (s)")
+    parser.add_argument("--notify-latency", type=float, default=0.002, help="Simulated notification latency (s)")
+    parser.add_argument("--connect-latency", type=float, default=0.05, help="Simulated connect latency (s)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON report to compare this run against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(async_run(args))
+    write_report(report, args.output)
+
+    if args.compare:
+        print_comparison(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
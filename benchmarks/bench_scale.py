@@ -0,0 +1,258 @@
+"""Scale harness: many trains in one Home Assistant instance.
+
+Sets up N config entries against simulated locomotives in a stub core
+(real config entries, registries and entity platforms; Bluetooth replaced
+by the simulator), then drives mixed entity service calls and spontaneous
+status notifications on every train. For each N it reports:
+
+- setup: time to set up all entries and until every train is connected
+- memory per train: bytes allocated by setting up and connecting a train
+- event-loop lag: how late a 10 ms heartbeat wakes up while under load
+- CPU time per command: process CPU over the traffic phase per command sent
+- state writes: state_changed events per second, in total and per train
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_scale.py [--trains 20 50 100] [--duration 10] [--output scale.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import asdict
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import (  # noqa: E402
+    async_add_train_entry,
+    async_create_stub_core,
+    async_stop_hass,
+    environment,
+    print_comparison,
+    summarize,
+    write_report,
+)
+from simulator import SimulatedLocomotive, SimulationProfile, simulated_trains  # noqa: E402
+
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+
+from custom_components.lionel_controller.const import DOMAIN  # noqa: E402
+
+# Heartbeat used to measure event-loop lag
+LAG_INTERVAL = 0.01
+
+# Service calls a train receives, with their relative frequency
+TRAFFIC_MIX = (
+    ("throttle", 55),
+    ("lights", 15),
+    ("direction", 10),
+    ("horn", 10),
+    ("master_volume", 10),
+)
+
+_ADDRESS = "AA:BB:CC:{:02X}:{:02X}:{:02X}"
+
+
+def _entity_ids(hass, entry_id: str, mac: str) -> dict[str, str]:
+    """Map the unique-id suffixes of a train's entities to their entity ids."""
+    registry = er.async_get(hass)
+    return {
+        entry.unique_id[len(mac) + 1:]: entry.entity_id
+        for entry in er.async_entries_for_config_entry(registry, entry_id)
+    }
+
+
+async def _async_call(hass, kind: str, entities: dict[str, str], rng: random.Random) -> None:
+    """Issue one service call of the given kind, as the frontend would."""
+    if kind == "throttle":
+        domain, service, data = "number", "set_value", {
+            "entity_id": entities["throttle"], "value": rng.randrange(0, 101)
+        }
+    elif kind == "lights":
+        domain, service, data = "switch", rng.choice(("turn_on", "turn_off")), {
+            "entity_id": entities["lights"]
+        }
+    elif kind == "direction":
+        domain, service, data = "button", "press", {
+            "entity_id": entities[rng.choice(("forward", "reverse"))]
+        }
+    elif kind == "horn":
+        domain, service, data = "button", "press", {"entity_id": entities["horn"]}
+    else:
+        domain, service, data = "number", "set_value", {
+            "entity_id": entities["master_volume"], "value": rng.randrange(0, 8)
+        }
+    await hass.services.async_call(domain, service, data, blocking=True)
+
+
+async def _async_drive_train(
+    hass, entities: dict[str, str], loco: SimulatedLocomotive, args, stop_at: float, rng: random.Random
+) -> int:
+    """Send commands and notifications for one train until stop_at; return calls made."""
+    loop = asyncio.get_running_loop()
+    kinds = [kind for kind, _ in TRAFFIC_MIX]
+    weights = [weight for _, weight in TRAFFIC_MIX]
+    calls = 0
+    # Stagger trains so they do not all fire on the same tick
+    next_command = loop.time() + rng.uniform(0, 1 / args.command_rate)
+    next_notify = loop.time() + rng.uniform(0, 1 / args.notify_rate)
+    while (now := loop.time()) < stop_at:
+        if now >= next_notify:
+            loco.emit_status()
+            next_notify += 1 / args.notify_rate
+        if now >= next_command:
+            await _async_call(hass, rng.choices(kinds, weights)[0], entities, rng)
+            calls += 1
+            next_command += 1 / args.command_rate
+        await asyncio.sleep(max(0.0, min(next_command, next_notify) - loop.time()))
+    return calls
+
+
+async def _async_measure_lag(samples: list[float], stop_at: float) -> None:
+    """Record how late each heartbeat wakes up (ms)."""
+    loop = asyncio.get_running_loop()
+    while loop.time() < stop_at:
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, (loop.time() - expected) * 1000))
+
+
+async def async_run_scale(count: int, profile: SimulationProfile, args) -> dict[str, Any]:
+    """Set up count trains, load them and return the measurements."""
+    locos = [
+        SimulatedLocomotive(
+            _ADDRESS.format(count, index // 256, index % 256), f"LC Scale {index}", profile, seed=index
+        )
+        for index in range(count)
+    ]
+    hass = await async_create_stub_core()
+    try:
+        with simulated_trains(*locos):
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            entries = [await async_add_train_entry(hass, loco) for loco in locos]
+            await hass.async_block_till_done()
+            setup_s = time.perf_counter() - started
+            coordinators = [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+            while not all(coordinator.connected for coordinator in coordinators):
+                if time.perf_counter() - started > args.connect_timeout:
+                    break
+                await asyncio.sleep(0.01)
+            connected_s = time.perf_counter() - started
+            await hass.async_block_till_done()
+            memory = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+
+            state_writes = 0
+
+            def count_write(event) -> None:
+                nonlocal state_writes
+                state_writes += 1
+
+            unsubscribe = hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+            entities = [
+                _entity_ids(hass, entry.entry_id, loco.address) for entry, loco in zip(entries, locos)
+            ]
+            notifications_before = sum(loco.notifications_sent for loco in locos)
+            lag: list[float] = []
+            loop = asyncio.get_running_loop()
+            stop_at = loop.time() + args.duration
+            cpu_started = time.process_time()
+            wall_started = time.perf_counter()
+            results = await asyncio.gather(
+                _async_measure_lag(lag, stop_at),
+                *(
+                    _async_drive_train(hass, entity_ids, loco, args, stop_at, random.Random(index))
+                    for index, (entity_ids, loco) in enumerate(zip(entities, locos))
+                ),
+            )
+            await hass.async_block_till_done()
+            cpu = time.process_time() - cpu_started
+            wall = time.perf_counter() - wall_started
+            unsubscribe()
+
+            calls = sum(results[1:])
+            commands = sum(coordinator.metrics.frames_sent for coordinator in coordinators)
+            lock_waits = [
+                coordinator.metrics.lock_wait.percentile(0.95) or 0.0 for coordinator in coordinators
+            ]
+            return {
+                "trains": count,
+                "entities": len(hass.states.async_all()),
+                "setup_s": round(setup_s, 3),
+                "all_connected_s": round(connected_s, 3),
+                "connected": sum(coordinator.connected for coordinator in coordinators),
+                "memory_per_train_bytes": memory // count,
+                "duration_s": round(wall, 3),
+                "service_calls": calls,
+                "commands_sent": commands,
+                "failed_commands": sum(coordinator.failed_commands for coordinator in coordinators),
+                "notifications": sum(loco.notifications_sent for loco in locos) - notifications_before,
+                "cpu_utilization": round(cpu / wall, 3),
+                "cpu_ms_per_command": round(cpu / commands * 1000, 3) if commands else None,
+                "state_writes_per_s": round(state_writes / wall, 1),
+                "state_writes_per_train_s": round(state_writes / wall / count, 2),
+                "loop_lag": summarize(lag),
+                "worst_train_lock_wait_p95_ms": max(lock_waits),
+            }
+    finally:
+        await async_stop_hass(hass)
+
+
+async def async_run(args) -> dict[str, Any]:
+    """Run every train count and return the report."""
+    profile = SimulationProfile(
+        write_latency=args.write_latency,
+        write_jitter=args.write_jitter,
+        connect_latency=args.connect_latency,
+    )
+    results = {}
+    for count in args.trains:
+        results[str(count)] = await async_run_scale(count, profile, args)
+    return {
+        "benchmark": "scale",
+        "environment": environment(),
+        "profile": asdict(profile),
+        "traffic": {
+            "command_rate_hz": args.command_rate,
+            "notify_rate_hz": args.notify_rate,
+            "mix": dict(TRAFFIC_MIX),
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the harness."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trains", type=int, nargs="+", default=[20, 50, 100], help="Train counts to run")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of traffic per train count")
+    parser.add_argument("--command-rate", type=float, default=2.0, help="Service calls per second per train")
+    parser.add_argument("--notify-rate", type=float, default=1.0, help="Unsolicited notifications per second per train")
+    parser.add_argument("--write-latency", type=float, default=0.02, help="Simulated write latency (s)")
+    parser.add_argument("--write-jitter", type=float, default=0.01, help="Extra random write latency (s)")
+    parser.add_argument("--connect-latency", type=float, default=0.5, help="Simulated connect latency (s)")
+    parser.add_argument("--connect-timeout", type=float, default=30.0, help="Give up waiting for connections after (s)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON report to compare this run against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(async_run(args))
+    write_report(report, args.output)
+
+    if args.compare:
+        print_comparison(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
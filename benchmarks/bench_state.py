@@ -0,0 +1,151 @@
+"""Memory and attribute-access benchmark for the coordinator state model.
+
+Compares the slotted snapshots in ``state.py`` with the loose instance
+attributes the coordinator used to carry, for N coordinators.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_state.py [--count 100] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.lionel_controller.state import (  # noqa: E402
+    CommandCounters,
+    DeviceDetails,
+    TrainState,
+)
+
+READS_PER_RENDER = ("speed", "direction_forward", "lights_on", "master_volume", "horn_volume")
+
+
+class LegacyCoordinator:
+    """The previous layout: every state field a loose instance attribute."""
+
+    def __init__(self) -> None:
+        self._speed = 0
+        self._direction_forward = True
+        self._lights_on = True
+        self._horn_on = False
+        self._bell_on = False
+        self._master_volume = 5
+        self._horn_volume = 5
+        self._bell_volume = 5
+        self._speech_volume = 5
+        self._engine_volume = 5
+        self._horn_pitch = 0
+        self._bell_pitch = 0
+        self._speech_pitch = 0
+        self._engine_pitch = 0
+        self._smoke_on = False
+        self._model_number = None
+        self._serial_number = None
+        self._firmware_revision = None
+        self._hardware_revision = None
+        self._software_revision = None
+        self._manufacturer_name = None
+        self._connection_attempts = 0
+        self._successful_commands = 0
+        self._failed_commands = 0
+        self._timed_out_commands = 0
+
+    speed = property(lambda self: self._speed)
+    direction_forward = property(lambda self: self._direction_forward)
+    lights_on = property(lambda self: self._lights_on)
+    master_volume = property(lambda self: self._master_volume)
+    horn_volume = property(lambda self: self._horn_volume)
+
+
+class SlottedCoordinator:
+    """The current layout: snapshot objects behind the same properties."""
+
+    def __init__(self) -> None:
+        self._state = TrainState()
+        self._device = DeviceDetails()
+        self._counters = CommandCounters()
+
+    speed = property(lambda self: self._state.speed)
+    direction_forward = property(lambda self: self._state.direction_forward)
+    lights_on = property(lambda self: self._state.lights_on)
+    master_volume = property(lambda self: self._state.master_volume)
+    horn_volume = property(lambda self: self._state.horn_volume)
+
+
+def measure_memory(cls: type, count: int) -> int:
+    """Return the bytes allocated to build count coordinators."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [cls() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del instances
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def measure_reads(cls: type, count: int, repeat: int) -> float:
+    """Return nanoseconds per property read across count coordinators."""
+    instances = [cls() for _ in range(count)]
+
+    def render() -> None:
+        for instance in instances:
+            for name in READS_PER_RENDER:
+                getattr(instance, name)
+
+    best = min(timeit.repeat(render, number=repeat, repeat=5))
+    return best / (repeat * count * len(READS_PER_RENDER)) * 1e9
+
+
+def measure_updates(count: int) -> dict[str, float]:
+    """Return the cost of a snapshot update and of a no-op update."""
+    state = TrainState()
+    changed = min(timeit.repeat(lambda: state.evolve(speed=50), number=count * 100, repeat=5))
+    unchanged = min(timeit.repeat(lambda: state.evolve(speed=0), number=count * 100, repeat=5))
+    return {
+        "evolve_changed_ns": round(changed / (count * 100) * 1e9, 1),
+        "evolve_unchanged_ns": round(unchanged / (count * 100) * 1e9, 1),
+    }
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="Number of coordinators")
+    parser.add_argument("--repeat", type=int, default=1000, help="Renders per timing run")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = {"count": args.count}
+    for label, cls in (("legacy", LegacyCoordinator), ("slotted", SlottedCoordinator)):
+        results[label] = {
+            "bytes_total": measure_memory(cls, args.count),
+            "read_ns": round(measure_reads(cls, args.count, args.repeat), 1),
+        }
+        results[label]["bytes_per_train"] = results[label]["bytes_total"] // args.count
+    results["slotted"].update(measure_updates(args.count))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.count} coordinators")
+    for label in ("legacy", "slotted"):
+        result = results[label]
+        print(
+            f"  {label:8} {result['bytes_per_train']:6d} B/train "
+            f"{result['bytes_total']:8d} B total {result['read_ns']:6.1f} ns/read"
+        )
+    print(
+        f"  snapshot update {results['slotted']['evolve_changed_ns']:.1f} ns, "
+        f"no-op update {results['slotted']['evolve_unchanged_ns']:.1f} ns"
+    )
+
+
+if __name__ == "__main__":
+    main()
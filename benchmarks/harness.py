@@ -0,0 +1,188 @@
+"""Shared plumbing for the benchmarks: Home Assistant cores, coordinators and statistics."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+from typing import Any
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+    floor_registry as fr,
+    issue_registry as ir,
+    label_registry as lr,
+    restore_state as rs,
+    translation,
+)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.lionel_controller import LionelTrainCoordinator  # noqa: E402
+from custom_components.lionel_controller.const import (  # noqa: E402
+    CONF_MAC_ADDRESS,
+    CONF_SERVICE_UUID,
+    DEFAULT_SERVICE_UUID,
+    DOMAIN,
+)
+
+from simulator import SimulatedLocomotive  # noqa: E402
+
+
+async def async_create_hass() -> HomeAssistant:
+    """Return a running Home Assistant core with a throwaway config directory.
+
+    Nothing is set up in it; the coordinators only need the loop, the task
+    helpers and storage.
+    """
+    hass = HomeAssistant(tempfile.mkdtemp(prefix="lionel_bench_"))
+    await hass.async_start()
+    return hass
+
+
+async def async_create_stub_core() -> HomeAssistant:
+    """Return a running core that can set up the integration's config entries.
+
+    The registries, translations and config entries are real; the
+    Bluetooth integration is marked as loaded without starting it (the
+    simulator replaces the lookups the coordinator makes) and the HTTP
+    server is absent, so only the card registration is skipped.
+    """
+    config_dir = tempfile.mkdtemp(prefix="lionel_bench_")
+    os.symlink(
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"),
+        os.path.join(config_dir, "custom_components"),
+    )
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    entity.async_setup(hass)
+    loader.async_setup(hass)
+    translation.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    for registry in (ar, fr, lr, dr, er, ir, rs):
+        await registry.async_load(hass)
+    hass.data[bootstrap.DATA_REGISTRIES_LOADED] = None
+    hass.config.components.add("bluetooth")
+    await hass.async_start()
+    return hass
+
+
+async def async_add_train_entry(
+    hass: HomeAssistant, locomotive: SimulatedLocomotive, **options: Any
+) -> config_entries.ConfigEntry:
+    """Add and set up a config entry for a simulated locomotive."""
+    entry = config_entries.ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=locomotive.name,
+        data={
+            CONF_MAC_ADDRESS: locomotive.address,
+            "name": locomotive.name,
+            CONF_SERVICE_UUID: DEFAULT_SERVICE_UUID,
+        },
+        source=config_entries.SOURCE_USER,
+        options=options,
+        unique_id=locomotive.address,
+    )
+    await hass.config_entries.async_add(entry)
+    return entry
+
+
+async def async_stop_hass(hass: HomeAssistant) -> None:
+    """Unload any train entries and stop a core created here."""
+    if hass.config_entries is not None:
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop(force=True)
+
+
+def create_coordinator(
+    hass: HomeAssistant, locomotive: SimulatedLocomotive, **options: Any
+) -> LionelTrainCoordinator:
+    """Return a coordinator for a simulated locomotive, without auto-reconnect.
+
+    The reconnect loop waits seconds between attempts; the benchmarks
+    reconnect explicitly so that wait does not end up in the numbers.
+    """
+    coordinator = LionelTrainCoordinator(
+        hass, locomotive.address, locomotive.name, DEFAULT_SERVICE_UUID, **options
+    )
+    coordinator.set_auto_reconnect(False)
+    return coordinator
+
+
+def summarize(samples_ms: list[float]) -> dict[str, Any]:
+    """Return exact order statistics of latency samples (ms)."""
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[max(0, math.ceil(fraction * len(ordered)) - 1)], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def environment() -> dict[str, str]:
+    """Describe the machine and versions a run was made with."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "homeassistant": HA_VERSION,
+    }
+
+
+def write_report(report: dict[str, Any], path: str | None) -> None:
+    """Write a JSON report to a file, or to stdout if no path is given."""
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path is None:
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text + "\n")
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any]) -> list[tuple[str, float, float]]:
+    """Return (path, baseline, current) for every numeric result present in both runs."""
+    rows: list[tuple[str, float, float]] = []
+
+    def walk(old: Any, new: Any, path: str) -> None:
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in sorted(old.keys() & new.keys()):
+                walk(old[key], new[key], f"{path}.{key}" if path else key)
+        elif (
+            isinstance(old, (int, float)) and isinstance(new, (int, float))
+            and not isinstance(old, bool) and not isinstance(new, bool)
+        ):
+            rows.append((path, float(old), float(new)))
+
+    walk(baseline.get("results", {}), current.get("results", {}), "")
+    return rows
+
+
+def print_comparison(baseline_path: str, report: dict[str, Any]) -> None:
+    """Print every numeric result next to a previous report's, with the ratio, to stderr."""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    for path, old, new in compare_reports(baseline, report):
+        ratio = f"{new / old:6.2f}x" if old else "     -"
+        print(f"{path:60} {old:12.3f} {new:12.3f} {ratio}", file=sys.stderr)
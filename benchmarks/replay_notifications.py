@@ -0,0 +1,302 @@
+"""Replay captured notifications through the coordinator's decoder.
+
+Feeds a capture of LionChief notifications through the real notification
+handler and state pipeline (snapshot update, entity fan-out, state save
+scheduling), checks the decoded state and reports frames/s and memory
+allocated per frame. Use it to check a change to ``_notification_handler``
+against real traffic without a locomotive.
+
+Capture formats, picked by content:
+
+- hex text: one frame per line, ``[timestamp] hex [field=value ...]``.
+  The timestamp is seconds (float) or ISO 8601 and may be omitted. Any
+  ``field=value`` pairs are expected ``TrainState`` values after that
+  frame, e.g. ``0.250 0081021001030c04 speed=51 lights_on=true``.
+  ``#`` starts a comment.
+- binary: the session format of ``recording.py`` (``.lcs``).
+- a diagnostics download: the received (rx) frames of ``recent_frames``.
+
+Every status frame is also checked against a reference decoding of the
+protocol, so a capture needs no annotations to catch a decoder regression.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/replay_notifications.py capture.txt [--realtime [--rate 2]] [--repeat 100]
+
+The report is JSON; the exit status is 1 if any decoded state differs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import (  # noqa: E402
+    async_create_hass,
+    async_stop_hass,
+    create_coordinator,
+    environment,
+    write_report,
+)
+from simulator import SimulatedLocomotive  # noqa: E402
+
+from custom_components.lionel_controller.recording import SESSION_MAGIC, decode_session  # noqa: E402
+from custom_components.lionel_controller.state import TrainState  # noqa: E402
+
+# Entities subscribed to a train's updates in a typical setup
+ENTITY_CALLBACKS = 24
+
+# Report at most this many mismatches in full
+MAX_MISMATCHES = 50
+
+_STATE_FIELDS = {name: type(getattr(TrainState(), name)) for name in TrainState.__slots__}
+
+
+@dataclass(slots=True)
+class CapturedFrame:
+    """One notification of a capture, with the state expected after it."""
+
+    offset: float | None
+    data: bytes
+    expect: dict[str, Any] = field(default_factory=dict)
+    line: int | None = None
+
+
+def reference_decode(data: bytes) -> dict[str, Any] | None:
+    """Decode a status notification as the protocol documents it, independently of the handler."""
+    if len(data) < 8 or data[:3] != b"\x00\x81\x02":
+        return None
+    return {
+        "speed": data[3] * 100 // 31,
+        "direction_forward": data[4] == 0x01,
+        "lights_on": bool(data[7] & 0x04),
+        "bell_on": bool(data[7] & 0x02),
+    }
+
+
+def _parse_value(name: str, text: str) -> Any:
+    """Parse an expected field value from a capture annotation."""
+    if name not in _STATE_FIELDS:
+        raise ValueError(f"Unknown state field {name!r}")
+    if _STATE_FIELDS[name] is bool:
+        if text.lower() not in ("true", "false", "on", "off", "1", "0"):
+            raise ValueError(f"Expected a boolean for {name}, got {text!r}")
+        return text.lower() in ("true", "on", "1")
+    return int(text)
+
+
+def _parse_time(text: str) -> float | None:
+    """Return a timestamp in seconds, or None if text is not one."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_hex_capture(text: str) -> list[CapturedFrame]:
+    """Parse a hex text capture."""
+    frames: list[CapturedFrame] = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        tokens = raw.split("#", 1)[0].split()
+        if not tokens:
+            continue
+        offset = None
+        if len(tokens) > 1 and "=" not in tokens[1] and (offset := _parse_time(tokens[0])) is not None:
+            tokens = tokens[1:]
+        try:
+            data = bytes.fromhex(tokens[0])
+            expect = {
+                name: _parse_value(name, value)
+                for name, value in (token.split("=", 1) for token in tokens[1:])
+            }
+        except ValueError as err:
+            raise ValueError(f"line {number}: {err}") from err
+        frames.append(CapturedFrame(offset, data, expect, number))
+    return frames
+
+
+def parse_diagnostics(data: dict[str, Any]) -> list[CapturedFrame]:
+    """Take the received frames from a diagnostics download."""
+    payload = data.get("data", data)
+    return [
+        CapturedFrame(_parse_time(entry["time"]), bytes.fromhex(entry["frame"]))
+        for entry in payload.get("recent_frames", [])
+        if entry.get("direction") == "rx"
+    ]
+
+
+def load_capture(path: str) -> list[CapturedFrame]:
+    """Load a capture in any supported format, with offsets relative to its first frame."""
+    with open(path, "rb") as file:
+        raw = file.read()
+    if raw.startswith(SESSION_MAGIC):
+        frames = [CapturedFrame(offset, data) for offset, data in decode_session(raw)]
+    elif raw.lstrip().startswith(b"{"):
+        frames = parse_diagnostics(json.loads(raw))
+    else:
+        frames = parse_hex_capture(raw.decode("utf-8"))
+
+    first = next((frame.offset for frame in frames if frame.offset is not None), None)
+    for frame in frames:
+        frame.offset = None if frame.offset is None or first is None else frame.offset - first
+    return frames
+
+
+async def async_replay(coordinator, frames: list[CapturedFrame], realtime: bool, rate: float) -> dict[str, Any]:
+    """Feed frames through the handler once, checking state after each one."""
+    handler = coordinator._notification_handler
+    mismatches: list[dict[str, Any]] = []
+    mismatch_count = 0
+    checked = 0
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    for index, frame in enumerate(frames):
+        if realtime and frame.offset is not None:
+            if (delay := start + frame.offset / rate - loop.time()) > 0:
+                await asyncio.sleep(delay)
+        await handler(0, bytearray(frame.data))
+
+        expected = reference_decode(frame.data) or {}
+        expected.update(frame.expect)
+        if not expected:
+            continue
+        checked += 1
+        state = coordinator.state
+        for name, value in expected.items():
+            if (actual := getattr(state, name)) != value:
+                mismatch_count += 1
+                if len(mismatches) < MAX_MISMATCHES:
+                    mismatches.append({
+                        "frame": index,
+                        "line": frame.line,
+                        "data": frame.data.hex(),
+                        "field": name,
+                        "expected": value,
+                        "actual": actual,
+                    })
+
+    return {
+        "checked_frames": checked,
+        "mismatch_count": mismatch_count,
+        "mismatches": mismatches,
+        "elapsed_s": round(loop.time() - start, 3),
+    }
+
+
+async def async_measure_speed(coordinator, frames: list[CapturedFrame], repeat: int) -> dict[str, Any]:
+    """Return frames/s through the handler, as fast as possible."""
+    handler = coordinator._notification_handler
+    payloads = [bytearray(frame.data) for frame in frames]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            await handler(0, payload)
+    elapsed = time.perf_counter() - started
+    count = len(payloads) * repeat
+    return {
+        "frames": count,
+        "frames_per_s": round(count / elapsed, 1),
+        "us_per_frame": round(elapsed / count * 1e6, 2),
+    }
+
+
+async def async_measure_allocations(coordinator, frames: list[CapturedFrame]) -> dict[str, Any]:
+    """Return the memory allocated while handling each frame, traced separately.
+
+    ``transient`` is the peak above the starting point within a frame
+    (what the frame allocated, including what was freed again);
+    ``retained`` is what was still held once all frames were handled.
+    """
+    handler = coordinator._notification_handler
+    payloads = [bytearray(frame.data) for frame in frames]
+    transient = 0
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for payload in payloads:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await handler(0, payload)
+        transient += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return {
+        "transient_bytes_per_frame": round(transient / len(payloads), 1),
+        "retained_bytes_per_frame": round(retained / len(payloads), 1),
+    }
+
+
+async def async_run(args) -> dict[str, Any]:
+    """Replay the capture and return the report."""
+    frames = load_capture(args.capture)
+    if not frames:
+        raise SystemExit(f"{args.capture}: no frames")
+    hass = await async_create_hass()
+    try:
+        results = {}
+        for phase in ("verify", "speed", "allocations"):
+            # A fresh coordinator per phase, so each starts from the same state
+            loco = SimulatedLocomotive("AA:BB:CC:00:00:00", "LC Replay")
+            coordinator = create_coordinator(hass, loco)
+            for _ in range(args.entities):
+                coordinator.add_update_callback(lambda: None)
+            if phase == "verify":
+                results[phase] = await async_replay(coordinator, frames, args.realtime, args.rate)
+            elif phase == "speed":
+                results[phase] = await async_measure_speed(coordinator, frames, args.repeat)
+            else:
+                results[phase] = await async_measure_allocations(coordinator, frames)
+    finally:
+        await async_stop_hass(hass)
+
+    status = [frame for frame in frames if reference_decode(frame.data)]
+    timed = [frame.offset for frame in frames if frame.offset is not None]
+    return {
+        "benchmark": "notification_replay",
+        "environment": environment(),
+        "capture": {
+            "path": args.capture,
+            "frames": len(frames),
+            "status_frames": len(status),
+            "annotated_frames": sum(1 for frame in frames if frame.expect),
+            "recorded_s": round(max(timed), 3) if timed else None,
+        },
+        "mode": {"realtime": args.realtime, "rate": args.rate, "entity_callbacks": args.entities},
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="Capture file (hex text, .lcs session or diagnostics JSON)")
+    parser.add_argument("--realtime", action="store_true", help="Verify at the recorded timing")
+    parser.add_argument("--rate", type=float, default=1.0, help="Speed-up of --realtime replay")
+    parser.add_argument("--repeat", type=int, default=100, help="Passes over the capture for frames/s")
+    parser.add_argument("--entities", type=int, default=ENTITY_CALLBACKS, help="Update callbacks registered")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(async_run(args))
+    write_report(report, args.output)
+    if report["results"]["verify"]["mismatch_count"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""Simulated LionChief locomotive for offline tests and benchmarks.
+
+The simulator stands in for the Bluetooth link only: it is patched in
+behind ``establish_connection``, ``bluetooth.async_ble_device_from_address``
+and ``bluetooth.async_register_callback`` so the real coordinator, entities
+and services run unchanged against it.
+
+    train = SimulatedLocomotive("AA:BB:CC:DD:EE:01", profile=SimulationProfile(write_latency=0.01))
+    with simulated_trains(train):
+        ...  # set up a config entry for the train's address as usual
+
+The locomotive applies frames written to the LionChief command
+characteristic, answers with ``00 81 02`` status notifications, serves the
+Device Information characteristics and can be told to lose or reject
+writes, drop the link and advertise at a given interval.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import inspect
+import os
+import random
+import sys
+import time
+from typing import Any
+from unittest.mock import patch
+
+from bleak import BleakError
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+from homeassistant.components.bluetooth import BluetoothChange, BluetoothServiceInfoBleak
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.lionel_controller.const import (  # noqa: E402
+    CMD_BELL,
+    CMD_DIRECTION,
+    CMD_DISCONNECT,
+    CMD_HORN,
+    CMD_LIGHTS,
+    CMD_MASTER_VOLUME,
+    CMD_SMOKE,
+    CMD_SOUND_VOLUME,
+    CMD_SPEED,
+    DEVICE_INFO_SERVICE_UUID,
+    DIRECTION_FORWARD,
+    FIRMWARE_REVISION_CHAR_UUID,
+    HARDWARE_REVISION_CHAR_UUID,
+    LIONCHIEF_SERVICE_UUID,
+    MANUFACTURER_NAME_CHAR_UUID,
+    MODEL_NUMBER_CHAR_UUID,
+    NOTIFY_CHARACTERISTIC_UUID,
+    SERIAL_NUMBER_CHAR_UUID,
+    SOFTWARE_REVISION_CHAR_UUID,
+    WRITE_CHARACTERISTIC_UUID,
+)
+
+# Module the coordinator looks its Bluetooth helpers up in
+COORDINATOR_MODULE = "custom_components.lionel_controller"
+
+# Status notification: header, speed (0-31), direction, two constant bytes, flags
+STATUS_HEADER = bytes((0x00, 0x81, 0x02))
+STATUS_FLAG_BELL = 0x02
+STATUS_FLAG_LIGHTS = 0x04
+
+# Most recent frames kept per locomotive for assertions
+FRAME_LOG_SIZE = 1000
+
+
+@dataclass(slots=True)
+class SimulationProfile:
+    """Timing and fault behaviour of a simulated locomotive (seconds, 0-1 rates)."""
+
+    write_latency: float = 0.005
+    write_jitter: float = 0.0
+    notify_latency: float = 0.002
+    connect_latency: float = 0.05
+    # Frames silently lost over the air (write succeeds, nothing happens)
+    loss_rate: float = 0.0
+    # Writes rejected with a BleakError
+    error_rate: float = 0.0
+    connect_failure_rate: float = 0.0
+    # Drop the link after this many writes on one connection
+    disconnect_after: int | None = None
+    advertisement_interval: float = 0.1
+    # Time from power-on until the first advertisement is heard
+    first_advertisement_delay: float = 0.0
+    rssi: int = -60
+    rssi_noise: float = 0.0
+
+
+class _Characteristic:
+    """The parts of a GATT characteristic the coordinator inspects."""
+
+    __slots__ = ("uuid", "description", "properties", "handle")
+
+    def __init__(self, uuid: str, description: str, properties: list[str], handle: int) -> None:
+        self.uuid = uuid
+        self.description = description
+        self.properties = properties
+        self.handle = handle
+
+
+class _Service:
+    """The parts of a GATT service the coordinator inspects."""
+
+    __slots__ = ("uuid", "description", "characteristics")
+
+    def __init__(self, uuid: str, description: str, characteristics: list[_Characteristic]) -> None:
+        self.uuid = uuid
+        self.description = description
+        self.characteristics = characteristics
+
+
+class SimulatedLocomotive:
+    """A LionChief locomotive: its state, GATT table and radio behaviour."""
+
+    def __init__(
+        self,
+        address: str,
+        name: str = "LC-Sim",
+        profile: SimulationProfile | None = None,
+        *,
+        seed: int | None = None,
+    ) -> None:
+        """Create a powered-on locomotive at rest, lights on."""
+        self.address = address
+        self.name = name
+        self.profile = profile or SimulationProfile()
+        self.random = random.Random(seed)
+        self.device_info = {
+            MODEL_NUMBER_CHAR_UUID: b"LC-SIM-2",
+            SERIAL_NUMBER_CHAR_UUID: address.replace(":", "").encode(),
+            FIRMWARE_REVISION_CHAR_UUID: b"1.07",
+            HARDWARE_REVISION_CHAR_UUID: b"B",
+            SOFTWARE_REVISION_CHAR_UUID: b"2.3",
+            MANUFACTURER_NAME_CHAR_UUID: b"Lionel LLC",
+        }
+        self.services = [
+            _Service(LIONCHIEF_SERVICE_UUID, "LionChief", [
+                _Characteristic(WRITE_CHARACTERISTIC_UUID, "LionelCommand", ["write-without-response", "write"], 11),
+                _Characteristic(NOTIFY_CHARACTERISTIC_UUID, "LionelData", ["notify"], 13),
+            ]),
+            _Service(DEVICE_INFO_SERVICE_UUID, "Device Information", [
+                _Characteristic(uuid, "Device Information", ["read"], 20 + index)
+                for index, uuid in enumerate(self.device_info)
+            ]),
+        ]
+        self.ble_device = BLEDevice(address, name, None)
+
+        # Locomotive state as the hardware holds it
+        self.speed = 0
+        self.forward = True
+        self.lights = True
+        self.bell = False
+        self.horn = False
+        self.smoke = False
+        self.master_volume = 5
+        self.sound_volumes: dict[int, tuple[int, ...]] = {}
+
+        # Radio and link bookkeeping
+        self.powered = True
+        self._powered_at = time.monotonic()
+        self.client: SimulatedClient | None = None
+        self.frames: deque[bytes] = deque(maxlen=FRAME_LOG_SIZE)
+        self.writes = 0
+        self.lost_frames = 0
+        self.rejected_writes = 0
+        self.notifications_sent = 0
+        self.connections = 0
+        self.disconnections = 0
+
+    @property
+    def visible(self) -> bool:
+        """Return True once the powered locomotive has been heard advertising."""
+        return self.powered and (
+            time.monotonic() - self._powered_at >= self.profile.first_advertisement_delay
+        )
+
+    def power_off(self) -> None:
+        """Cut power: the link drops and advertising stops."""
+        self.powered = False
+        self.drop_link()
+
+    def power_on(self) -> None:
+        """Restore power; the locomotive starts from its power-on defaults."""
+        self.powered = True
+        self._powered_at = time.monotonic()
+        self.speed = 0
+        self.forward = True
+        self.lights = True
+        self.bell = self.horn = self.smoke = False
+
+    def status_frame(self) -> bytes:
+        """Return the status notification for the current state."""
+        flags = (STATUS_FLAG_LIGHTS if self.lights else 0) | (STATUS_FLAG_BELL if self.bell else 0)
+        return STATUS_HEADER + bytes((
+            self.speed,
+            DIRECTION_FORWARD if self.forward else 0x02,
+            0x03,
+            0x0C,
+            flags,
+        ))
+
+    def apply(self, frame: bytes) -> bool:
+        """Apply a command frame; return True if the reported status changed."""
+        self.frames.append(frame)
+        if len(frame) < 2 or frame[0] != 0x00:
+            return False
+        before = (self.speed, self.forward, self.lights, self.bell)
+        code, params = frame[1], frame[2:]
+        if code == CMD_SPEED and params:
+            self.speed = min(params[0], 31)
+        elif code == CMD_DIRECTION and params:
+            self.forward = params[0] == DIRECTION_FORWARD
+        elif code == CMD_LIGHTS and params:
+            self.lights = bool(params[0])
+        elif code == CMD_BELL and params:
+            self.bell = bool(params[0])
+        elif code == CMD_HORN and params:
+            self.horn = bool(params[0])
+        elif code == CMD_SMOKE and params:
+            self.smoke = bool(params[0])
+        elif code == CMD_MASTER_VOLUME and params:
+            self.master_volume = params[0]
+        elif code == CMD_SOUND_VOLUME and len(params) >= 2:
+            self.sound_volumes[params[0]] = tuple(params[1:])
+        elif code == CMD_DISCONNECT:
+            # The locomotive closes the link itself after acknowledging
+            asyncio.get_running_loop().call_soon(self.drop_link)
+        return (self.speed, self.forward, self.lights, self.bell) != before
+
+    def emit_status(self) -> None:
+        """Send a status notification to the connected client, if subscribed."""
+        if self.client is not None:
+            self.client.notify(self.status_frame())
+
+    def drop_link(self) -> None:
+        """Drop the current connection as a radio dropout would."""
+        if (client := self.client) is not None:
+            self.client = None
+            self.disconnections += 1
+            client.lost()
+
+    async def async_connect(
+        self, disconnected_callback: Callable[[Any], None] | None
+    ) -> SimulatedClient:
+        """Accept a connection, replacing any existing one."""
+        await asyncio.sleep(self.profile.connect_latency)
+        if not self.powered:
+            raise BleakError(f"{self.address}: device not found")
+        if self.random.random() < self.profile.connect_failure_rate:
+            raise BleakError(f"{self.address}: simulated connection failure")
+        if self.client is not None:
+            # The previous client is stale; the coordinator has already moved on
+            self.client.lost(notify=False)
+        self.client = SimulatedClient(self, disconnected_callback)
+        self.connections += 1
+        return self.client
+
+    def service_info(self) -> BluetoothServiceInfoBleak:
+        """Return the advertisement as Home Assistant's Bluetooth stack reports it."""
+        rssi = round(self.profile.rssi + self.random.gauss(0, self.profile.rssi_noise))
+        return BluetoothServiceInfoBleak(
+            name=self.name,
+            address=self.address,
+            rssi=rssi,
+            manufacturer_data={},
+            service_data={},
+            service_uuids=[LIONCHIEF_SERVICE_UUID],
+            source="simulator",
+            device=self.ble_device,
+            advertisement=AdvertisementData(
+                local_name=self.name,
+                manufacturer_data={},
+                service_data={},
+                service_uuids=[LIONCHIEF_SERVICE_UUID],
+                tx_power=None,
+                rssi=rssi,
+                platform_data=(),
+            ),
+            connectable=True,
+            time=time.monotonic(),
+            tx_power=None,
+        )
+
+    async def async_advertise(self, callback: Callable[[BluetoothServiceInfoBleak], None]) -> None:
+        """Call ``callback`` with an advertisement every interval while powered.
+
+        Runs until cancelled. Like real firmware the locomotive is silent
+        while a client is connected.
+        """
+        while True:
+            interval = self.profile.advertisement_interval
+            await asyncio.sleep(interval * self.random.uniform(0.9, 1.1))
+            if self.visible and self.client is None:
+                callback(self.service_info())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters for benchmark reports."""
+        return {
+            "writes": self.writes,
+            "lost_frames": self.lost_frames,
+            "rejected_writes": self.rejected_writes,
+            "notifications_sent": self.notifications_sent,
+            "connections": self.connections,
+            "disconnections": self.disconnections,
+        }
+
+
+class SimulatedClient:
+    """One connection to a simulated locomotive, shaped like a Bleak client."""
+
+    def __init__(
+        self,
+        locomotive: SimulatedLocomotive,
+        disconnected_callback: Callable[[Any], None] | None,
+    ) -> None:
+        """Open the connection."""
+        self._locomotive = locomotive
+        self._disconnected_callback = disconnected_callback
+        self._notify_callback: Callable[[Any, bytearray], Any] | None = None
+        self._notify_char = locomotive.services[0].characteristics[1]
+        self._tasks: set[asyncio.Task] = set()
+        self._writes = 0
+        self.is_connected = True
+        self.services = locomotive.services
+        self.address = locomotive.address
+
+    async def write_gatt_char(self, char_uuid: Any, data: bytes, response: bool | None = None) -> None:
+        """Deliver a frame after the configured latency."""
+        loco = self._locomotive
+        profile = loco.profile
+        if not self.is_connected:
+            raise BleakError("Not connected")
+        if str(char_uuid).lower() != WRITE_CHARACTERISTIC_UUID:
+            raise BleakError(f"Characteristic {char_uuid} is not writable")
+        delay = profile.write_latency
+        if profile.write_jitter:
+            delay += loco.random.uniform(0, profile.write_jitter)
+        await asyncio.sleep(delay)
+        if not self.is_connected:
+            raise BleakError("Disconnected during write")
+
+        self._writes += 1
+        loco.writes += 1
+        if profile.disconnect_after is not None and self._writes > profile.disconnect_after:
+            loco.drop_link()
+            raise BleakError("Disconnected during write")
+        if loco.random.random() < profile.error_rate:
+            loco.rejected_writes += 1
+            raise BleakError("Simulated write error")
+        if loco.random.random() < profile.loss_rate:
+            loco.lost_frames += 1
+            return
+        if loco.apply(bytes(data)):
+            asyncio.get_running_loop().call_later(
+                profile.notify_latency, self.notify, loco.status_frame()
+            )
+
+    async def read_gatt_char(self, char_uuid: Any) -> bytearray:
+        """Return a Device Information value."""
+        if not self.is_connected:
+            raise BleakError("Not connected")
+        if (value := self._locomotive.device_info.get(str(char_uuid).lower())) is None:
+            raise BleakError(f"Characteristic {char_uuid} is not readable")
+        return bytearray(value)
+
+    async def start_notify(self, char_uuid: Any, callback: Callable[[Any, bytearray], Any], **kwargs: Any) -> None:
+        """Subscribe to status notifications."""
+        if str(char_uuid).lower() != NOTIFY_CHARACTERISTIC_UUID:
+            raise BleakError(f"Characteristic {char_uuid} does not notify")
+        self._notify_callback = callback
+
+    async def stop_notify(self, char_uuid: Any) -> None:
+        """Unsubscribe from status notifications."""
+        self._notify_callback = None
+
+    def notify(self, frame: bytes) -> None:
+        """Deliver a notification the way Bleak does, awaiting coroutine handlers."""
+        if not self.is_connected or self._notify_callback is None:
+            return
+        self._locomotive.notifications_sent += 1
+        result = self._notify_callback(self._notify_char, bytearray(frame))
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def disconnect(self) -> bool:
+        """Close the connection from the client side."""
+        if self._locomotive.client is self:
+            self._locomotive.client = None
+            self._locomotive.disconnections += 1
+        self.lost()
+        return True
+
+    def lost(self, notify: bool = True) -> None:
+        """Mark the connection closed and tell the owner."""
+        if not self.is_connected:
+            return
+        self.is_connected = False
+        self._notify_callback = None
+        if notify and self._disconnected_callback is not None:
+            asyncio.get_running_loop().call_soon(self._disconnected_callback, self)
+
+
+@contextmanager
+def simulated_trains(*locomotives: SimulatedLocomotive) -> Iterator[dict[str, SimulatedLocomotive]]:
+    """Route the coordinator's Bluetooth lookups, connections and advertisements to simulators.
+
+    Addresses that are not simulated fall through to Home Assistant's
+    Bluetooth stack.
+    """
+    by_address = {loco.address.upper(): loco for loco in locomotives}
+    module = sys.modules.get(COORDINATOR_MODULE) or __import__(COORDINATOR_MODULE, fromlist=["_"])
+    real_lookup = module.bluetooth.async_ble_device_from_address
+    real_establish = module.establish_connection
+    real_register = module.bluetooth.async_register_callback
+
+    def lookup(hass: Any, address: str, connectable: bool = True) -> BLEDevice | None:
+        if (loco := by_address.get(address.upper())) is None:
+            return real_lookup(hass, address, connectable)
+        return loco.ble_device if loco.visible else None
+
+    async def establish(
+        client_class: type,
+        device: BLEDevice,
+        name: str,
+        disconnected_callback: Callable[[Any], None] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        if (loco := by_address.get(device.address.upper())) is None:
+            return await real_establish(
+                client_class, device, name, disconnected_callback, **kwargs
+            )
+        return await loco.async_connect(disconnected_callback)
+
+    def register(hass: Any, callback: Callable[..., None], matcher: Any, mode: Any) -> Callable[[], None]:
+        address = (matcher or {}).get("address") or ""
+        if (loco := by_address.get(address.upper())) is None:
+            return real_register(hass, callback, matcher, mode)
+        task = hass.async_create_background_task(
+            loco.async_advertise(lambda info: callback(info, BluetoothChange.ADVERTISEMENT)),
+            f"simulated advertisements {loco.address}",
+        )
+        return task.cancel
+
+    with patch.object(module, "establish_connection", establish), patch.object(
+        module.bluetooth, "async_ble_device_from_address", lookup
+    ), patch.object(module.bluetooth, "async_register_callback", register):
+        yield by_address
@@ -2,44 +2,98 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
+from collections.abc import Coroutine
+from dataclasses import replace
+from datetime import datetime, timedelta
 import logging
+import time
 from typing import Any
 
 from bleak import BleakClient, BleakError
 from bleak_retry_connector import establish_connection, BleakClientWithServiceCache
 from homeassistant.components import bluetooth
-from homeassistant.components.bluetooth import BluetoothServiceInfoBleak, BluetoothChange
+from homeassistant.components.bluetooth import (
+    MONOTONIC_TIME,
+    BluetoothChange,
+    BluetoothServiceInfoBleak,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, Platform
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 
 from .const import (
+    AVAILABILITY_POLL_INTERVAL,
+    AVAILABILITY_RETRY_INTERVAL,
+    CMD_BELL,
+    CMD_DISCONNECT,
+    CMD_HORN,
+    CMD_LIGHTS,
     CMD_MASTER_VOLUME,
     CMD_SMOKE,
     CMD_SOUND_VOLUME,
+    CONF_COMMAND_TIMEOUT,
+    CONF_LOG_SAMPLE_RATE,
     CONF_MAC_ADDRESS,
+    CONF_QUEUE_OFFLINE,
+    CONF_QUEUE_TTL,
+    CONF_RETRY_COUNT,
     CONF_SERVICE_UUID,
+    CONF_TRACE_COMMANDS,
+    CONNECTION_HISTORY_SIZE,
+    DATA_CONSISTS,
+    DATA_DEVICE_INDEX,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_PITCH,
+    DEFAULT_QUEUE_TTL,
     DEFAULT_RETRY_COUNT,
     DEFAULT_TIMEOUT,
+    DEFAULT_VOLUME,
     DEVICE_INFO_SERVICE_UUID,
     DOMAIN,
     FIRMWARE_REVISION_CHAR_UUID,
+    FRAME_HISTORY_SIZE,
+    LOG_SUMMARY_INTERVAL,
     HARDWARE_REVISION_CHAR_UUID,
     LIONCHIEF_SERVICE_UUID,
     MANUFACTURER_NAME_CHAR_UUID,
     MODEL_NUMBER_CHAR_UUID,
     NOTIFY_CHARACTERISTIC_UUID,
+    PRESENCE_CHECK_INTERVAL,
     SERIAL_NUMBER_CHAR_UUID,
     SOFTWARE_REVISION_CHAR_UUID,
     SOUND_SOURCE_BELL,
     SOUND_SOURCE_ENGINE,
     SOUND_SOURCE_HORN,
     SOUND_SOURCE_SPEECH,
+    STATE_SAVE_DELAY,
+    STORAGE_VERSION,
     WRITE_CHARACTERISTIC_UUID,
     build_command,
     build_simple_command,
 )
+from .command_log import CommandLogSummary
+from .command_queue import PendingCommandQueue, command_kind
+from .discovery import DiscoveryIndex, async_hold_discovery_index
+from .presence import AdvertisementTracker
+from .metrics import TrainMetrics
+from .recording import DEFAULT_WRITE_INTERVAL, SessionFrame, SessionRecorder, async_replay_frames
+from .sequence import Frame, async_play_frames
+from .state import (
+    DEVICE_DETAIL_FIELDS,
+    PERSISTED_STATE_FIELDS,
+    SOUND_SOURCE_FIELDS,
+    CommandCounters,
+    DeviceDetails,
+    TrainState,
+    command_state_changes,
+)
+from .tracing import CommandTracer, trace_mark
+from .services import async_register_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,134 +118,95 @@ def _async_discovered_device(
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Lionel Train Controller from a config entry."""
+    setup_started = time.perf_counter()
     mac_address = entry.data[CONF_MAC_ADDRESS]
     name = entry.data[CONF_NAME]
     service_uuid = entry.data[CONF_SERVICE_UUID]
 
-    coordinator = LionelTrainCoordinator(hass, mac_address, name, service_uuid)
-    
-    # Don't require initial connection - allow integration to load even if locomotive is off
-    try:
-        await coordinator.async_setup()
-        _LOGGER.info("Successfully connected to Lionel train at %s", mac_address)
-    except (BleakError, asyncio.TimeoutError) as err:
-        _LOGGER.warning("Could not connect to Lionel train at %s during setup: %s", mac_address, err)
-        _LOGGER.info("Integration will load anyway - train will connect when powered on")
-        # Don't raise ConfigEntryNotReady - let the integration load anyway
-
-    hass.data.setdefault(DOMAIN, {})
+    coordinator = LionelTrainCoordinator(
+        hass,
+        mac_address,
+        name,
+        service_uuid,
+        command_timeout=entry.options.get(CONF_COMMAND_TIMEOUT, DEFAULT_TIMEOUT),
+        retry_count=entry.options.get(CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT),
+        queue_offline=entry.options.get(CONF_QUEUE_OFFLINE, False),
+        queue_ttl=entry.options.get(CONF_QUEUE_TTL, DEFAULT_QUEUE_TTL),
+        trace_commands=entry.options.get(CONF_TRACE_COMMANDS, False),
+        log_sample_rate=entry.options.get(CONF_LOG_SAMPLE_RATE, 0),
+    )
+
+    # Bring entities up with the last-known values instead of defaults
+    await coordinator.async_restore_state()
+
+    # A config flow may have created the domain data already
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data.setdefault(DATA_DEVICE_INDEX, {})
+    domain_data.setdefault(DATA_CONSISTS, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Index the train's device so service targets resolve to this coordinator
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, mac_address)},
+        name=name,
+    )
+    hass.data[DOMAIN][DATA_DEVICE_INDEX][device.id] = coordinator
+    coordinator.device_id = device.id
+
     # Register services
-    await _async_register_services(hass, coordinator)
+    async_register_services(hass)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Apply option changes to the running coordinator without reconnecting
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    # Per-command logs are DEBUG only; summarize the traffic periodically instead
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, coordinator.async_log_summary, timedelta(seconds=LOG_SUMMARY_INTERVAL)
+        )
+    )
     
     # Register the custom Lovelace card
     await _async_register_card(hass)
-    
+
+    # Follow the train's advertisements for presence and signal strength; the
+    # domain's discovery index stops when the last entry unloads
+    index, release_index = async_hold_discovery_index(hass)
+    entry.async_on_unload(release_index)
+    entry.async_on_unload(coordinator.async_start_presence_tracking(index))
+
+    # Connect in the background so a missing or slow train never delays startup;
+    # entities are already registered and update once the connection is up
+    entry.async_create_background_task(
+        hass, coordinator.async_setup(), f"{DOMAIN}_connect_{mac_address}"
+    )
+
+    coordinator.startup_timings["setup_ms"] = round(
+        (time.perf_counter() - setup_started) * 1000, 1
+    )
+    _LOGGER.debug(
+        "Set up %s in %.1f ms, connecting in background",
+        name, coordinator.startup_timings["setup_ms"],
+    )
     return True
 
 
-async def _async_register_services(hass: HomeAssistant, coordinator: "LionelTrainCoordinator") -> None:
-    """Register Home Assistant services for train control."""
-    import voluptuous as vol
-    from homeassistant.helpers import config_validation as cv
-
-    # Service schemas
-    SPEED_SCHEMA = vol.Schema({
-        vol.Required("speed"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
-    })
-
-    DIRECTION_SCHEMA = vol.Schema({
-        vol.Required("direction"): vol.In(["forward", "reverse"]),
-    })
-
-    ANNOUNCEMENT_SCHEMA = vol.Schema({
-        vol.Required("announcement"): vol.Coerce(int),
-    })
-
-    async def set_speed_service(call):
-        """Service to set train speed."""
-        speed = call.data["speed"]
-        _LOGGER.info("Setting train speed to %d via service", speed)
-        await coordinator.async_set_speed(speed)
-
-    async def set_direction_service(call):
-        """Service to set train direction."""
-        direction = call.data["direction"]
-        forward = direction == "forward"
-        _LOGGER.info("Setting train direction to %s via service", direction)
-        await coordinator.async_set_direction(forward)
-
-    async def stop_service(call):
-        """Service to stop the train."""
-        _LOGGER.info("Stopping train via service")
-        await coordinator.async_set_speed(0)
-
-    async def horn_service(call):
-        """Service to sound the horn."""
-        _LOGGER.info("Sounding horn via service")
-        await coordinator.async_set_horn(True)
-        await asyncio.sleep(0.5)
-        await coordinator.async_set_horn(False)
-
-    async def bell_service(call):
-        """Service to ring the bell."""
-        _LOGGER.info("Ringing bell via service")
-        await coordinator.async_set_bell(True)
-        await asyncio.sleep(0.5)
-        await coordinator.async_set_bell(False)
-
-    async def lights_on_service(call):
-        """Service to turn lights on."""
-        _LOGGER.info("Turning lights on via service")
-        await coordinator.async_set_lights(True)
-
-    async def lights_off_service(call):
-        """Service to turn lights off."""
-        _LOGGER.info("Turning lights off via service")
-        await coordinator.async_set_lights(False)
-
-    async def play_announcement_service(call):
-        """Service to play an announcement."""
-        announcement = call.data["announcement"]
-        _LOGGER.info("Playing announcement %d via service", announcement)
-        await coordinator.async_play_announcement(announcement)
-
-    async def connect_service(call):
-        """Service to connect to the train."""
-        _LOGGER.info("Connecting to train via service")
-        await coordinator.async_force_reconnect()
-
-    async def disconnect_service(call):
-        """Service to disconnect from the train."""
-        _LOGGER.info("Disconnecting from train via service")
-        await coordinator.async_disconnect()
-
-    # Register services if not already registered
-    if not hass.services.has_service(DOMAIN, "set_speed"):
-        hass.services.async_register(DOMAIN, "set_speed", set_speed_service, schema=SPEED_SCHEMA)
-    if not hass.services.has_service(DOMAIN, "set_direction"):
-        hass.services.async_register(DOMAIN, "set_direction", set_direction_service, schema=DIRECTION_SCHEMA)
-    if not hass.services.has_service(DOMAIN, "stop"):
-        hass.services.async_register(DOMAIN, "stop", stop_service)
-    if not hass.services.has_service(DOMAIN, "horn"):
-        hass.services.async_register(DOMAIN, "horn", horn_service)
-    if not hass.services.has_service(DOMAIN, "bell"):
-        hass.services.async_register(DOMAIN, "bell", bell_service)
-    if not hass.services.has_service(DOMAIN, "lights_on"):
-        hass.services.async_register(DOMAIN, "lights_on", lights_on_service)
-    if not hass.services.has_service(DOMAIN, "lights_off"):
-        hass.services.async_register(DOMAIN, "lights_off", lights_off_service)
-    if not hass.services.has_service(DOMAIN, "play_announcement"):
-        hass.services.async_register(DOMAIN, "play_announcement", play_announcement_service, schema=ANNOUNCEMENT_SCHEMA)
-    if not hass.services.has_service(DOMAIN, "connect"):
-        hass.services.async_register(DOMAIN, "connect", connect_service)
-    if not hass.services.has_service(DOMAIN, "disconnect"):
-        hass.services.async_register(DOMAIN, "disconnect", disconnect_service)
-
-    _LOGGER.info("Registered Lionel Train services")
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Handle options update."""
+    coordinator: LionelTrainCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.command_timeout = entry.options.get(CONF_COMMAND_TIMEOUT, DEFAULT_TIMEOUT)
+    coordinator.retry_count = entry.options.get(CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT)
+    coordinator.queue_offline = entry.options.get(CONF_QUEUE_OFFLINE, False)
+    coordinator.queue_ttl = entry.options.get(CONF_QUEUE_TTL, DEFAULT_QUEUE_TTL)
+    coordinator.tracer.enabled = entry.options.get(CONF_TRACE_COMMANDS, False)
+    coordinator.log_sample_rate = entry.options.get(CONF_LOG_SAMPLE_RATE, 0)
+    _LOGGER.debug(
+        "Updated options for %s: timeout=%.1fs, retries=%d",
+        coordinator.mac_address, coordinator.command_timeout, coordinator.retry_count,
+    )
 
 
 async def _async_register_card(hass: HomeAssistant) -> None:
@@ -213,11 +228,28 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN][DATA_DEVICE_INDEX].pop(coordinator.device_id, None)
+        consists = hass.data[DOMAIN][DATA_CONSISTS]
+        for consist_id in [cid for cid, c in consists.items() if c.contains(coordinator)]:
+            _LOGGER.info("Removing consist %s, member %s was unloaded", consist_id, coordinator.name)
+            del consists[consist_id]
         await coordinator.async_shutdown()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted state of a deleted train."""
+    await Store(
+        hass, STORAGE_VERSION, state_storage_key(entry.data[CONF_MAC_ADDRESS])
+    ).async_remove()
+
+
+def state_storage_key(mac_address: str) -> str:
+    """Return the storage key holding a train's last-known state."""
+    return f"{DOMAIN}.{mac_address.replace(':', '').lower()}"
+
+
 class LionelTrainCoordinator:
     """Coordinator for managing the Lionel train connection."""
 
@@ -227,46 +259,53 @@ class LionelTrainCoordinator:
         mac_address: str,
         name: str,
         service_uuid: str,
+        command_timeout: float = DEFAULT_TIMEOUT,
+        retry_count: int = DEFAULT_RETRY_COUNT,
+        queue_offline: bool = False,
+        queue_ttl: float = DEFAULT_QUEUE_TTL,
+        trace_commands: bool = False,
+        log_sample_rate: int = 0,
     ) -> None:
         """Initialize the coordinator."""
         self.hass = hass
         self.mac_address = mac_address
         self.name = name
         self.service_uuid = service_uuid
+        self.command_timeout = command_timeout
+        self.retry_count = retry_count
+        self.queue_offline = queue_offline
+        self.device_id: str | None = None  # Device registry id, set during entry setup
+        self.startup_timings: dict[str, float] = {}  # setup_ms, first_connect_ms
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, state_storage_key(mac_address)
+        )
+        self._pending = PendingCommandQueue(DEFAULT_QUEUE_SIZE, queue_ttl)
+        self.tracer = CommandTracer()
+        self._log_summary = CommandLogSummary(log_sample_rate)
+        self.metrics = TrainMetrics()
+        self.tracer.enabled = trace_commands
         self._client: BleakClientWithServiceCache | None = None
         self._connected = False
+        self._connect_task: asyncio.Task | None = None
         self._lock = asyncio.Lock()
         self._retry_count = 0
         self._update_callbacks = set()
+
+        # Presence from passive advertisements; the event is set by every
+        # advertisement, however weak, to wake the availability monitor
+        self.presence = AdvertisementTracker()
+        self._advertised_event = asyncio.Event()
         
-        # State tracking
-        self._speed = 0
-        self._direction_forward = True
-        self._lights_on = True  # Default to on since locomotive lights are on when reconnected
-        self._horn_on = False
-        self._bell_on = False
-        
-        # Advanced feature state tracking
-        self._master_volume = 5  # Default mid-range volume
-        self._horn_volume = 5
-        self._bell_volume = 5
-        self._speech_volume = 5
-        self._engine_volume = 5
-        self._horn_pitch = 0
-        self._bell_pitch = 0
-        self._speech_pitch = 0
-        self._engine_pitch = 0
-        
-        self._smoke_on = False
-        
-        # Device information
-        self._model_number = None
-        self._serial_number = None
-        self._firmware_revision = None
-        self._hardware_revision = None
-        self._software_revision = None
-        self._manufacturer_name = None
-        
+        # State tracking: immutable snapshots, replaced on every change
+        self._state = TrainState()
+        self._device = DeviceDetails()
+
+        # Persistence: the last saved subset, and the snapshots it was taken from
+        self._saved_snapshot = self._state_snapshot()
+        self._saved_version = self._state.version
+        self._saved_device = self._device
+        self._showing_restored = False  # Restored values shown until the first connect attempt
+
         # Dynamic characteristic discovery
         self._discovered_write_char = None
         self._discovered_notify_char = None
@@ -274,14 +313,30 @@ class LionelTrainCoordinator:
         
         # Status information
         self._last_notification_hex = None
+
+        # Bounded in-memory history for the diagnostics download
+        self._connection_history: deque[tuple[float, str, str | None]] = deque(
+            maxlen=CONNECTION_HISTORY_SIZE
+        )
+        self._frame_history: deque[tuple[float, str, bytes]] = deque(maxlen=FRAME_HISTORY_SIZE)
         
         # Error tracking for diagnostics
         self._last_error = None
         self._last_error_time = None
-        self._connection_attempts = 0
-        self._successful_commands = 0
-        self._failed_commands = 0
+        self._counters = CommandCounters()
         
+        # Horn/bell pulses: command code -> off timer and loop time it fires
+        self._pulse_setters = {CMD_HORN: self.async_set_horn, CMD_BELL: self.async_set_bell}
+        self._pulse_timers: dict[int, asyncio.TimerHandle] = {}
+        self._pulse_ends: dict[int, float] = {}
+
+        # Timed sequence currently playing and the report of the last one
+        self._sequence_task: asyncio.Task | None = None
+        self._sequence_name: str | None = None
+        self._last_sequence_report: dict[str, Any] | None = None
+        self._recorder: SessionRecorder | None = None
+        self._write_time: float | None = None  # Moving average of one GATT write (seconds)
+
         # Reconnection task
         self._reconnect_task: asyncio.Task | None = None
         self._reconnect_interval = 30  # seconds between reconnection attempts
@@ -294,61 +349,80 @@ class LionelTrainCoordinator:
         # The _client.is_connected can lag behind our state
         return self._connected
 
+    @property
+    def present(self) -> bool:
+        """Return True if the train is connected or advertising within range."""
+        return self._connected or self.presence.present
+
+    @property
+    def state(self) -> TrainState:
+        """Return the current state snapshot."""
+        return self._state
+
+    @property
+    def state_available(self) -> bool:
+        """Return True if entities should show the state snapshot.
+
+        That is while connected and, when the snapshot was restored from
+        storage, from startup until the first connect attempt has finished.
+        """
+        return self._connected or self._showing_restored
+
     @property
     def speed(self) -> int:
         """Return current speed (0-100)."""
-        return self._speed
+        return self._state.speed
 
     @property
     def direction_forward(self) -> bool:
         """Return True if direction is forward."""
-        return self._direction_forward
+        return self._state.direction_forward
 
     @property
     def lights_on(self) -> bool:
         """Return True if lights are on."""
-        return self._lights_on
+        return self._state.lights_on
 
     @property
     def horn_on(self) -> bool:
         """Return True if horn is on."""
-        return self._horn_on
+        return self._state.horn_on
 
     @property
     def bell_on(self) -> bool:
         """Return True if bell is on."""
-        return self._bell_on
+        return self._state.bell_on
 
     # Advanced feature properties
     @property
     def master_volume(self) -> int:
         """Return master volume (0-7)."""
-        return self._master_volume
+        return self._state.master_volume
 
     @property
     def horn_volume(self) -> int:
         """Return horn volume (0-7)."""
-        return self._horn_volume
+        return self._state.horn_volume
 
     @property
     def bell_volume(self) -> int:
         """Return bell volume (0-7)."""
-        return self._bell_volume
+        return self._state.bell_volume
 
     @property
     def speech_volume(self) -> int:
         """Return speech volume (0-7)."""
-        return self._speech_volume
+        return self._state.speech_volume
 
     @property
     def engine_volume(self) -> int:
         """Return engine volume (0-7)."""
-        return self._engine_volume
+        return self._state.engine_volume
 
     @property
     def smoke_on(self) -> bool:
         """Return True if smoke unit is on."""
-        return self._smoke_on
+        return self._state.smoke_on
 
     @property
     def last_notification_hex(self) -> str | None:
@@ -373,21 +447,146 @@ class LionelTrainCoordinator:
     @property
     def connection_attempts(self) -> int:
         """Return the number of connection attempts."""
-        return self._connection_attempts
+        return self._counters.connection_attempts
 
     @property
     def successful_commands(self) -> int:
         """Return the number of successful commands."""
-        return self._successful_commands
+        return self._counters.successful_commands
 
     @property
     def failed_commands(self) -> int:
         """Return the number of failed commands."""
-        return self._failed_commands
+        return self._counters.failed_commands
+
+    @property
+    def timed_out_commands(self) -> int:
+        """Return the number of commands cancelled by their deadline."""
+        return self._counters.timed_out_commands
+
+    @property
+    def queue_ttl(self) -> float:
+        """Return how long a queued command stays valid (seconds)."""
+        return self._pending.ttl
+
+    @queue_ttl.setter
+    def queue_ttl(self, ttl: float) -> None:
+        """Set how long newly queued commands stay valid (seconds)."""
+        self._pending.ttl = ttl
+
+    @property
+    def queue_stats(self) -> dict[str, int]:
+        """Return store-and-forward queue statistics."""
+        return self._pending.as_dict()
+
+    @property
+    def running_sequence(self) -> str | None:
+        """Return the name of the sequence currently playing."""
+        return self._sequence_name
+
+    @property
+    def last_sequence_report(self) -> dict[str, Any] | None:
+        """Return the timing report of the last finished or cancelled sequence."""
+        return self._last_sequence_report
+
+    @property
+    def recording(self) -> bool:
+        """Return True while outbound commands are being recorded."""
+        return self._recorder is not None
+
+    @property
+    def write_time(self) -> float | None:
+        """Return the measured average time of one GATT write (seconds)."""
+        return self._write_time
+
+    def start_recording(self) -> None:
+        """Start recording outbound commands, discarding any unsaved recording."""
+        self._recorder = SessionRecorder()
+        _LOGGER.debug("Recording commands sent to %s", self.mac_address)
+
+    def stop_recording(self) -> list[SessionFrame]:
+        """Stop recording and return the recorded frames."""
+        if self._recorder is None:
+            return []
+        recorder, self._recorder = self._recorder, None
+        if recorder.truncated:
+            _LOGGER.warning("Recording for %s hit the frame limit and was truncated", self.name)
+        return recorder.frames
+
+    @property
+    def connection_history(self) -> list[dict[str, Any]]:
+        """Return recent connection events, oldest first."""
+        return [
+            {"time": datetime.fromtimestamp(when).isoformat(), "event": event, "detail": detail}
+            for when, event, detail in self._connection_history
+        ]
+
+    @property
+    def frame_history(self) -> list[dict[str, Any]]:
+        """Return recent sent (tx) and received (rx) frames, oldest first."""
+        return [
+            {"time": datetime.fromtimestamp(when).isoformat(), "direction": direction, "frame": frame.hex()}
+            for when, direction, frame in self._frame_history
+        ]
+
+    @property
+    def gatt_layout(self) -> list[dict[str, Any]]:
+        """Return the services and characteristics cached by the current client."""
+        if self._client is None or self._client.services is None:
+            return []
+        return [
+            {
+                "uuid": str(service.uuid),
+                "description": service.description,
+                "characteristics": [
+                    {"uuid": str(char.uuid), "properties": list(char.properties)}
+                    for char in service.characteristics
+                ],
+            }
+            for service in self._client.services
+        ]
+
+    @property
+    def presence_status(self) -> dict[str, Any]:
+        """Return the advertisement tracker's view of the train."""
+        return self.presence.as_dict(MONOTONIC_TIME())
+
+    @property
+    def link_status(self) -> dict[str, Any]:
+        """Return connection and reconnect status."""
+        monitor = getattr(self, "_monitor_task", None)
+        return {
+            "connected": self._connected,
+            "auto_reconnect_enabled": self._auto_reconnect_enabled,
+            "reconnecting": self._reconnect_task is not None and not self._reconnect_task.done(),
+            "monitoring_availability": monitor is not None and not monitor.done(),
+            "command_timeout": self.command_timeout,
+            "retry_count": self.retry_count,
+            "write_time_ms": round(self._write_time * 1000, 2) if self._write_time else None,
+        }
+
+    @property
+    def log_sample_rate(self) -> int:
+        """Return N when every Nth sent frame is logged, 0 when off."""
+        return self._log_summary.sample_rate
+
+    @log_sample_rate.setter
+    def log_sample_rate(self, rate: int) -> None:
+        """Set sampled per-frame logging (1 in N, 0 = off)."""
+        self._log_summary.sample_rate = rate
+
+    @callback
+    def async_log_summary(self, now: datetime | None = None) -> None:
+        """Log what was sent since the previous summary, if anything."""
+        if (summary := self._log_summary.flush()) is not None:
+            _LOGGER.info("%s: %s", self.name, summary)
+
+    def _record_connection_event(self, event: str, detail: str | None = None) -> None:
+        """Append to the connection history."""
+        self._connection_history.append((time.time(), event, detail))
 
     def _record_error(self, error: str) -> None:
         """Record an error for diagnostics."""
-        from datetime import datetime
         self._last_error = error
         self._last_error_time = datetime.now().isoformat()
         _LOGGER.debug("Recorded error: %s", error)
@@ -415,11 +614,11 @@ class LionelTrainCoordinator:
     def device_info(self) -> dict:
         """Return device information."""
         return {
-            "model": self._model_number or "LionChief Locomotive",
-            "manufacturer": self._manufacturer_name or "Lionel",
-            "sw_version": self._software_revision or "Unknown",
-            "hw_version": self._hardware_revision or "Unknown", 
-            "serial_number": self._serial_number,
+            "model": self._device.model_number or "LionChief Locomotive",
+            "manufacturer": self._device.manufacturer_name or "Lionel",
+            "sw_version": self._device.software_revision or "Unknown",
+            "hw_version": self._device.hardware_revision or "Unknown", 
+            "serial_number": self._device.serial_number,
         }
 
     def add_update_callback(self, callback):
@@ -430,27 +629,78 @@ class LionelTrainCoordinator:
         """Remove a callback."""
         self._update_callbacks.discard(callback)
 
+    def _state_snapshot(self) -> dict[str, Any]:
+        """Return the persisted subset of the train state."""
+        data = {name: getattr(self._state, name) for name in PERSISTED_STATE_FIELDS}
+        data.update((name, getattr(self._device, name)) for name in DEVICE_DETAIL_FIELDS)
+        return data
+
+    async def async_restore_state(self) -> None:
+        """Load the last-known train state saved before the previous shutdown."""
+        data = await self._store.async_load()
+        if not data:
+            return
+
+        self._state = self._state.evolve(
+            **{name: data[name] for name in PERSISTED_STATE_FIELDS if name in data}
+        )
+        self._device = replace(
+            self._device, **{name: data[name] for name in DEVICE_DETAIL_FIELDS if name in data}
+        )
+        self._saved_snapshot = self._state_snapshot()
+        self._saved_version = self._state.version
+        self._saved_device = self._device
+        self._showing_restored = True
+        _LOGGER.debug("Restored state for %s: %s", self.mac_address, data)
+
     def _notify_state_change(self):
         """Notify all registered callbacks of state changes."""
+        # Save only when a persisted field changed, not on every notification
+        if self._state.version != self._saved_version or self._device is not self._saved_device:
+            self._saved_version = self._state.version
+            self._saved_device = self._device
+            if (snapshot := self._state_snapshot()) != self._saved_snapshot:
+                self._saved_snapshot = snapshot
+                self._store.async_delay_save(self._state_snapshot, STATE_SAVE_DELAY)
         for callback in self._update_callbacks:
             try:
                 callback()
             except Exception as err:
                 _LOGGER.error("Error calling update callback: %s", err)
+        trace_mark("state_published")
 
     async def async_setup(self) -> None:
-        """Set up the coordinator."""
+        """Set up the coordinator (runs in the background after entry setup)."""
+        connect_started = time.perf_counter()
         try:
             await self._async_connect()
+            _LOGGER.info("Successfully connected to Lionel train at %s", self.mac_address)
         except (BleakError, asyncio.TimeoutError) as err:
-            _LOGGER.debug("Initial connection failed during setup: %s", err)
-            # Don't raise - let the integration load anyway
+            _LOGGER.warning("Could not connect to Lionel train at %s during setup: %s", self.mac_address, err)
+            _LOGGER.info("Train will connect when powered on")
             # Start background monitoring to connect when train becomes available
             if self._auto_reconnect_enabled:
                 self._start_availability_monitor()
+        finally:
+            self.startup_timings["first_connect_ms"] = round(
+                (time.perf_counter() - connect_started) * 1000, 1
+            )
+            # From here on, entities are available only while connected
+            self._showing_restored = False
+            self._notify_state_change()
 
     async def async_shutdown(self) -> None:
         """Shut down the coordinator."""
+        # Closing the client fires the disconnect callback; it must not
+        # schedule a reconnect loop that outlives the entry
+        self._auto_reconnect_enabled = False
+        await self.async_cancel_sequence()
+        self.async_log_summary()
+        for handle in self._pulse_timers.values():
+            handle.cancel()
+        self._pulse_timers.clear()
+        self._pulse_ends.clear()
+
         # Cancel any pending reconnection task
         if self._reconnect_task and not self._reconnect_task.done():
             self._reconnect_task.cancel()
@@ -459,6 +709,11 @@ class LionelTrainCoordinator:
             except asyncio.CancelledError:
                 pass
         
+        # Abandon a connect still in progress
+        if self._connect_task and not self._connect_task.done():
+            self._connect_task.cancel()
+            await asyncio.wait([self._connect_task])
+
         # Cancel availability monitor task
         if hasattr(self, '_monitor_task') and self._monitor_task and not self._monitor_task.done():
             self._monitor_task.cancel()
@@ -471,6 +726,49 @@ class LionelTrainCoordinator:
             await self._client.disconnect()
         self._connected = False
 
+    @callback
+    def async_start_presence_tracking(self, index: DiscoveryIndex) -> CALLBACK_TYPE:
+        """Follow the train's advertisements; return a callback that stops it."""
+        unsubscribers = [
+            index.async_track_train(self.mac_address, self._async_on_advertisement),
+            async_track_time_interval(
+                self.hass, self._async_check_presence, timedelta(seconds=PRESENCE_CHECK_INTERVAL)
+            ),
+        ]
+
+        @callback
+        def _async_stop() -> None:
+            for unsubscribe in unsubscribers:
+                unsubscribe()
+
+        return _async_stop
+
+    @callback
+    def _async_on_advertisement(self, service_info: BluetoothServiceInfoBleak) -> None:
+        """Wake the availability monitor and feed the presence tracker."""
+        self._advertised_event.set()
+        if self.presence.record(service_info.rssi, service_info.time):
+            self._async_presence_changed()
+
+    @callback
+    def _async_check_presence(self, now: datetime) -> None:
+        """Time out a silent train; a live link counts as being heard."""
+        if self._connected:
+            changed = self.presence.mark_seen(MONOTONIC_TIME())
+        else:
+            changed = self.presence.check(MONOTONIC_TIME())
+        if changed:
+            self._async_presence_changed()
+
+    @callback
+    def _async_presence_changed(self) -> None:
+        """Publish a presence change."""
+        _LOGGER.debug(
+            "%s is %s (rssi %.0f dBm)",
+            self.mac_address, "present" if self.presence.present else "absent", self.presence.rssi or 0,
+        )
+        self._notify_state_change()
+
     def _start_availability_monitor(self) -> None:
         """Start background task to monitor for train availability."""
         if not hasattr(self, '_monitor_task') or self._monitor_task is None or self._monitor_task.done():
@@ -480,11 +778,15 @@ class LionelTrainCoordinator:
             _LOGGER.info("Started availability monitor for %s", self.mac_address)
 
     async def _async_availability_monitor(self) -> None:
-        """Periodically check if train is available and connect when found."""
+        """Connect as soon as Home Assistant can reach the train.
+
+        The monitor wakes on every advertisement from the train, whatever its
+        signal strength, and otherwise looks the device up every
+        ``AVAILABILITY_POLL_INTERVAL`` seconds for trains the passive scanner
+        does not hear. The RSSI hysteresis only drives the Presence entity.
+        """
         _LOGGER.info("Monitoring for train availability at %s", self.mac_address)
-        
-        check_interval = 10  # Check every 10 seconds
-        
+
         while True:
             # Stop if auto-reconnect is disabled
             if not self._auto_reconnect_enabled:
@@ -496,33 +798,42 @@ class LionelTrainCoordinator:
                 _LOGGER.debug("Train connected, stopping availability monitor")
                 return
             
-            await asyncio.sleep(check_interval)
-            
-            # Check again after sleep
-            if not self._auto_reconnect_enabled or self.connected:
-                return
-            
-            # Check if device is available in HA's Bluetooth cache
-            ble_device = bluetooth.async_ble_device_from_address(
+            if bluetooth.async_ble_device_from_address(
                 self.hass, self.mac_address, connectable=True
-            )
-            
-            if ble_device:
-                _LOGGER.info("Train detected at %s, attempting connection", self.mac_address)
+            ) is None:
+                # Sleep until the train advertises, with a slow poll as fallback
+                self._advertised_event.clear()
                 try:
-                    await self._async_connect()
-                    if self.connected:
-                        _LOGGER.info("Successfully connected to train via availability monitor")
-                        return
-                except (BleakError, asyncio.TimeoutError) as err:
-                    _LOGGER.debug("Connection attempt failed: %s", err)
-            else:
-                _LOGGER.debug("Train not yet available at %s", self.mac_address)
+                    await asyncio.wait_for(
+                        self._advertised_event.wait(), AVAILABILITY_POLL_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Check again after the lookup
+            if not self._auto_reconnect_enabled or self.connected:
+                return
+
+            _LOGGER.info("Train detected at %s, attempting connection", self.mac_address)
+            try:
+                await self._async_connect()
+                if self.connected:
+                    _LOGGER.info("Successfully connected to train via availability monitor")
+                    return
+            except (BleakError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Connection attempt failed: %s", err)
+            # Advertising but refusing connections; do not hammer it
+            await asyncio.sleep(AVAILABILITY_RETRY_INTERVAL)
 
     def _on_disconnected(self, client: BleakClient) -> None:
         """Handle disconnection from the train."""
         _LOGGER.warning("Disconnected from Lionel train at %s", self.mac_address)
         self._connected = False
+        self.metrics.link_down()
+        self._record_connection_event("disconnected")
+        # The link was proof of presence until now; time out silence from here
+        self.presence.mark_seen(MONOTONIC_TIME())
         self._notify_state_change()
         
         # Schedule automatic reconnection if enabled
@@ -568,6 +879,14 @@ class LionelTrainCoordinator:
             if not self._auto_reconnect_enabled:
                 _LOGGER.info("Auto-reconnect disabled, stopping reconnection attempts")
                 return
+
+            # Gone (powered off or out of range): wait for it to advertise
+            if bluetooth.async_ble_device_from_address(
+                self.hass, self.mac_address, connectable=True
+            ) is None:
+                _LOGGER.info("%s is not advertising, waiting for it to return", self.mac_address)
+                self._start_availability_monitor()
+                return
             
             try:
                 _LOGGER.info("Reconnection attempt %d/%d for %s", attempt, max_attempts, self.mac_address)
@@ -585,97 +904,150 @@ class LionelTrainCoordinator:
     async def _async_connect(self) -> None:
         """Connect to the train."""
         async with self._lock:
-            if self._connected:
-                return
+            await self._async_connect_locked()
+
+    async def _async_connect_locked(self) -> None:
+        """Connect to the train. The caller must hold the command lock.
+
+        The connect and the post-connect initialization run as one task that
+        every caller waits on through ``asyncio.shield``, so a command deadline
+        only abandons the wait. The link counts as connected once that task
+        has finished initializing it.
+        """
+        if self._connected:
+            return
+        if self._connect_task is None or self._connect_task.done():
+            self._connect_task = self.hass.async_create_task(
+                self._async_establish_link(), f"{DOMAIN}_link_{self.mac_address}"
+            )
+            # Retrieve the exception even if every waiter gave up on the task
+            self._connect_task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+        await asyncio.shield(self._connect_task)
 
-            self._connection_attempts += 1
+    async def _async_establish_link(self) -> None:
+        """Connect and initialize the link; mark it connected only when done."""
+        self._counters.connection_attempts += 1
 
-            # Get a fresh BLE device reference
+        # Get a fresh BLE device reference
+        ble_device = bluetooth.async_ble_device_from_address(
+            self.hass, self.mac_address, connectable=True
+        )
+        
+        if not ble_device:
+            # Try to scan for the device if not found in cache
+            _LOGGER.debug("Device not found in cache, attempting fresh lookup")
+            await asyncio.sleep(0.5)  # Brief delay before retry
             ble_device = bluetooth.async_ble_device_from_address(
                 self.hass, self.mac_address, connectable=True
             )
             
-            if not ble_device:
-                # Try to scan for the device if not found in cache
-                _LOGGER.debug("Device not found in cache, attempting fresh lookup")
-                await asyncio.sleep(0.5)  # Brief delay before retry
-                ble_device = bluetooth.async_ble_device_from_address(
-                    self.hass, self.mac_address, connectable=True
-                )
-                
-            if not ble_device:
-                error_msg = f"Could not find Bluetooth device with address {self.mac_address}"
-                self._record_error(error_msg)
-                raise BleakError(error_msg)
+        if not ble_device:
+            error_msg = f"Could not find Bluetooth device with address {self.mac_address}"
+            self._record_error(error_msg)
+            self._record_connection_event("connect_failed", "device not found")
+            raise BleakError(error_msg)
 
+        try:
+            _LOGGER.debug("Establishing connection to %s", self.mac_address)
+            connect_started = time.perf_counter()
+            self._client = await establish_connection(
+                BleakClientWithServiceCache,
+                ble_device,
+                self.mac_address,
+                max_attempts=self.retry_count,
+                disconnected_callback=self._on_disconnected,
+            )
+            self.metrics.connect.record((time.perf_counter() - connect_started) * 1000)
+            
+            # Read device information if available (non-critical)
             try:
-                _LOGGER.debug("Establishing connection to %s", self.mac_address)
-                self._client = await establish_connection(
-                    BleakClientWithServiceCache,
-                    ble_device,
-                    self.mac_address,
-                    max_attempts=3,
-                    disconnected_callback=self._on_disconnected,
-                )
-                
-                # Mark as connected immediately after establishing connection
-                self._connected = True
-                self._retry_count = 0
-                _LOGGER.info("Connected to Lionel train at %s", self.mac_address)
-                
-                # Read device information if available (non-critical)
+                await self._read_device_info()
+            except Exception as err:
+                _LOGGER.debug("Could not read device info: %s", err)
+            
+            # Log BLE services for debugging (non-critical, skip on reconnect)
+            if self._discovered_lionchief_service is None:
                 try:
-                    await self._read_device_info()
+                    await self._log_ble_characteristics()
                 except Exception as err:
-                    _LOGGER.debug("Could not read device info: %s", err)
-                
-                # Log BLE services for debugging (non-critical, skip on reconnect)
-                if self._discovered_lionchief_service is None:
-                    try:
-                        await self._log_ble_characteristics()
-                    except Exception as err:
-                        _LOGGER.debug("Could not log BLE characteristics: %s", err)
-                
-                # Set up notification handler for status updates (non-critical)
-                try:
-                    notify_char_uuid = NOTIFY_CHARACTERISTIC_UUID
-                    await self._client.start_notify(
-                        notify_char_uuid, self._notification_handler
-                    )
-                    _LOGGER.info("Set up notifications on %s", notify_char_uuid)
-                except BleakError as err:
-                    _LOGGER.debug("Could not set up notifications (train may not support them): %s", err)
-                
-                # Notify all entities that connection state changed
-                self._notify_state_change()
-
+                    _LOGGER.debug("Could not log BLE characteristics: %s", err)
+            
+            # Set up notification handler for status updates (non-critical)
+            try:
+                notify_char_uuid = NOTIFY_CHARACTERISTIC_UUID
+                await self._client.start_notify(
+                    notify_char_uuid, self._notification_handler
+                )
+                _LOGGER.info("Set up notifications on %s", notify_char_uuid)
             except BleakError as err:
-                _LOGGER.error("Failed to connect to train: %s", err)
-                self._connected = False
-                self._record_error(f"Connection failed: {err}")
-                raise
+                _LOGGER.debug("Could not set up notifications (train may not support them): %s", err)
+            
+            # Bring a freshly powered-on train back to the last-known settings,
+            # then deliver anything queued while it was away, in one burst
+            await self._async_restore_device_settings_locked()
+            await self._async_flush_pending_locked()
+
+            # Only a fully initialized link counts as connected
+            self._connected = True
+            self.metrics.link_up()
+            self._record_connection_event("connected")
+            self._retry_count = 0
+            _LOGGER.info("Connected to Lionel train at %s", self.mac_address)
+
+            # Commands issued while the link was initializing were queued
+            # after the first flush; deliver them now instead of on the next connect
+            await self._async_flush_pending_locked()
+
+            # Notify all entities that connection state changed
+            self._notify_state_change()
+
+        except BleakError as err:
+            _LOGGER.error("Failed to connect to train: %s", err)
+            self._record_connection_event("connect_failed", str(err))
+            self._record_error(f"Connection failed: {err}")
+            self._async_discard_client()
+            raise
+        except asyncio.CancelledError:
+            # Cancelled by shutdown part-way through; never keep a half-set-up link
+            self._record_connection_event("connect_failed", "cancelled")
+            self._async_discard_client()
+            raise
+
+    @callback
+    def _async_discard_client(self) -> None:
+        """Close a client whose link never finished initializing."""
+        self._connected = False
+        client, self._client = self._client, None
+        if client is not None:
+            self.hass.async_create_task(self._async_close_client(client))
 
     async def _notification_handler(self, sender: int, data: bytearray) -> None:
         """Handle notifications from the train."""
-        _LOGGER.debug("Received notification: %s", data.hex())
-        
         # Store the raw notification hex string
         self._last_notification_hex = data.hex()
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Received notification: %s", self._last_notification_hex)
+        self.metrics.notifications += 1
+        self._frame_history.append((time.time(), "rx", bytes(data)))
         
         # Parse locomotive status data based on protocol analysis
         if len(data) >= 8 and data[0] == 0x00 and data[1] == 0x81 and data[2] == 0x02:
             # This is train status data: [0x00, 0x81, 0x02, speed, direction, 0x03, 0x0C, flags]
             try:
-                self._speed = int((data[3] / 31) * 100)  # Convert 0-31 to 0-100%
-                self._direction_forward = data[4] == 0x01
-                
                 # Parse flags byte (data[7])
                 flags = data[7]
-                self._lights_on = (flags & 0x04) != 0
-                self._bell_on = (flags & 0x02) != 0
+                self._state = self._state.evolve(
+                    speed=int((data[3] / 31) * 100),  # Convert 0-31 to 0-100%
+                    direction_forward=data[4] == 0x01,
+                    lights_on=(flags & 0x04) != 0,
+                    bell_on=(flags & 0x02) != 0,
+                )
                 
                 _LOGGER.debug("Parsed train status: speed=%d%%, forward=%s, lights=%s, bell=%s", 
-                             self._speed, self._direction_forward, self._lights_on, self._bell_on)
+                             self._state.speed, self._state.direction_forward,
+                             self._state.lights_on, self._state.bell_on)
                 
                 # Notify entities of state change
                 self._notify_state_change()
@@ -689,12 +1061,12 @@ class LionelTrainCoordinator:
     async def _read_device_info(self) -> None:
         """Read device information characteristics."""
         device_info_chars = {
-            MODEL_NUMBER_CHAR_UUID: "_model_number",
-            SERIAL_NUMBER_CHAR_UUID: "_serial_number", 
-            FIRMWARE_REVISION_CHAR_UUID: "_firmware_revision",
-            HARDWARE_REVISION_CHAR_UUID: "_hardware_revision",
-            SOFTWARE_REVISION_CHAR_UUID: "_software_revision",
-            MANUFACTURER_NAME_CHAR_UUID: "_manufacturer_name",
+            MODEL_NUMBER_CHAR_UUID: "model_number",
+            SERIAL_NUMBER_CHAR_UUID: "serial_number", 
+            FIRMWARE_REVISION_CHAR_UUID: "firmware_revision",
+            HARDWARE_REVISION_CHAR_UUID: "hardware_revision",
+            SOFTWARE_REVISION_CHAR_UUID: "software_revision",
+            MANUFACTURER_NAME_CHAR_UUID: "manufacturer_name",
         }
         
         for char_uuid, attr_name in device_info_chars.items():
@@ -702,7 +1074,7 @@ class LionelTrainCoordinator:
                 result = await self._client.read_gatt_char(char_uuid)
                 value = result.decode('utf-8', errors='ignore').strip()
                 if value:
-                    setattr(self, attr_name, value)
+                    self._device = replace(self._device, **{attr_name: value})
                     _LOGGER.debug("Read %s: %s", attr_name, value)
             except BleakError:
                 _LOGGER.debug("Could not read characteristic %s", char_uuid)
@@ -816,59 +1188,251 @@ class LionelTrainCoordinator:
             import traceback
             _LOGGER.error("Full traceback: %s", traceback.format_exc())
 
-    async def async_send_command(self, command_data: list[int]) -> bool:
-        """Send a command to the train."""
+    async def async_send_command(
+        self, command_data: list[int], timeout: float | None = None
+    ) -> bool:
+        """Send a command to the train within the command deadline.
+
+        The deadline covers waiting for the lock, (re)connecting and the GATT
+        write. A command that misses it is cancelled and counted as timed out,
+        so one stalled write cannot hold the lock for every other entity.
+
+        With offline queueing enabled, commands issued while disconnected are
+        queued (coalesced per kind) and flushed on the next successful connect.
+        """
+        if self._recorder is not None and command_data[1] != CMD_DISCONNECT:
+            self._recorder.record(command_data)
+        if self.queue_offline and not self._connected and command_data[1] != CMD_DISCONNECT:
+            return self._async_queue_command(command_data)
+
+        deadline = self.command_timeout if timeout is None else timeout
+        progress = {"stage": "lock"}
+        trace = self.tracer.start(command_data)
+        success = False
+        try:
+            success = await asyncio.wait_for(
+                self._async_send_command(command_data, progress), deadline
+            )
+            return success
+        except asyncio.TimeoutError:
+            stage = progress["stage"]
+            self._counters.timed_out_commands += 1
+            self._counters.failed_commands += 1
+            self._log_summary.failed()
+            self._record_error(f"Command timed out after {deadline:.1f}s waiting for {stage}")
+            _LOGGER.warning(
+                "Command %s to %s timed out after %.1fs (stage: %s)",
+                bytes(command_data).hex(), self.mac_address, deadline, stage,
+            )
+            if stage == "write":
+                # A write abandoned mid-flight leaves the link in an unknown state
+                self._async_drop_client()
+            self._notify_state_change()
+            return False
+        finally:
+            if trace is not None:
+                self.tracer.finish(trace, success)
+
+    async def async_ensure_connected(self, timeout: float | None = None) -> bool:
+        """Connect to the train if needed, within the command deadline."""
+        if self._connected:
+            return True
+        deadline = self.command_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._async_connect(), deadline)
+        except (BleakError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Could not connect to %s: %s", self.mac_address, err)
+            return False
+        return self._connected
+
+    @callback
+    def _async_queue_command(self, command_data: list[int]) -> bool:
+        """Hold a command until the next successful connect."""
+        if command_kind(command_data) in self._pending:
+            self._log_summary.coalesced()
+        self._pending.put(command_data)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Train %s offline, queued command %s (%d pending)",
+                self.mac_address, bytes(command_data).hex(), len(self._pending),
+            )
+        if self._auto_reconnect_enabled and (
+            self._reconnect_task is None or self._reconnect_task.done()
+        ):
+            self._start_availability_monitor()
+        return True
+
+    def _settings_replay_commands(self) -> list[list[int]]:
+        """Return commands for settings that differ from the power-on defaults.
+
+        Motion (speed/direction) is never replayed; a train should not start
+        moving just because it reconnected.
+        """
+        commands = []
+        state = self._state
+        if not state.lights_on:
+            commands.append(build_simple_command(CMD_LIGHTS, [0x00]))
+        if state.smoke_on:
+            commands.append(build_simple_command(CMD_SMOKE, [0x01]))
+        if state.master_volume != DEFAULT_VOLUME:
+            commands.append(build_simple_command(CMD_MASTER_VOLUME, [state.master_volume]))
+        for source, volume, pitch in (
+            (SOUND_SOURCE_HORN, state.horn_volume, state.horn_pitch),
+            (SOUND_SOURCE_BELL, state.bell_volume, state.bell_pitch),
+            (SOUND_SOURCE_SPEECH, state.speech_volume, state.speech_pitch),
+            (SOUND_SOURCE_ENGINE, state.engine_volume, state.engine_pitch),
+        ):
+            if pitch != DEFAULT_PITCH:
+                commands.append(build_simple_command(CMD_SOUND_VOLUME, [source, volume, pitch & 0xFF]))
+            elif volume != DEFAULT_VOLUME:
+                commands.append(build_simple_command(CMD_SOUND_VOLUME, [source, volume]))
+        # Anything still queued supersedes the replayed value
+        return [command for command in commands if command_kind(command) not in self._pending]
+
+    async def _async_restore_device_settings_locked(self) -> None:
+        """Replay non-default settings. The caller must hold the command lock."""
+        commands = self._settings_replay_commands()
+        if not commands:
+            return
+        _LOGGER.debug("Replaying %d settings to %s", len(commands), self.mac_address)
+        for command in commands:
+            try:
+                await self._client.write_gatt_char(
+                    WRITE_CHARACTERISTIC_UUID, bytearray(command)
+                )
+                self._counters.successful_commands += 1
+            except BleakError as err:
+                _LOGGER.debug("Failed to replay setting %s: %s", bytes(command).hex(), err)
+
+    async def _async_flush_pending_locked(self) -> None:
+        """Write all queued commands. The caller must hold the command lock."""
+        commands = self._pending.drain()
+        if not commands:
+            return
+        _LOGGER.info("Flushing %d queued commands to %s", len(commands), self.mac_address)
+        for command in commands:
+            try:
+                await self._client.write_gatt_char(
+                    WRITE_CHARACTERISTIC_UUID, bytearray(command)
+                )
+                self._counters.successful_commands += 1
+            except BleakError as err:
+                self._counters.failed_commands += 1
+                self._record_error(f"Queued command failed: {err}")
+                _LOGGER.warning("Failed to flush queued command %s: %s", bytes(command).hex(), err)
+
+    @callback
+    def _async_drop_client(self) -> None:
+        """Mark the link as down and close the current client in the background."""
+        self._connected = False
+        self.metrics.link_down()
+        self._record_connection_event("dropped", "write timed out")
+        client, self._client = self._client, None
+        if client is not None:
+            self.hass.async_create_task(self._async_close_client(client))
+
+    async def _async_close_client(self, client: BleakClient) -> None:
+        """Disconnect a client that is no longer used for commands."""
+        try:
+            await client.disconnect()
+        except (BleakError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Error closing stale client: %s", err)
+
+    async def _async_send_command(
+        self, command_data: list[int], progress: dict[str, str]
+    ) -> bool:
+        """Send a command to the train (no deadline)."""
+        lock_started = time.perf_counter()
         async with self._lock:
-            # Try to connect if not connected
-            if not self.connected:
-                try:
-                    await self._async_connect()
-                except BleakError as err:
-                    _LOGGER.error("Failed to connect before sending command: %s", err)
-                    return False
+            self.metrics.lock_wait.record((time.perf_counter() - lock_started) * 1000)
+            trace_mark("lock_acquired")
+            return await self._async_send_command_locked(command_data, progress)
+
+    async def _async_send_command_locked(
+        self, command_data: list[int], progress: dict[str, str]
+    ) -> bool:
+        """Write a command to the train. The caller must hold the command lock.
+
+        ``progress["stage"]`` is kept current so a deadline expiry can tell
+        whether the command was cancelled while connecting or mid-write.
+        """
+        # Try to connect if not connected
+        if not self.connected:
+            progress["stage"] = "connect"
+            try:
+                await self._async_connect_locked()
+            except BleakError as err:
+                _LOGGER.error("Failed to connect before sending command: %s", err)
+                return False
+            trace_mark("connect")
 
-            # Always use the known-good write characteristic UUID
-            write_char_uuid = WRITE_CHARACTERISTIC_UUID
-            
-            # Retry command sending with better error handling
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    await self._client.write_gatt_char(
-                        write_char_uuid, bytearray(command_data)
+        # Always use the known-good write characteristic UUID
+        write_char_uuid = WRITE_CHARACTERISTIC_UUID
+        
+        # Retry command sending with better error handling
+        max_retries = self.retry_count
+        for attempt in range(max_retries):
+            try:
+                progress["stage"] = "write"
+                trace_mark("write_start")
+                write_started = time.perf_counter()
+                await self._client.write_gatt_char(
+                    write_char_uuid, bytearray(command_data)
+                )
+                trace_mark("write_done")
+                write_time = time.perf_counter() - write_started
+                self.metrics.write.record(write_time * 1000)
+                self.metrics.frame_sent(len(command_data))
+                self._frame_history.append((time.time(), "tx", bytes(command_data)))
+                self._write_time = (
+                    write_time if self._write_time is None
+                    else 0.8 * self._write_time + 0.2 * write_time
+                )
+                hex_string = bytes(command_data).hex()
+                if self._log_summary.sent(command_data[1], write_time * 1000):
+                    _LOGGER.info(
+                        "Sent %s to %s in %.1f ms (sampled 1 in %d)",
+                        hex_string, self.name, write_time * 1000, self._log_summary.sample_rate,
                     )
-                    hex_string = ''.join(f'{b:02x}' for b in command_data)
-                    _LOGGER.info("✅ Sent command successfully to %s: %s (hex: %s)", 
-                               write_char_uuid, command_data, hex_string)
-                    
-                    # Update the status sensor with the sent command
-                    self._last_notification_hex = hex_string
-                    self._successful_commands += 1
-                    self._notify_state_change()
-                    
-                    return True
+                elif _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug(
+                        "Sent %s to %s on %s in %.1f ms",
+                        hex_string, self.name, write_char_uuid, write_time * 1000,
+                    )
+                
+                # Update the status sensor with the sent command
+                self._last_notification_hex = hex_string
+                self._counters.successful_commands += 1
+                self._notify_state_change()
+                
+                return True
 
-                except BleakError as err:
-                    _LOGGER.warning("Failed to send command to %s (attempt %d/%d): %s", 
-                                  write_char_uuid, attempt + 1, max_retries, err)
-                    self._connected = False
+            except BleakError as err:
+                _LOGGER.warning("Failed to send command to %s (attempt %d/%d): %s", 
+                              write_char_uuid, attempt + 1, max_retries, err)
+                self._connected = False
+                self.metrics.link_down()
+                self._record_connection_event("write_failed", str(err))
+                
+                # Try to reconnect on subsequent attempts
+                if attempt < max_retries - 1:
+                    try:
+                        progress["stage"] = "connect"
+                        await asyncio.sleep(0.5 * (attempt + 1))  # Exponential backoff
+                        await self._async_connect_locked()
+                        trace_mark("connect")
+                    except BleakError:
+                        _LOGGER.debug("Reconnection attempt %d failed", attempt + 1)
+                        continue
+                else:
+                    _LOGGER.error("Failed to send command after %d attempts: %s", max_retries, err)
+                    self._counters.failed_commands += 1
+                    self._log_summary.failed()
+                    self._record_error(f"Command failed: {err}")
                     
-                    # Try to reconnect on subsequent attempts
-                    if attempt < max_retries - 1:
-                        try:
-                            await asyncio.sleep(0.5 * (attempt + 1))  # Exponential backoff
-                            await self._async_connect()
-                        except BleakError:
-                            _LOGGER.debug("Reconnection attempt %d failed", attempt + 1)
-                            continue
-                    else:
-                        _LOGGER.error("Failed to send command after %d attempts: %s", max_retries, err)
-                        self._failed_commands += 1
-                        self._record_error(f"Command failed: {err}")
-                        
-            return False
+        return False
 
-    async def async_set_speed(self, speed: int) -> bool:
+    async def async_set_speed(self, speed: int, timeout: float | None = None) -> bool:
         """Set train speed (0-100)."""
         if not 0 <= speed <= 100:
             raise ValueError("Speed must be between 0 and 100")
@@ -877,56 +1441,177 @@ class LionelTrainCoordinator:
         hex_speed = int((speed / 100) * 31)
         command = build_simple_command(0x45, [hex_speed])
         
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._speed = speed
+            self._state = self._state.evolve(speed=speed)
             self._notify_state_change()
         return success
 
-    async def async_set_direction(self, forward: bool) -> bool:
+    async def async_set_direction(self, forward: bool, timeout: float | None = None) -> bool:
         """Set train direction."""
         direction_value = 0x01 if forward else 0x02
         command = build_simple_command(0x46, [direction_value])
         
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._direction_forward = forward
+            self._state = self._state.evolve(direction_forward=forward)
             self._notify_state_change()
         return success
 
-    async def async_set_lights(self, on: bool) -> bool:
+    async def async_set_lights(self, on: bool, timeout: float | None = None) -> bool:
         """Set train lights."""
         command = build_simple_command(0x51, [0x01 if on else 0x00])
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._lights_on = on
+            self._state = self._state.evolve(lights_on=on)
         return success
 
-    async def async_set_horn(self, on: bool) -> bool:
+    async def async_set_horn(self, on: bool, timeout: float | None = None) -> bool:
         """Set train horn."""
         command = build_simple_command(0x48, [0x01 if on else 0x00])
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._horn_on = on
+            self._state = self._state.evolve(horn_on=on)
         return success
 
-    async def async_set_bell(self, on: bool) -> bool:
+    async def async_set_bell(self, on: bool, timeout: float | None = None) -> bool:
         """Set train bell."""
         command = build_simple_command(0x47, [0x01 if on else 0x00])
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._bell_on = on
+            self._state = self._state.evolve(bell_on=on)
+        return success
+
+    async def async_pulse(
+        self, command_code: int, duration: float, timeout: float | None = None
+    ) -> bool:
+        """Sound the horn or bell for a duration without waiting for it to end.
+
+        The sound is switched on now and off by a loop timer. A pulse that
+        overlaps one already running only extends its end time, so any number
+        of overlapping presses costs exactly one on and one off write.
+        """
+        setter = self._pulse_setters[command_code]
+        end = self.hass.loop.time() + duration
+
+        if command_code in self._pulse_timers:
+            if end > self._pulse_ends[command_code]:
+                self._pulse_ends[command_code] = end
+                self._pulse_timers[command_code].cancel()
+                self._pulse_timers[command_code] = self.hass.loop.call_at(
+                    end, self._async_end_pulse, command_code
+                )
+            return True
+
+        # Reserve the pulse before writing so presses during the write merge into it
+        self._pulse_ends[command_code] = end
+        self._pulse_timers[command_code] = self.hass.loop.call_at(
+            end, self._async_end_pulse, command_code
+        )
+        if not await setter(True, timeout):
+            if (handle := self._pulse_timers.pop(command_code, None)) is not None:
+                handle.cancel()
+            self._pulse_ends.pop(command_code, None)
+            return False
+        return True
+
+    @callback
+    def _async_end_pulse(self, command_code: int) -> None:
+        """Switch off a pulsed sound when its timer expires."""
+        self._pulse_timers.pop(command_code, None)
+        self._pulse_ends.pop(command_code, None)
+        self.hass.async_create_task(self._pulse_setters[command_code](False))
+
+    async def async_run_sequence(
+        self, name: str, frames: list[Frame], wait: bool = False
+    ) -> dict[str, Any] | None:
+        """Start playing a compiled sequence, replacing any sequence already playing.
+
+        With ``wait`` the timing report is returned once the sequence ends.
+        """
+        return await self._async_start_playback(name, async_play_frames(self, frames), wait)
+
+    async def async_replay_session(
+        self, name: str, frames: list[SessionFrame], rate: float = 1.0, wait: bool = False
+    ) -> dict[str, Any] | None:
+        """Start replaying a recorded session, replacing any sequence already playing.
+
+        Frames of the same kind that follow each other faster than the
+        measured write time are coalesced, keeping the last value.
+        """
+        min_interval = self._write_time or DEFAULT_WRITE_INTERVAL
+        return await self._async_start_playback(
+            name, async_replay_frames(self, frames, rate, min_interval), wait
+        )
+
+    async def _async_start_playback(
+        self, name: str, playback: Coroutine[Any, Any, dict[str, Any]], wait: bool
+    ) -> dict[str, Any] | None:
+        """Run a sequence or replay as the train's single playback task."""
+        await self.async_cancel_sequence()
+        self._sequence_name = name
+        task = self._sequence_task = self.hass.async_create_task(
+            self._async_playback(name, playback), f"{DOMAIN} playback {name}"
+        )
+        if not wait:
+            return None
+        # asyncio.wait does not raise if the sequence itself gets cancelled
+        await asyncio.wait([task])
+        return self._last_sequence_report
+
+    async def async_cancel_sequence(self) -> bool:
+        """Stop the sequence currently playing; return True if one was playing."""
+        if (task := self._sequence_task) is None or task.done():
+            return False
+        task.cancel()
+        await asyncio.wait([task])
+        return True
+
+    async def _async_playback(
+        self, name: str, playback: Coroutine[Any, Any, dict[str, Any]]
+    ) -> None:
+        """Run a playback coroutine and keep its timing report."""
+        try:
+            report = await playback
+        except asyncio.CancelledError:
+            self._last_sequence_report = {"name": name, "cancelled": True}
+            # Never leave the horn or bell sounding after a cancelled sequence
+            if self._state.horn_on and not self._pulse_timers.get(CMD_HORN):
+                await self.async_set_horn(False)
+            if self._state.bell_on and not self._pulse_timers.get(CMD_BELL):
+                await self.async_set_bell(False)
+            raise
+        else:
+            self._last_sequence_report = {"name": name, "cancelled": False, **report}
+            if coalesced := report.get("coalesced_frames"):
+                self._log_summary.coalesced(coalesced)
+        finally:
+            if self._sequence_task is asyncio.current_task():
+                self._sequence_task = None
+                self._sequence_name = None
+            self._notify_state_change()
+
+    async def async_send_frame(self, command: list[int], timeout: float | None = None) -> bool:
+        """Send a raw command frame and apply it to the state like its setter would."""
+        success = await self.async_send_command(command, timeout)
+        if success and (changes := command_state_changes(command)):
+            state = self._state
+            self._state = state.evolve(**changes)
+            if self._state is not state:
+                self._notify_state_change()
         return success
 
-    async def async_play_announcement(self, announcement_code: int) -> bool:
+    async def async_play_announcement(
+        self, announcement_code: int, timeout: float | None = None
+    ) -> bool:
         """Play announcement sound."""
         command = build_simple_command(0x4D, [announcement_code, 0x00])
-        return await self.async_send_command(command)
+        return await self.async_send_command(command, timeout)
 
-    async def async_disconnect(self) -> bool:
+    async def async_disconnect(self, timeout: float | None = None) -> bool:
         """Disconnect from train."""
         command = build_simple_command(0x4B, [0x00, 0x00])
-        return await self.async_send_command(command)
+        return await self.async_send_command(command, timeout)
 
     async def async_force_reconnect(self) -> bool:
         """Force reconnection to the train."""
@@ -934,6 +1619,8 @@ class LionelTrainCoordinator:
         
         # Clear connection state first - don't try to send disconnect commands
         # since the locomotive might already be disconnected/powered off
+        if self._connected:
+            self.metrics.link_down()
         self._connected = False
         if self._client:
             try:
@@ -975,7 +1662,7 @@ class LionelTrainCoordinator:
                         BleakClientWithServiceCache,
                         ble_device,
                         self.mac_address,
-                        max_attempts=3,
+                        max_attempts=self.retry_count,
                     )
                     
                     # Set up notification handler
@@ -990,8 +1677,13 @@ class LionelTrainCoordinator:
                     await self._read_device_info()
                     
                     self._connected = True
+                    self.metrics.link_up()
+                    self._record_connection_event("connected", "force reconnect")
                     self._retry_count = 0
                     _LOGGER.info("Successfully reconnected to train")
+
+                    await self._async_restore_device_settings_locked()
+                    await self._async_flush_pending_locked()
                     
                     # Notify all entities of the reconnection
                     self._notify_state_change()
@@ -1010,19 +1702,25 @@ class LionelTrainCoordinator:
         return False
 
     # Advanced feature control methods
-    async def async_set_master_volume(self, volume: int) -> bool:
+    async def async_set_master_volume(self, volume: int, timeout: float | None = None) -> bool:
         """Set master volume (0-7)."""
         if not 0 <= volume <= 7:
             raise ValueError("Volume must be between 0 and 7")
         
         command = build_simple_command(CMD_MASTER_VOLUME, [volume])
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._master_volume = volume
+            self._state = self._state.evolve(master_volume=volume)
             self._notify_state_change()
         return success
 
-    async def async_set_sound_volume(self, sound_source: int, volume: int, pitch: int = None) -> bool:
+    async def async_set_sound_volume(
+        self,
+        sound_source: int,
+        volume: int,
+        pitch: int = None,
+        timeout: float | None = None,
+    ) -> bool:
         """Set volume and optionally pitch for specific sound source."""
         if not 0 <= volume <= 7:
             raise ValueError("Volume must be between 0 and 7")
@@ -1035,35 +1733,25 @@ class LionelTrainCoordinator:
         else:
             command = build_simple_command(CMD_SOUND_VOLUME, [sound_source, volume])
         
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         
         if success:
             # Update state tracking based on sound source
-            if sound_source == SOUND_SOURCE_HORN:
-                self._horn_volume = volume
-                if pitch is not None:
-                    self._horn_pitch = pitch
-            elif sound_source == SOUND_SOURCE_BELL:
-                self._bell_volume = volume
-                if pitch is not None:
-                    self._bell_pitch = pitch
-            elif sound_source == SOUND_SOURCE_SPEECH:
-                self._speech_volume = volume
-                if pitch is not None:
-                    self._speech_pitch = pitch
-            elif sound_source == SOUND_SOURCE_ENGINE:
-                self._engine_volume = volume
+            prefix = SOUND_SOURCE_FIELDS.get(sound_source)
+            if prefix is not None:
+                changes = {f"{prefix}_volume": volume}
                 if pitch is not None:
-                    self._engine_pitch = pitch
+                    changes[f"{prefix}_pitch"] = pitch
+                self._state = self._state.evolve(**changes)
             
             self._notify_state_change()
         return success
 
-    async def async_set_smoke(self, on: bool) -> bool:
+    async def async_set_smoke(self, on: bool, timeout: float | None = None) -> bool:
         """Set smoke unit on/off."""
         command = build_simple_command(CMD_SMOKE, [0x01 if on else 0x00])
-        success = await self.async_send_command(command)
+        success = await self.async_send_command(command, timeout)
         if success:
-            self._smoke_on = on
+            self._state = self._state.evolve(smoke_on=on)
             self._notify_state_change()
         return success
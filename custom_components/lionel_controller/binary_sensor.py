@@ -9,7 +9,7 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import LionelTrainCoordinator
@@ -27,7 +27,10 @@ async def async_setup_entry(
     coordinator: LionelTrainCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     name = config_entry.data[CONF_NAME]
     
-    async_add_entities([LionelTrainConnectionSensor(coordinator, name)], True)
+    async_add_entities([
+        LionelTrainConnectionSensor(coordinator, name),
+        LionelTrainPresenceSensor(coordinator, name),
+    ], True)
 
 
 class LionelTrainConnectionSensor(BinarySensorEntity):
@@ -61,4 +64,41 @@ class LionelTrainConnectionSensor(BinarySensorEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return True  # This sensor is always available to show connection status
\ No newline at end of file
+        return True  # This sensor is always available to show connection status
+
+
+class LionelTrainPresenceSensor(BinarySensorEntity):
+    """Binary sensor that is on while the train is powered on and in range.
+
+    Comes from passive advertisements (or a live connection), so it needs
+    no connection to the train. Written only when presence changes.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Presence"
+    _attr_device_class = BinarySensorDeviceClass.PRESENCE
+    _attr_should_poll = False
+
+    def __init__(self, coordinator: LionelTrainCoordinator, device_name: str) -> None:
+        """Initialize the binary sensor."""
+        self._coordinator = coordinator
+        self._attr_unique_id = f"{coordinator.mac_address}_presence"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.mac_address)},
+            "name": device_name,
+        }
+        self._attr_is_on = coordinator.present
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the coordinator's updates."""
+        self._coordinator.add_update_callback(self._async_update_presence)
+        self.async_on_remove(
+            lambda: self._coordinator.remove_update_callback(self._async_update_presence)
+        )
+
+    @callback
+    def _async_update_presence(self) -> None:
+        """Write state only when presence changed."""
+        if (present := self._coordinator.present) != self._attr_is_on:
+            self._attr_is_on = present
+            self.async_write_ha_state()
@@ -10,7 +10,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import LionelTrainCoordinator
-from .const import ANNOUNCEMENTS, DOMAIN
+from .const import ANNOUNCEMENTS, BUTTON_PULSE_DURATION, CMD_BELL, CMD_HORN, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -191,10 +191,7 @@ class LionelTrainHornButton(LionelTrainButtonBase):
 
     async def async_press(self) -> None:
         """Press the button to sound horn (short blast)."""
-        import asyncio
-        await self._coordinator.async_set_horn(True)
-        await asyncio.sleep(0.3)  # Short horn blast
-        await self._coordinator.async_set_horn(False)
+        await self._coordinator.async_pulse(CMD_HORN, BUTTON_PULSE_DURATION)
 
 
 class LionelTrainBellButton(LionelTrainButtonBase):
@@ -210,10 +207,7 @@ class LionelTrainBellButton(LionelTrainButtonBase):
 
     async def async_press(self) -> None:
         """Press the button to ring bell (short ring)."""
-        import asyncio
-        await self._coordinator.async_set_bell(True)
-        await asyncio.sleep(0.3)  # Short bell ring
-        await self._coordinator.async_set_bell(False)
+        await self._coordinator.async_pulse(CMD_BELL, BUTTON_PULSE_DURATION)
 
 
 class LionelTrainAnnouncementButton(LionelTrainButtonBase):
@@ -0,0 +1,64 @@
+"""Aggregated and sampled logging for the command hot path."""
+from __future__ import annotations
+
+from collections import Counter
+
+from .const import COMMAND_NAMES
+from .metrics import LatencyHistogram
+
+
+class CommandLogSummary:
+    """Counts commands between periodic summaries instead of logging each one.
+
+    With ``sample_rate`` N > 0, every Nth sent frame is also selected for a
+    per-frame log line.
+    """
+
+    def __init__(self, sample_rate: int = 0) -> None:
+        """Initialize an empty summary."""
+        self.sample_rate = sample_rate
+        self._frames: Counter[int] = Counter()
+        self._write = LatencyHistogram()
+        self._failed = 0
+        self._coalesced = 0
+        self._sample_counter = 0
+
+    def sent(self, code: int, write_ms: float) -> bool:
+        """Count a sent frame; return True if it was sampled for logging."""
+        self._frames[code] += 1
+        self._write.record(write_ms)
+        if not self.sample_rate:
+            return False
+        self._sample_counter += 1
+        if self._sample_counter >= self.sample_rate:
+            self._sample_counter = 0
+            return True
+        return False
+
+    def failed(self) -> None:
+        """Count a failed or timed-out command."""
+        self._failed += 1
+
+    def coalesced(self, count: int = 1) -> None:
+        """Count commands merged into a later command of the same kind."""
+        self._coalesced += count
+
+    def flush(self) -> str | None:
+        """Return the summary of the interval and reset, or None if idle."""
+        if not self._frames and not self._failed and not self._coalesced:
+            return None
+        parts = [
+            f"{count} {COMMAND_NAMES.get(code, f'0x{code:02x}')} frames"
+            for code, count in self._frames.most_common()
+        ]
+        if self._coalesced:
+            parts.append(f"{self._coalesced} coalesced")
+        if self._failed:
+            parts.append(f"{self._failed} failed")
+        if self._write.count:
+            parts.append(f"p95 {self._write.percentile(0.95):g} ms")
+        self._frames.clear()
+        self._write = LatencyHistogram()
+        self._failed = 0
+        self._coalesced = 0
+        return ", ".join(parts)
@@ -0,0 +1,79 @@
+"""Store-and-forward queue for commands issued while a train is offline."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import time
+
+from .const import CMD_SOUND_VOLUME
+
+
+def command_kind(command: list[int]) -> tuple[int, ...]:
+    """Return the coalescing key for a command frame.
+
+    Commands of the same kind overwrite each other, so only the latest
+    speed, direction, lights, etc. survives. Sound volume commands are
+    keyed per sound source.
+    """
+    code = command[1]
+    if code == CMD_SOUND_VOLUME and len(command) > 2:
+        return (code, command[2])
+    return (code,)
+
+
+class PendingCommandQueue:
+    """Bounded, per-kind coalescing queue with a per-command TTL."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Initialize the queue."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._commands: OrderedDict[tuple[int, ...], tuple[list[int], float]] = OrderedDict()
+        self.coalesced = 0
+        self.expired = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of pending commands."""
+        return len(self._commands)
+
+    def __contains__(self, kind: tuple[int, ...]) -> bool:
+        """Return True if a command of this kind is pending."""
+        return kind in self._commands
+
+    def put(self, command: list[int], ttl: float | None = None) -> None:
+        """Queue a command, replacing any pending command of the same kind."""
+        kind = command_kind(command)
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        if kind in self._commands:
+            self.coalesced += 1
+            # Re-append so flush order follows the order of the latest updates
+            del self._commands[kind]
+        elif len(self._commands) >= self.max_size:
+            self._commands.popitem(last=False)
+            self.dropped += 1
+        self._commands[kind] = (list(command), expires)
+
+    def drain(self) -> list[list[int]]:
+        """Remove and return all unexpired commands in flush order."""
+        now = time.monotonic()
+        commands = []
+        for command, expires in self._commands.values():
+            if expires < now:
+                self.expired += 1
+            else:
+                commands.append(command)
+        self._commands.clear()
+        return commands
+
+    def clear(self) -> None:
+        """Discard all pending commands."""
+        self._commands.clear()
+
+    def as_dict(self) -> dict[str, int]:
+        """Return queue statistics for diagnostics."""
+        return {
+            "pending": len(self._commands),
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "dropped": self.dropped,
+        }
@@ -1,29 +1,47 @@
 """Config flow for Lionel Train Controller integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 import voluptuous as vol
-from bleak import BleakScanner
-from bleak.exc import BleakError
+import yaml
 from homeassistant import config_entries
 from homeassistant.components import bluetooth
-from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.components.bluetooth import (
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+)
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
 
 from .const import (
+    CONF_COMMAND_TIMEOUT,
+    CONF_LOG_SAMPLE_RATE,
     CONF_MAC_ADDRESS,
+    CONF_QUEUE_OFFLINE,
+    CONF_QUEUE_TTL,
+    CONF_TRACE_COMMANDS,
+    CONF_RETRY_COUNT,
     CONF_SERVICE_UUID,
     CONF_TRAIN_MODEL,
     DEFAULT_NAME,
+    DEFAULT_QUEUE_TTL,
+    DEFAULT_RETRY_COUNT,
     DEFAULT_SERVICE_UUID,
+    DEFAULT_TIMEOUT,
+    DISCOVERY_TIMEOUT,
     DOMAIN,
     LIONCHIEF_SERVICE_UUID,
+    MAX_COMMAND_TIMEOUT,
+    MAX_LOG_SAMPLE_RATE,
+    MIN_COMMAND_TIMEOUT,
 )
+from .discovery import DiscoveryIndex, async_hold_discovery_index
 from .train_models import TRAIN_MODEL_OPTIONS
 
 _LOGGER = logging.getLogger(__name__)
@@ -36,8 +54,13 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
-# Special value for manual entry option
+# Special values for the manual and bulk entry options
 MANUAL_ENTRY = "__manual_entry__"
+BULK_ENTRY = "__bulk_entry__"
+
+# Bulk step fields
+CONF_DEVICES = "devices"
+CONF_IMPORT_ROWS = "import_rows"
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
@@ -51,30 +74,65 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     if not _is_valid_mac_address(mac_address):
         raise InvalidMacAddress
 
-    # Try to discover the device
-    try:
-        scanner = BleakScanner()
-        devices = await scanner.discover(timeout=10.0)
-        
-        device_found = any(
-            device.address.upper() == mac_address.upper() for device in devices
-        )
-        
-        if not device_found:
-            raise CannotConnect
-            
-    except BleakError as err:
-        _LOGGER.exception("Error discovering Bluetooth devices")
-        raise CannotConnect from err
+    # Confirm the train is advertising: HA's cache first, then wait for it
+    mac_address = mac_address.upper()
+    if bluetooth.async_last_service_info(hass, mac_address, connectable=True) is None:
+        try:
+            await bluetooth.async_process_advertisements(
+                hass,
+                lambda service_info: True,
+                {"address": mac_address},
+                BluetoothScanningMode.ACTIVE,
+                DISCOVERY_TIMEOUT,
+            )
+        except asyncio.TimeoutError as err:
+            raise CannotConnect from err
 
     # Return info that you want to store in the config entry.
     return {
         "title": data[CONF_NAME],
-        "mac_address": mac_address.upper(),
+        "mac_address": mac_address,
         "service_uuid": data[CONF_SERVICE_UUID],
     }
 
 
+def _mac_address(value: Any) -> str:
+    """Validate a MAC address and return it upper-cased."""
+    mac = str(value).upper()
+    if not _is_valid_mac_address(mac):
+        raise vol.Invalid(f"invalid MAC address {value!r}")
+    return mac
+
+
+IMPORT_ROW_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_MAC_ADDRESS): _mac_address,
+        vol.Optional(CONF_NAME): str,
+        vol.Optional(CONF_TRAIN_MODEL): vol.In(TRAIN_MODEL_OPTIONS),
+        vol.Optional(CONF_SERVICE_UUID, default=DEFAULT_SERVICE_UUID): str,
+    }
+)
+
+
+def parse_import_rows(text: str) -> list[dict[str, Any]]:
+    """Parse a JSON or YAML list of trains to add (YAML is a superset of JSON).
+
+    Raises vol.Invalid if the text is not a list of valid rows.
+    """
+    try:
+        rows = yaml.safe_load(text)
+    except yaml.YAMLError as err:
+        raise vol.Invalid(f"not valid JSON or YAML: {err}") from err
+    if not isinstance(rows, list):
+        raise vol.Invalid("expected a list of trains")
+    return [IMPORT_ROW_SCHEMA(row) for row in rows]
+
+
+def _default_name(mac_address: str) -> str:
+    """Return a friendly name for a train known only by its address."""
+    return f"Lionel Train {mac_address[-5:].replace(':', '')}"
+
+
 def _is_valid_mac_address(mac: str) -> bool:
     """Check if MAC address is valid."""
     parts = mac.split(":")
@@ -102,6 +160,34 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._discovered_devices: dict[str, BluetoothServiceInfoBleak] = {}
         self._scanned_devices: dict[str, dict[str, Any]] = {}
         self._pending_device: dict[str, Any] | None = None
+        self._bulk_rows: dict[str, dict[str, Any]] = {}
+        self._index: DiscoveryIndex | None = None
+        self._index_releases: list[CALLBACK_TYPE] = []
+
+    @callback
+    def _async_discovery_index(self) -> DiscoveryIndex:
+        """Hold the discovery index, scanning every advertisement, while this flow is open."""
+        if self._index is None:
+            self._index, release = async_hold_discovery_index(self.hass)
+            self._index_releases = [release, self._index.async_scan_all()]
+        return self._index
+
+    @callback
+    def async_remove(self) -> None:
+        """Release the discovery index when the flow finishes or is aborted."""
+        # The index's own release must come last; it stops the index
+        for release in reversed(self._index_releases):
+            release()
+        self._index_releases = []
+        self._index = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -115,6 +201,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if selected == MANUAL_ENTRY:
                 # User wants to enter MAC address manually
                 return await self.async_step_manual()
+
+            if selected == BULK_ENTRY:
+                return await self.async_step_bulk()
             
             if selected and selected in self._scanned_devices:
                 # User selected a discovered device - proceed to train model selection
@@ -144,6 +233,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             for mac, info in self._scanned_devices.items()
         }
         device_options[MANUAL_ENTRY] = "Enter MAC address manually..."
+        device_options[BULK_ENTRY] = "Add several trains at once..."
         
         # Show description based on whether devices were found
         if not self._scanned_devices:
@@ -160,75 +250,27 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _async_scan_for_trains(self) -> None:
-        """Scan for Lionel LionChief trains via Bluetooth."""
-        self._scanned_devices = {}
-        
-        try:
-            # First, check Home Assistant's Bluetooth cache for known devices
-            service_infos = bluetooth.async_discovered_service_info(self.hass)
-            
-            _LOGGER.debug("Scanning devices from HA Bluetooth cache")
-            
-            for service_info in service_infos:
-                device_name = service_info.name or ""
-                
-                # Only show devices with name starting with "LC" (LionChief naming convention)
-                # This is the most reliable filter as the service UUID may not always be advertised
-                if not device_name.upper().startswith("LC"):
-                    continue
-                
-                _LOGGER.debug(
-                    "Found LC device: name='%s', address=%s, uuids=%s",
-                    device_name, service_info.address, service_info.service_uuids
-                )
-                
-                mac = service_info.address.upper()
-                
-                # Skip already configured devices
-                if self._is_already_configured(mac):
-                    _LOGGER.debug("Skipping already configured device: %s", mac)
-                    continue
-                
-                self._scanned_devices[mac] = {
-                    "mac_address": mac,
-                    "name": device_name,
-                }
-                _LOGGER.info("Found Lionel train: %s at %s", device_name, mac)
-            
-            # If no devices found in cache, try active scanning
-            if not self._scanned_devices:
-                _LOGGER.debug("No trains in cache, performing active scan...")
-                scanner = BleakScanner()
-                devices = await scanner.discover(timeout=10.0)
-                
-                for device in devices:
-                    device_name = device.name or ""
-                    
-                    # Only show devices with name starting with "LC"
-                    if not device_name.upper().startswith("LC"):
-                        continue
-                    
-                    mac = device.address.upper()
-                    
-                    if self._is_already_configured(mac):
-                        continue
-                    
-                    self._scanned_devices[mac] = {
-                        "mac_address": mac,
-                        "name": device_name,
-                    }
-                    _LOGGER.debug("Found Lionel train via scan: %s at %s", device_name, mac)
-                            
-
-        except BleakError as err:
-            _LOGGER.warning("Error scanning for Bluetooth devices: %s", err)
-
-    def _is_already_configured(self, mac_address: str) -> bool:
-        """Check if a device is already configured."""
-        for entry in self._async_current_entries():
-            if entry.data.get(CONF_MAC_ADDRESS, "").upper() == mac_address.upper():
-                return True
-        return False
+        """List unconfigured LionChief trains from the domain's discovery index.
+
+        Trains heard recently are listed immediately. Only if there are none
+        does the flow wait, and only until the first one advertises.
+        """
+        index = self._async_discovery_index()
+        trains = index.async_unconfigured()
+        if not trains:
+            _LOGGER.debug("No trains in the index, waiting up to %ds for one to advertise", DISCOVERY_TIMEOUT)
+            if await index.async_wait_for_unconfigured(DISCOVERY_TIMEOUT) is None:
+                return
+            # Others may have been heard while waiting for the first
+            trains = index.async_unconfigured()
+
+        self._scanned_devices = {
+            # Trains matched by service UUID alone may not advertise a name
+            train.address: {"mac_address": train.address, "name": train.name or _default_name(train.address)}
+            for train in trains
+        }
+        for train in trains:
+            _LOGGER.debug("Found Lionel train: %s at %s (rssi=%d)", train.name, train.address, train.rssi)
 
     async def async_step_manual(
         self, user_input: dict[str, Any] | None = None
@@ -294,6 +336,141 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+    async def async_step_bulk(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick any number of discovered trains and/or paste a list to import."""
+        errors: dict[str, str] = {}
+        placeholders = {"error": "", "failed": ""}
+
+        if user_input is not None:
+            rows: dict[str, dict[str, Any]] = {}
+            for mac in user_input.get(CONF_DEVICES, []):
+                if (device := self._scanned_devices.get(mac)) is not None:
+                    rows[mac] = {
+                        CONF_MAC_ADDRESS: mac,
+                        CONF_NAME: device["name"],
+                        CONF_SERVICE_UUID: DEFAULT_SERVICE_UUID,
+                    }
+            if text := user_input.get(CONF_IMPORT_ROWS, "").strip():
+                try:
+                    imported = parse_import_rows(text)
+                except vol.Invalid as err:
+                    errors[CONF_IMPORT_ROWS] = "invalid_import"
+                    placeholders["error"] = str(err)
+                else:
+                    for row in imported:
+                        mac = row[CONF_MAC_ADDRESS]
+                        row.setdefault(CONF_NAME, rows.get(mac, {}).get(CONF_NAME) or _default_name(mac))
+                        rows[mac] = row
+
+            index = self._async_discovery_index()
+            self._bulk_rows = {
+                mac: row for mac, row in rows.items() if not index.async_is_configured(mac)
+            }
+            if not errors and not self._bulk_rows:
+                errors["base"] = "no_trains_selected"
+            if not errors:
+                return await self.async_step_bulk_models()
+
+        return self._async_show_bulk_form(errors, placeholders)
+
+    @callback
+    def _async_show_bulk_form(
+        self, errors: dict[str, str], placeholders: dict[str, str]
+    ) -> FlowResult:
+        """Show the bulk selection form."""
+        device_options = {
+            mac: f"{info['name']} ({mac})" for mac, info in self._scanned_devices.items()
+        }
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_DEVICES, default=list(device_options)): cv.multi_select(
+                        device_options
+                    ),
+                    vol.Optional(CONF_IMPORT_ROWS, default=""): str,
+                }
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_bulk_models(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose a model per train, then validate all of them and create the entries."""
+        labels = {
+            f"{row[CONF_NAME]} ({mac})": mac for mac, row in self._bulk_rows.items()
+        }
+        errors: dict[str, str] = {}
+        placeholders = {"failed": ""}
+
+        if user_input is not None:
+            for label, mac in labels.items():
+                self._bulk_rows[mac][CONF_TRAIN_MODEL] = user_input.get(label, "Generic")
+
+            # Validate every train at once; cached trains return immediately
+            rows = list(self._bulk_rows.values())
+            results = await asyncio.gather(
+                *(validate_input(self.hass, row) for row in rows), return_exceptions=True
+            )
+            failed = [row for row, result in zip(rows, results) if isinstance(result, Exception)]
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception) and not isinstance(result, HomeAssistantError):
+                    _LOGGER.error("Unexpected error validating %s: %s", row[CONF_MAC_ADDRESS], result)
+
+            if failed:
+                # Drop them so submitting again adds the rest
+                for row in failed:
+                    del self._bulk_rows[row[CONF_MAC_ADDRESS]]
+                errors["base"] = "bulk_cannot_connect"
+                placeholders["failed"] = ", ".join(
+                    f"{row[CONF_NAME]} ({row[CONF_MAC_ADDRESS]})" for row in failed
+                )
+                if not self._bulk_rows:
+                    return self._async_show_bulk_form(errors, {"error": "", **placeholders})
+            else:
+                return await self._async_create_bulk_entries(rows)
+
+        return self.async_show_form(
+            step_id="bulk_models",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        label, default=self._bulk_rows[mac].get(CONF_TRAIN_MODEL, "Generic")
+                    ): vol.In(TRAIN_MODEL_OPTIONS)
+                    for label, mac in labels.items()
+                    if mac in self._bulk_rows
+                }
+            ),
+            errors=errors,
+            description_placeholders={"count": str(len(self._bulk_rows)), **placeholders},
+        )
+
+    async def _async_create_bulk_entries(self, rows: list[dict[str, Any]]) -> FlowResult:
+        """Create an entry per train: the first from this flow, the rest as imports."""
+        first, *others = rows
+        await asyncio.gather(
+            *(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=row
+                )
+                for row in others
+            )
+        )
+        _LOGGER.debug("Added %d trains in one pass", len(rows))
+        await self.async_set_unique_id(first[CONF_MAC_ADDRESS], raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=first[CONF_NAME], data=first)
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a train validated by a bulk onboarding flow."""
+        await self.async_set_unique_id(import_data[CONF_MAC_ADDRESS], raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> FlowResult:
@@ -355,6 +532,57 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle options for a Lionel train."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage command delivery options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_COMMAND_TIMEOUT,
+                        default=options.get(CONF_COMMAND_TIMEOUT, DEFAULT_TIMEOUT),
+                    ): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=MIN_COMMAND_TIMEOUT, max=MAX_COMMAND_TIMEOUT),
+                    ),
+                    vol.Optional(
+                        CONF_RETRY_COUNT,
+                        default=options.get(CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                    vol.Optional(
+                        CONF_QUEUE_OFFLINE,
+                        default=options.get(CONF_QUEUE_OFFLINE, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_QUEUE_TTL,
+                        default=options.get(CONF_QUEUE_TTL, DEFAULT_QUEUE_TTL),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=10, max=86400)),
+                    vol.Optional(
+                        CONF_TRACE_COMMANDS,
+                        default=options.get(CONF_TRACE_COMMANDS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_LOG_SAMPLE_RATE,
+                        default=options.get(CONF_LOG_SAMPLE_RATE, 0),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_LOG_SAMPLE_RATE)),
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -0,0 +1,157 @@
+"""Consists: several locomotives driven as one train."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from . import LionelTrainCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of recent skew samples kept per consist
+SKEW_HISTORY = 50
+
+
+@dataclass
+class ConsistMember:
+    """A locomotive in a consist."""
+
+    coordinator: LionelTrainCoordinator
+    trim: int = 0  # Speed offset (percent) to match this engine to the others
+    reverse: bool = False  # Runs backwards relative to the consist (back-to-back)
+
+    def speed_for(self, speed: int) -> int:
+        """Map the consist speed to this member's speed."""
+        if speed == 0:
+            return 0
+        return max(0, min(100, speed + self.trim))
+
+    def forward_for(self, forward: bool) -> bool:
+        """Map the consist direction to this member's direction."""
+        return forward != self.reverse
+
+
+class LionelConsist:
+    """Group of coordinators whose speed and direction are written as one burst."""
+
+    def __init__(self, consist_id: str, members: list[ConsistMember]) -> None:
+        """Initialize the consist."""
+        self.consist_id = consist_id
+        self.members = members
+        self.speed = 0
+        self.forward = True
+        self._skews: deque[float] = deque(maxlen=SKEW_HISTORY)
+
+    @property
+    def last_skew_ms(self) -> float | None:
+        """Return the inter-member skew of the last command."""
+        return self._skews[-1] if self._skews else None
+
+    def contains(self, coordinator: LionelTrainCoordinator) -> bool:
+        """Return True if the coordinator is a member of this consist."""
+        return any(member.coordinator is coordinator for member in self.members)
+
+    async def async_set_speed(self, speed: int, timeout: float | None = None) -> dict[str, Any]:
+        """Set the speed of every member, applying per-member trim."""
+        result = await self._async_burst(
+            lambda member, remaining: member.coordinator.async_set_speed(
+                member.speed_for(speed), timeout=remaining
+            ),
+            timeout,
+        )
+        if result["success"]:
+            self.speed = speed
+        return result
+
+    async def async_set_direction(self, forward: bool, timeout: float | None = None) -> dict[str, Any]:
+        """Set the direction of every member, honouring reversed members."""
+        result = await self._async_burst(
+            lambda member, remaining: member.coordinator.async_set_direction(
+                member.forward_for(forward), timeout=remaining
+            ),
+            timeout,
+        )
+        if result["success"]:
+            self.forward = forward
+        return result
+
+    async def _async_burst(
+        self,
+        action: Callable[[ConsistMember, float], Awaitable[bool]],
+        timeout: float | None,
+    ) -> dict[str, Any]:
+        """Issue one command per member as a tightly aligned concurrent burst.
+
+        Members are connected first, so the burst itself only contains the
+        GATT writes and the engines pick up the change together. Connecting
+        and writing share one deadline per member (``timeout``, or else the
+        member's command timeout); the write gets only the time remaining.
+        """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+
+        def _remaining(member: ConsistMember) -> float:
+            budget = member.coordinator.command_timeout if timeout is None else timeout
+            return max(started_at + budget - loop.time(), 0.0)
+
+        connected = await asyncio.gather(
+            *(
+                member.coordinator.async_ensure_connected(_remaining(member))
+                for member in self.members
+            )
+        )
+        if not all(connected):
+            missing = [
+                member.coordinator.name
+                for member, ok in zip(self.members, connected)
+                if not ok
+            ]
+            _LOGGER.warning("Consist %s not sent, members offline: %s", self.consist_id, missing)
+            return {"success": False, "offline": missing, "skew_ms": None}
+
+        async def _timed(member: ConsistMember) -> tuple[bool, float]:
+            success = await action(member, _remaining(member))
+            return success, time.perf_counter()
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_timed(member) for member in self.members))
+        finished = [done for _, done in results]
+        skew_ms = round((max(finished) - min(finished)) * 1000, 2)
+        self._skews.append(skew_ms)
+
+        _LOGGER.debug(
+            "Consist %s burst to %d members: skew %.2f ms, total %.2f ms",
+            self.consist_id, len(self.members), skew_ms,
+            (max(finished) - started) * 1000,
+        )
+        return {
+            "success": all(success for success, _ in results),
+            "skew_ms": skew_ms,
+            "total_ms": round((max(finished) - started) * 1000, 2),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the consist layout and skew statistics."""
+        skews = list(self._skews)
+        return {
+            "members": [
+                {
+                    "name": member.coordinator.name,
+                    "device_id": member.coordinator.device_id,
+                    "trim": member.trim,
+                    "reverse": member.reverse,
+                }
+                for member in self.members
+            ],
+            "speed": self.speed,
+            "forward": self.forward,
+            "last_skew_ms": self.last_skew_ms,
+            "max_skew_ms": max(skews) if skews else None,
+            "mean_skew_ms": round(sum(skews) / len(skews), 2) if skews else None,
+        }
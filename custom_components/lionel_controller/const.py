@@ -2,6 +2,11 @@
 
 DOMAIN = "lionel_controller"
 
+# Keys in hass.data[DOMAIN] besides the per-entry coordinators
+DATA_DEVICE_INDEX = "device_index"  # device_id -> LionelTrainCoordinator
+DATA_CONSISTS = "consists"  # consist_id -> LionelConsist
+DATA_DISCOVERY = "discovery"  # DiscoveryIndex shared by flows and coordinators
+
 # Service UUIDs
 LIONCHIEF_SERVICE_UUID = "e20a39f4-73f5-4bc4-a12f-17d1ad07a961"
 DEVICE_INFO_SERVICE_UUID = "0000180a-0000-1000-8000-00805f9b34fb"
@@ -41,6 +46,20 @@ CMD_SOUND_VOLUME = 0x44   # Volume/pitch for individual sound sources
 # New advanced command codes
 CMD_SMOKE = 0x52          # Smoke unit control (estimated)
 
+# Command names used in log summaries
+COMMAND_NAMES = {
+    CMD_SPEED: "speed",
+    CMD_DIRECTION: "direction",
+    CMD_BELL: "bell",
+    CMD_HORN: "horn",
+    CMD_ANNOUNCEMENT: "announcement",
+    CMD_DISCONNECT: "disconnect",
+    CMD_LIGHTS: "lights",
+    CMD_MASTER_VOLUME: "master volume",
+    CMD_SOUND_VOLUME: "sound volume",
+    CMD_SMOKE: "smoke",
+}
+
 # Direction values (third byte for direction commands)
 DIRECTION_FORWARD = 0x01
 DIRECTION_REVERSE = 0x02
@@ -57,16 +76,85 @@ VOLUME_MAX = 7
 PITCH_MIN = -2
 PITCH_MAX = 2
 
+# Sound settings a locomotive has after power-on; only differences are replayed
+DEFAULT_VOLUME = 5
+DEFAULT_PITCH = 0
+
 # Configuration keys
 CONF_MAC_ADDRESS = "mac_address"
 CONF_SERVICE_UUID = "service_uuid"
 CONF_TRAIN_MODEL = "train_model"
 
+# Options (editable after setup)
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_RETRY_COUNT = "retry_count"
+CONF_QUEUE_OFFLINE = "queue_offline"
+CONF_QUEUE_TTL = "queue_ttl"
+CONF_TRACE_COMMANDS = "trace_commands"
+CONF_LOG_SAMPLE_RATE = "log_sample_rate"
+
 # Default values
 DEFAULT_NAME = "Lionel Train"
-DEFAULT_TIMEOUT = 10.0
+DEFAULT_TIMEOUT = 10.0  # Deadline (seconds) covering lock wait, connect and write
 DEFAULT_RETRY_COUNT = 3
 
+# Longest the config flow waits for an advertisement not yet in HA's cache (seconds)
+DISCOVERY_TIMEOUT = 10
+
+# Trains not heard from for this long drop out of the discovery index (seconds)
+DISCOVERY_TTL = 300
+DISCOVERY_EVICT_INTERVAL = 60
+
+# Bounds for the per-entry command deadline
+MIN_COMMAND_TIMEOUT = 1.0
+MAX_COMMAND_TIMEOUT = 60.0
+
+# Store-and-forward queue for commands issued while disconnected
+DEFAULT_QUEUE_TTL = 300.0  # Seconds a queued command stays valid
+DEFAULT_QUEUE_SIZE = 16    # Max distinct command kinds held per train
+
+# Horn/bell pulse lengths (seconds)
+DEFAULT_HORN_DURATION = 0.5  # Services
+BUTTON_PULSE_DURATION = 0.3  # Horn/Bell buttons
+MIN_PULSE_DURATION = 0.1
+MAX_PULSE_DURATION = 10.0
+
+# Persisted train state
+STORAGE_VERSION = 1
+STATE_SAVE_DELAY = 10  # Seconds to debounce state snapshot writes
+
+# Fleet-wide broadcast commands
+DEFAULT_FLEET_CONCURRENCY = 8  # Trains commanded in parallel
+MAX_FLEET_CONCURRENCY = 64
+
+# Command logging: summary interval (seconds) and sampled per-frame logging (1 in N, 0 = off)
+LOG_SUMMARY_INTERVAL = 60
+MAX_LOG_SAMPLE_RATE = 1000
+
+# Entries kept in memory for the diagnostics download
+CONNECTION_HISTORY_SIZE = 50
+FRAME_HISTORY_SIZE = 100
+
+# Seconds between updates of the latency/throughput diagnostic sensors
+METRICS_PUBLISH_INTERVAL = 60
+
+# Presence from passive advertisements: enter/exit hysteresis on smoothed RSSI (dBm)
+PRESENCE_ENTER_RSSI = -90
+PRESENCE_EXIT_RSSI = -97
+PRESENCE_ENTER_ADVERTISEMENTS = 2
+# A silent train is absent after max(PRESENCE_TIMEOUT, N x its advertisement interval)
+PRESENCE_TIMEOUT = 30
+PRESENCE_MISSED_INTERVALS = 5
+PRESENCE_CHECK_INTERVAL = 5  # Seconds between absence checks
+SIGNAL_PUBLISH_INTERVAL = 30  # Seconds between updates of the signal strength sensor
+AVAILABILITY_RETRY_INTERVAL = 10  # Seconds between connects to an advertising train that refuses them
+AVAILABILITY_POLL_INTERVAL = 30  # Seconds between device lookups when no advertisement wakes the monitor
+
+# Recorded driving sessions
+SESSIONS_DIR = "lionel_sessions"  # Under the Home Assistant config directory
+MIN_REPLAY_RATE = 0.25
+MAX_REPLAY_RATE = 4.0
+
 # Enhanced announcement sounds with proper command structure
 ANNOUNCEMENTS = {
     "Random": {"code": 0x00, "name": "Random"},
@@ -0,0 +1,73 @@
+"""Diagnostics support for the Lionel Train Controller integration."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import LionelTrainCoordinator
+from .const import CONF_MAC_ADDRESS, DOMAIN
+
+TO_REDACT = {CONF_MAC_ADDRESS, "serial_number", "unique_id"}
+
+
+def _scrub_address(value: Any, address: str) -> Any:
+    """Replace the train's address inside free-text values such as error messages."""
+    if isinstance(value, str):
+        return value.replace(address, REDACTED).replace(address.lower(), REDACTED)
+    if isinstance(value, dict):
+        return {key: _scrub_address(item, address) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scrub_address(item, address) for item in value]
+    return value
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Everything comes from data the coordinator already holds in memory;
+    collecting it causes no Bluetooth traffic.
+    """
+    coordinator: LionelTrainCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    diagnostics = async_redact_data(
+        {
+            "entry": {
+                "title": entry.title,
+                "unique_id": entry.unique_id,
+                "data": dict(entry.data),
+                "options": dict(entry.options),
+            },
+            "link": coordinator.link_status,
+            "presence": coordinator.presence_status,
+            "connection_history": coordinator.connection_history,
+            "state": asdict(coordinator.state),
+            "device": coordinator.device_info,
+            "counters": {
+                "connection_attempts": coordinator.connection_attempts,
+                "successful_commands": coordinator.successful_commands,
+                "failed_commands": coordinator.failed_commands,
+                "timed_out_commands": coordinator.timed_out_commands,
+                "last_error": coordinator.last_error,
+                "last_error_time": coordinator.last_error_time,
+            },
+            "metrics": coordinator.metrics.as_dict(),
+            "traces": coordinator.tracer.as_dict()["by_command"],
+            "queue": {"enabled": coordinator.queue_offline, **coordinator.queue_stats},
+            "sequence": {
+                "running": coordinator.running_sequence,
+                "last_report": coordinator.last_sequence_report,
+                "recording": coordinator.recording,
+            },
+            "startup_timings": coordinator.startup_timings,
+            "recent_frames": coordinator.frame_history,
+            "gatt_services": coordinator.gatt_layout,
+        },
+        TO_REDACT,
+    )
+    return _scrub_address(diagnostics, coordinator.mac_address.upper())
@@ -0,0 +1,323 @@
+"""Domain-wide index of LionChief trains heard by HA's Bluetooth manager."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+
+from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import (
+    MONOTONIC_TIME,
+    BluetoothChange,
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+)
+from homeassistant.config_entries import (
+    SIGNAL_CONFIG_ENTRY_CHANGED,
+    SOURCE_IGNORE,
+    ConfigEntry,
+    ConfigEntryChange,
+)
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CONF_MAC_ADDRESS,
+    DATA_DISCOVERY,
+    DISCOVERY_EVICT_INTERVAL,
+    DISCOVERY_TTL,
+    DOMAIN,
+    LIONCHIEF_SERVICE_UUID,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_LIONCHIEF_SERVICE_UUID = LIONCHIEF_SERVICE_UUID.lower()
+
+
+def is_lionchief_name(name: str | None) -> bool:
+    """Return True for the LionChief advertising name convention (LC...)."""
+    # More reliable than the service UUID, which is not always advertised
+    return bool(name) and name.upper().startswith("LC")
+
+
+def is_lionchief(service_info: BluetoothServiceInfoBleak) -> bool:
+    """Return True if an advertisement looks like a LionChief locomotive."""
+    return is_lionchief_name(service_info.name) or _LIONCHIEF_SERVICE_UUID in (
+        uuid.lower() for uuid in service_info.service_uuids
+    )
+
+
+def _entry_address(entry: ConfigEntry) -> str | None:
+    """Return the upper-cased MAC address of a train's config entry."""
+    address = entry.data.get(CONF_MAC_ADDRESS) or entry.unique_id
+    return address.upper() if address else None
+
+
+@dataclass(slots=True)
+class DiscoveredTrain:
+    """The latest advertisement heard from a train."""
+
+    address: str
+    name: str | None
+    rssi: int
+    last_seen: float  # MONOTONIC_TIME() of the advertisement
+    connectable: bool
+    configured: bool
+
+
+class DiscoveryIndex:
+    """MAC -> latest advertisement of every LionChief train, kept current by HA.
+
+    The index is the domain's single consumer of Bluetooth advertisements.
+    It follows the LionChief service UUID from manifest.json, plus one
+    address matcher per configured train, which it forwards to that train's
+    coordinator. While a config flow is open it also looks at every
+    advertisement, to catch trains that only advertise their LC name.
+    Entries not heard from for ``DISCOVERY_TTL`` seconds are treated as gone
+    and swept periodically. The index runs while anything holds it and stops
+    on the last release (see async_hold_discovery_index).
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl: float = DISCOVERY_TTL) -> None:
+        """Initialize an empty index; call async_start to feed it."""
+        self.hass = hass
+        self.ttl = ttl
+        self._trains: dict[str, DiscoveredTrain] = {}
+        self._configured: set[str] = set()
+        self._waiters: set[asyncio.Future[DiscoveredTrain]] = set()
+        self._unsubscribers: list[CALLBACK_TYPE] = []
+        self._tracked: dict[str, CALLBACK_TYPE] = {}  # MAC -> address callback
+        self._scan_all: CALLBACK_TYPE | None = None
+        self._scan_holders = 0
+        self.holders = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Load the configured trains and the cache, then follow new advertisements."""
+        self._configured = {
+            address
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.source != SOURCE_IGNORE and (address := _entry_address(entry))
+        }
+        for service_info in bluetooth.async_discovered_service_info(self.hass, connectable=False):
+            self._async_on_advertisement(service_info, BluetoothChange.ADVERTISEMENT)
+
+        self._unsubscribers = [
+            bluetooth.async_register_callback(
+                self.hass,
+                self._async_on_advertisement,
+                {"service_uuid": _LIONCHIEF_SERVICE_UUID, "connectable": False},
+                BluetoothScanningMode.PASSIVE,
+            ),
+            async_dispatcher_connect(
+                self.hass, SIGNAL_CONFIG_ENTRY_CHANGED, self._async_on_entry_changed
+            ),
+            async_track_time_interval(
+                self.hass, self._async_evict, timedelta(seconds=DISCOVERY_EVICT_INTERVAL)
+            ),
+            self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_on_stop),
+        ]
+        _LOGGER.debug(
+            "Discovery index started with %d trains, %d configured",
+            len(self._trains), len(self._configured),
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following advertisements and release any waiting flow."""
+        for unsubscribe in (*self._unsubscribers, *self._tracked.values()):
+            unsubscribe()
+        self._unsubscribers = []
+        self._tracked.clear()
+        if self._scan_all is not None:
+            self._scan_all()
+            self._scan_all = None
+        for waiter in self._waiters:
+            waiter.cancel()
+        self._waiters.clear()
+        _LOGGER.debug("Discovery index stopped")
+
+    @callback
+    def _async_on_stop(self, event: Event) -> None:
+        """Stop with Home Assistant; the stop listener is already removed."""
+        self._unsubscribers.pop()
+        self.async_stop()
+
+    @callback
+    def async_track_train(
+        self, address: str, listener: Callable[[BluetoothServiceInfoBleak], None]
+    ) -> CALLBACK_TYPE:
+        """Forward every advertisement of a configured train to its listener.
+
+        An address matcher is dispatched by HA in O(1), and HA replays the
+        cached advertisement, if any, on registration.
+        """
+        address = address.upper()
+
+        @callback
+        def _async_on_train_advertisement(
+            service_info: BluetoothServiceInfoBleak, change: BluetoothChange
+        ) -> None:
+            self._async_on_advertisement(service_info, change)
+            listener(service_info)
+
+        self._tracked[address] = bluetooth.async_register_callback(
+            self.hass,
+            _async_on_train_advertisement,
+            {"address": address, "connectable": False},
+            BluetoothScanningMode.PASSIVE,
+        )
+
+        @callback
+        def _async_untrack() -> None:
+            if (unsubscribe := self._tracked.pop(address, None)) is not None:
+                unsubscribe()
+
+        return _async_untrack
+
+    @callback
+    def async_scan_all(self) -> CALLBACK_TYPE:
+        """Look at every advertisement until the returned callback is called.
+
+        Config flows use this to find trains that advertise an LC name but
+        not the service UUID; nothing else pays for the catch-all callback.
+        """
+        if self._scan_holders == 0:
+            self._scan_all = bluetooth.async_register_callback(
+                self.hass, self._async_on_advertisement, None, BluetoothScanningMode.PASSIVE
+            )
+        self._scan_holders += 1
+        released = False
+
+        @callback
+        def _async_release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._scan_holders -= 1
+            if self._scan_holders == 0 and self._scan_all is not None:
+                self._scan_all()
+                self._scan_all = None
+
+        return _async_release
+
+    @callback
+    def _async_on_advertisement(
+        self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange
+    ) -> None:
+        """Record an advertisement from a LionChief or configured train."""
+        address = service_info.address.upper()
+        train = self._trains.get(address)
+        if train is None:
+            configured = address in self._configured
+            if not configured and not is_lionchief(service_info):
+                return
+            train = self._trains[address] = DiscoveredTrain(
+                address,
+                service_info.name,
+                service_info.rssi,
+                service_info.time,
+                service_info.connectable,
+                configured,
+            )
+        else:
+            train.name = service_info.name or train.name
+            train.rssi = service_info.rssi
+            train.last_seen = service_info.time
+            train.connectable = service_info.connectable
+        if self._waiters and train.connectable and not train.configured:
+            for waiter in self._waiters:
+                if not waiter.done():
+                    waiter.set_result(train)
+
+    @callback
+    def _async_on_entry_changed(self, change: ConfigEntryChange, entry: ConfigEntry) -> None:
+        """Keep the configured flags in step with this domain's config entries."""
+        if entry.domain != DOMAIN or (address := _entry_address(entry)) is None:
+            return
+        configured = change is not ConfigEntryChange.REMOVED and entry.source != SOURCE_IGNORE
+        if configured:
+            self._configured.add(address)
+        else:
+            self._configured.discard(address)
+        if (train := self._trains.get(address)) is not None:
+            train.configured = configured
+
+    @callback
+    def _async_evict(self, now=None) -> None:
+        """Drop trains not heard from within the TTL."""
+        cutoff = MONOTONIC_TIME() - self.ttl
+        expired = [address for address, train in self._trains.items() if train.last_seen < cutoff]
+        for address in expired:
+            del self._trains[address]
+        if expired:
+            _LOGGER.debug("Evicted %d trains not heard from in %ds", len(expired), self.ttl)
+
+    @callback
+    def async_get(self, address: str) -> DiscoveredTrain | None:
+        """Return a train heard within the TTL, or None."""
+        train = self._trains.get(address.upper())
+        if train is None or MONOTONIC_TIME() - train.last_seen > self.ttl:
+            return None
+        return train
+
+    @callback
+    def async_is_configured(self, address: str) -> bool:
+        """Return True if a (non-ignored) config entry exists for the address."""
+        return address.upper() in self._configured
+
+    @callback
+    def async_unconfigured(self) -> list[DiscoveredTrain]:
+        """Return the connectable, unconfigured trains heard within the TTL."""
+        cutoff = MONOTONIC_TIME() - self.ttl
+        return [
+            train
+            for train in self._trains.values()
+            if not train.configured and train.connectable and train.last_seen >= cutoff
+        ]
+
+    async def async_wait_for_unconfigured(self, timeout: float) -> DiscoveredTrain | None:
+        """Wait until a new unconfigured train advertises, or return None on timeout."""
+        waiter: asyncio.Future[DiscoveredTrain] = self.hass.loop.create_future()
+        self._waiters.add(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters.discard(waiter)
+
+
+@callback
+def async_hold_discovery_index(hass: HomeAssistant) -> tuple[DiscoveryIndex, CALLBACK_TYPE]:
+    """Return the domain's discovery index and a callback releasing it.
+
+    The index starts with its first holder (a config entry or an open
+    config flow) and stops when the last one releases it.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (index := domain_data.get(DATA_DISCOVERY)) is None:
+        index = domain_data[DATA_DISCOVERY] = DiscoveryIndex(hass)
+        index.async_start()
+    index.holders += 1
+    released = False
+
+    @callback
+    def _async_release() -> None:
+        nonlocal released
+        if released:
+            return
+        released = True
+        index.holders -= 1
+        if index.holders == 0:
+            index.async_stop()
+            if hass.data.get(DOMAIN, {}).get(DATA_DISCOVERY) is index:
+                del hass.data[DOMAIN][DATA_DISCOVERY]
+
+    return index, _async_release
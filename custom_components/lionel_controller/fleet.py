@@ -0,0 +1,67 @@
+"""Fleet-wide broadcast of commands across every configured train."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from . import LionelTrainCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_fleet_broadcast(
+    coordinators: Iterable[LionelTrainCoordinator],
+    action: Callable[[LionelTrainCoordinator], Awaitable[bool]],
+    max_concurrency: int,
+) -> dict[str, Any]:
+    """Run an action on every train concurrently, at most max_concurrency at a time.
+
+    Returns per-train results (keyed by MAC address) and the total
+    completion time, so one slow, absent or failing locomotive is visible
+    without delaying the others or losing their results.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    started = time.perf_counter()
+
+    async def _run(coordinator: LionelTrainCoordinator) -> tuple[str, dict[str, Any]]:
+        async with semaphore:
+            train_started = time.perf_counter()
+            error = None
+            try:
+                success = bool(await action(coordinator))
+            except (ValueError, asyncio.TimeoutError) as err:
+                success = False
+                error = str(err)
+            except Exception as err:  # pylint: disable=broad-except
+                # One train's failure must not lose the other trains' results
+                _LOGGER.exception("Fleet command failed on %s", coordinator.name)
+                success = False
+                error = str(err) or type(err).__name__
+            result = {
+                "name": coordinator.name,
+                "success": success,
+                "duration_ms": round((time.perf_counter() - train_started) * 1000, 1),
+            }
+            if error is not None:
+                result["error"] = error
+            return coordinator.mac_address, result
+
+    results = dict(await asyncio.gather(*(_run(c) for c in coordinators)))
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+    succeeded = sum(1 for result in results.values() if result["success"])
+
+    _LOGGER.debug(
+        "Fleet broadcast to %d trains finished in %.1f ms (%d ok, %d failed)",
+        len(results), total_ms, succeeded, len(results) - succeeded,
+    )
+    return {
+        "trains": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "total_ms": total_ms,
+    }
+
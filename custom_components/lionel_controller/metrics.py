@@ -0,0 +1,126 @@
+"""Latency histograms and throughput counters for a train's link."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+import time
+from typing import Any
+
+# Bucket upper bounds (ms); one overflow bucket follows the last bound
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+DOWNTIME_BUCKETS_MS = (1000, 2000, 5000, 10000, 30000, 60000, 120000, 300000, 600000, 1800000, 3600000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; recording costs a bisect over a fixed bound list."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[int, ...] = LATENCY_BUCKETS_MS) -> None:
+        """Initialize an empty histogram."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        """Add a sample."""
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                # The overflow bucket and any bucket above the largest sample report the max
+                if index == len(self.bounds):
+                    return round(self.max, 1)
+                return min(float(self.bounds[index]), round(self.max, 1))
+        return round(self.max, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return summary statistics."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else None,
+            "max_ms": round(self.max, 1) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+        }
+
+
+class TrainMetrics:
+    """Link metrics updated on the hot path with constant-time operations."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.lock_wait = LatencyHistogram()
+        self.write = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.reconnect_downtime = LatencyHistogram(DOWNTIME_BUCKETS_MS)
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.notifications = 0
+        self.rates: dict[str, float] = {
+            "frames_per_s": 0.0, "bytes_per_s": 0.0, "notifications_per_s": 0.0
+        }
+        self._down_since: float | None = None
+        self._sampled_at = time.monotonic()
+        self._sampled = (0, 0, 0)
+
+    def frame_sent(self, length: int) -> None:
+        """Count a written frame."""
+        self.frames_sent += 1
+        self.bytes_sent += length
+
+    def link_down(self) -> None:
+        """Note that an established link was lost."""
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+
+    def link_up(self) -> None:
+        """Record how long the link was down, if it had been up before."""
+        if self._down_since is not None:
+            self.reconnect_downtime.record((time.monotonic() - self._down_since) * 1000)
+            self._down_since = None
+
+    def sample_rates(self) -> dict[str, float]:
+        """Compute rates since the previous sample; called at the publish interval."""
+        now = time.monotonic()
+        elapsed = now - self._sampled_at
+        totals = (self.frames_sent, self.bytes_sent, self.notifications)
+        if elapsed > 0:
+            frames, sent, notifications = (
+                (total - previous) / elapsed for total, previous in zip(totals, self._sampled)
+            )
+            self.rates = {
+                "frames_per_s": round(frames, 2),
+                "bytes_per_s": round(sent, 2),
+                "notifications_per_s": round(notifications, 2),
+            }
+        self._sampled_at = now
+        self._sampled = totals
+        return self.rates
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all histograms, totals and the last sampled rates."""
+        return {
+            "lock_wait": self.lock_wait.as_dict(),
+            "write": self.write.as_dict(),
+            "connect": self.connect.as_dict(),
+            "reconnect_downtime": self.reconnect_downtime.as_dict(),
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "notifications": self.notifications,
+            **self.rates,
+        }
@@ -7,7 +7,7 @@ from typing import Any
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import LionelTrainCoordinator
@@ -56,22 +56,31 @@ class LionelTrainThrottle(NumberEntity):
             "name": name,
             **coordinator.device_info,
         }
+        self._written: tuple[int, bool] | None = None  # (state version, available)
         # Register for state updates
-        self._coordinator.add_update_callback(self.async_write_ha_state)
+        self._coordinator.add_update_callback(self._async_state_updated)
 
     async def async_will_remove_from_hass(self) -> None:
         """Entity being removed from hass."""
-        self._coordinator.remove_update_callback(self.async_write_ha_state)
+        self._coordinator.remove_update_callback(self._async_state_updated)
+
+    @callback
+    def _async_state_updated(self) -> None:
+        """Write the state only if the snapshot or availability changed."""
+        written = (self._coordinator.state.version, self.available)
+        if written != self._written:
+            self._written = written
+            self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def native_value(self) -> float | None:
         """Return the current throttle value."""
-        return self._coordinator.speed
+        return self._coordinator.state.speed
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the throttle value."""
@@ -103,12 +112,12 @@ class LionelTrainMasterVolume(NumberEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def native_value(self) -> float | None:
         """Return the current master volume."""
-        return self._coordinator.master_volume
+        return self._coordinator.state.master_volume
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the master volume."""
@@ -140,12 +149,12 @@ class LionelTrainHornVolume(NumberEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def native_value(self) -> float | None:
         """Return the current horn volume."""
-        return self._coordinator.horn_volume
+        return self._coordinator.state.horn_volume
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the horn volume."""
@@ -178,12 +187,12 @@ class LionelTrainBellVolume(NumberEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def native_value(self) -> float | None:
         """Return the current bell volume."""
-        return self._coordinator.bell_volume
+        return self._coordinator.state.bell_volume
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the bell volume."""
@@ -216,12 +225,12 @@ class LionelTrainSpeechVolume(NumberEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def native_value(self) -> float | None:
         """Return the current speech volume."""
-        return self._coordinator.speech_volume
+        return self._coordinator.state.speech_volume
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the speech volume."""
@@ -254,12 +263,12 @@ class LionelTrainEngineVolume(NumberEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def native_value(self) -> float | None:
         """Return the current engine volume."""
-        return self._coordinator.engine_volume
+        return self._coordinator.state.engine_volume
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the engine volume."""
@@ -0,0 +1,108 @@
+"""Presence and signal strength of a train from its passive advertisements."""
+from __future__ import annotations
+
+from typing import Any
+
+from .const import (
+    PRESENCE_ENTER_ADVERTISEMENTS,
+    PRESENCE_ENTER_RSSI,
+    PRESENCE_EXIT_RSSI,
+    PRESENCE_MISSED_INTERVALS,
+    PRESENCE_TIMEOUT,
+)
+
+# Smoothing factors of the moving averages (weight of the newest sample)
+RSSI_ALPHA = 0.3
+INTERVAL_ALPHA = 0.2
+
+
+class AdvertisementTracker:
+    """EWMA RSSI and advertisement interval with a hysteresis presence decision.
+
+    Recording an advertisement is O(1) and allocates nothing. A train
+    becomes present after ``PRESENCE_ENTER_ADVERTISEMENTS`` advertisements
+    with a smoothed RSSI of at least ``PRESENCE_ENTER_RSSI``. It stays
+    present until its smoothed RSSI falls below the lower
+    ``PRESENCE_EXIT_RSSI`` or it is silent for longer than the larger of
+    ``PRESENCE_TIMEOUT`` and ``PRESENCE_MISSED_INTERVALS`` of its own
+    advertisement intervals. The two thresholds keep a train at the edge
+    of range from flapping.
+    """
+
+    __slots__ = ("rssi", "interval", "last_seen", "present", "advertisements", "_streak")
+
+    def __init__(self) -> None:
+        """Initialize a tracker that has heard nothing yet."""
+        self.rssi: float | None = None  # Smoothed RSSI (dBm)
+        self.interval: float | None = None  # Smoothed advertisement interval (seconds)
+        self.last_seen: float | None = None  # Monotonic time of the last advertisement
+        self.present = False
+        self.advertisements = 0
+        self._streak = 0  # Advertisements since the train was last absent
+
+    @property
+    def timeout(self) -> float:
+        """Return how long the train may be silent before it counts as absent."""
+        if self.interval is None:
+            return PRESENCE_TIMEOUT
+        return max(PRESENCE_TIMEOUT, self.interval * PRESENCE_MISSED_INTERVALS)
+
+    def record(self, rssi: int, seen: float) -> bool:
+        """Add an advertisement heard at monotonic time seen; return True if presence changed."""
+        self.advertisements += 1
+        if self.rssi is None:
+            self.rssi = float(rssi)
+        else:
+            self.rssi += RSSI_ALPHA * (rssi - self.rssi)
+
+        if self.last_seen is not None:
+            gap = seen - self.last_seen
+            # A gap longer than the timeout is the train reappearing, not its interval
+            if 0 < gap <= self.timeout:
+                if self.interval is None:
+                    self.interval = gap
+                else:
+                    self.interval += INTERVAL_ALPHA * (gap - self.interval)
+            elif gap > self.timeout:
+                self._streak = 0
+        self.last_seen = seen
+        self._streak += 1
+
+        if self.present:
+            if self.rssi < PRESENCE_EXIT_RSSI:
+                return self._set_present(False)
+            return False
+        if self._streak >= PRESENCE_ENTER_ADVERTISEMENTS and self.rssi >= PRESENCE_ENTER_RSSI:
+            return self._set_present(True)
+        return False
+
+    def check(self, now: float) -> bool:
+        """Time out a silent train; return True if presence changed."""
+        if self.present and (self.last_seen is None or now - self.last_seen > self.timeout):
+            return self._set_present(False)
+        return False
+
+    def mark_seen(self, now: float) -> bool:
+        """Treat a live connection as proof of presence; return True if presence changed."""
+        self.last_seen = now
+        return self._set_present(True)
+
+    def _set_present(self, present: bool) -> bool:
+        """Set the presence decision; return True if it changed."""
+        if present == self.present:
+            return False
+        self.present = present
+        if not present:
+            self._streak = 0
+        return True
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the tracker state for diagnostics."""
+        return {
+            "present": self.present,
+            "rssi": None if self.rssi is None else round(self.rssi, 1),
+            "advertisement_interval_s": None if self.interval is None else round(self.interval, 2),
+            "seconds_since_seen": None if self.last_seen is None else round(now - self.last_seen, 1),
+            "timeout_s": round(self.timeout, 1),
+            "advertisements": self.advertisements,
+        }
@@ -0,0 +1,187 @@
+"""Recording and replay of driving sessions."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any
+
+from .command_queue import command_kind
+
+if TYPE_CHECKING:
+    from . import LionelTrainCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Session file: magic, then per frame its offset (ms), length and raw bytes
+SESSION_MAGIC = b"LCS1"
+SESSION_SUFFIX = ".lcs"
+_FRAME_HEADER = struct.Struct("<IB")
+
+# Cap on a single recording (about an hour of continuous slider dragging)
+MAX_SESSION_FRAMES = 100_000
+
+# Assumed time per write until the link has been measured (seconds)
+DEFAULT_WRITE_INTERVAL = 0.03
+
+SessionFrame = tuple[float, bytes]
+
+
+class SessionRecorder:
+    """Collects outbound commands with their offset from the start of the recording."""
+
+    def __init__(self) -> None:
+        """Start recording."""
+        self._started = time.monotonic()
+        self.frames: list[SessionFrame] = []
+        self.truncated = False
+
+    def record(self, command: list[int]) -> None:
+        """Record a command as it is issued."""
+        if len(self.frames) >= MAX_SESSION_FRAMES:
+            self.truncated = True
+            return
+        self.frames.append((time.monotonic() - self._started, bytes(command)))
+
+
+def encode_session(frames: list[SessionFrame]) -> bytes:
+    """Encode frames into the compact session format."""
+    parts = [SESSION_MAGIC]
+    for offset, command in frames:
+        parts.append(_FRAME_HEADER.pack(round(offset * 1000), len(command)))
+        parts.append(command)
+    return b"".join(parts)
+
+
+def decode_session(data: bytes) -> list[SessionFrame]:
+    """Decode a session file, raising ValueError if it is not a valid session."""
+    if not data.startswith(SESSION_MAGIC):
+        raise ValueError("Not a Lionel session file")
+    frames: list[SessionFrame] = []
+    pos = len(SESSION_MAGIC)
+    while pos < len(data):
+        if pos + _FRAME_HEADER.size > len(data):
+            raise ValueError("Truncated session file")
+        offset_ms, length = _FRAME_HEADER.unpack_from(data, pos)
+        pos += _FRAME_HEADER.size
+        if pos + length > len(data):
+            raise ValueError("Truncated session file")
+        frames.append((offset_ms / 1000, data[pos:pos + length]))
+        pos += length
+    return frames
+
+
+def save_session(directory: str, name: str, frames: list[SessionFrame]) -> int:
+    """Write a session file and return its size in bytes (blocking)."""
+    os.makedirs(directory, exist_ok=True)
+    data = encode_session(frames)
+    with open(os.path.join(directory, name + SESSION_SUFFIX), "wb") as file:
+        file.write(data)
+    return len(data)
+
+
+def load_session(directory: str, name: str) -> list[SessionFrame]:
+    """Read and decode a session file (blocking)."""
+    with open(os.path.join(directory, name + SESSION_SUFFIX), "rb") as file:
+        return decode_session(file.read())
+
+
+def list_sessions(directory: str) -> dict[str, dict[str, Any]]:
+    """Return the frame count, length and size of every session file (blocking)."""
+    if not os.path.isdir(directory):
+        return {}
+    sessions = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(SESSION_SUFFIX):
+            continue
+        name = filename[: -len(SESSION_SUFFIX)]
+        try:
+            frames = load_session(directory, name)
+        except (OSError, ValueError) as err:
+            _LOGGER.debug("Skipping unreadable session %s: %s", filename, err)
+            continue
+        sessions[name] = {
+            "frames": len(frames),
+            "length_s": frames[-1][0] if frames else 0.0,
+            "bytes": os.path.getsize(os.path.join(directory, filename)),
+        }
+    return sessions
+
+
+def coalesce_frames(frames: list[SessionFrame], min_interval: float) -> list[SessionFrame]:
+    """Thin out frames the link could not deliver in time.
+
+    A frame is dropped when the previous kept frame of the same kind (speed,
+    horn, a given sound volume, ...) is less than ``min_interval`` older and
+    a newer frame of that kind follows within ``min_interval``. The last
+    value of every burst is therefore always sent.
+    """
+    superseded = [False] * len(frames)
+    next_seen: dict[tuple[int, ...], float] = {}
+    for i in range(len(frames) - 1, -1, -1):
+        offset, command = frames[i]
+        kind = command_kind(list(command))
+        if (following := next_seen.get(kind)) is not None and following - offset < min_interval:
+            superseded[i] = True
+        next_seen[kind] = offset
+
+    kept: list[SessionFrame] = []
+    last_kept: dict[tuple[int, ...], float] = {}
+    for i, (offset, command) in enumerate(frames):
+        kind = command_kind(list(command))
+        if superseded[i] and kind in last_kept and offset - last_kept[kind] < min_interval:
+            continue
+        last_kept[kind] = offset
+        kept.append((offset, command))
+    return kept
+
+
+async def async_replay_frames(
+    coordinator: LionelTrainCoordinator,
+    frames: list[SessionFrame],
+    rate: float,
+    min_interval: float,
+) -> dict[str, Any]:
+    """Replay recorded frames at ``rate`` times the recorded speed.
+
+    Like sequences, frames are timed against absolute loop times so write
+    latency does not accumulate into drift. Each frame is applied to the
+    coordinator's state as it is sent, so entities follow the replay and
+    a cancelled replay leaves the state the train is actually in.
+    """
+    scaled = [(offset / rate, command) for offset, command in frames]
+    schedule = coalesce_frames(scaled, min_interval)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    lateness: list[float] = []
+    failed = 0
+
+    for offset, command in schedule:
+        target = start + offset
+        if (delay := target - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        lateness.append(loop.time() - target)
+        if not await coordinator.async_send_frame(list(command)):
+            failed += 1
+
+    elapsed = loop.time() - start
+    recorded = frames[-1][0] if frames else 0.0
+    _LOGGER.debug(
+        "Replayed %d of %d frames on %s in %.3fs (recorded %.3fs at rate %.2f)",
+        len(schedule), len(frames), coordinator.name, elapsed, recorded, rate,
+    )
+    return {
+        "frames": len(frames),
+        "sent_frames": len(schedule),
+        "coalesced_frames": len(frames) - len(schedule),
+        "failed_frames": failed,
+        "rate": rate,
+        "recorded_s": round(recorded, 3),
+        "planned_s": round(recorded / rate, 3),
+        "elapsed_s": round(elapsed, 3),
+        "mean_error_ms": round(sum(lateness) / len(lateness) * 1000, 2) if lateness else 0.0,
+        "max_error_ms": round(max(lateness) * 1000, 2) if lateness else 0.0,
+    }
@@ -1,16 +1,29 @@
 """Sensor platform for Lionel Train Controller integration."""
 from __future__ import annotations
 
+from abc import abstractmethod
+from datetime import datetime, timedelta
 import logging
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_NAME,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 
 from . import LionelTrainCoordinator
-from .const import CONF_TRAIN_MODEL, DOMAIN
+from .const import CONF_TRAIN_MODEL, DOMAIN, METRICS_PUBLISH_INTERVAL, SIGNAL_PUBLISH_INTERVAL
+from .metrics import LatencyHistogram
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +43,12 @@ async def async_setup_entry(
         LionelTrainModelSensor(coordinator, name, train_model),
         LionelTrainDirectionSensor(coordinator, name),
         LionelTrainDiagnosticsSensor(coordinator, name),
+        LionelTrainLatencySensor(coordinator, name, "lock_wait", "Lock wait"),
+        LionelTrainLatencySensor(coordinator, name, "write", "Write latency"),
+        LionelTrainLatencySensor(coordinator, name, "connect", "Connect time"),
+        LionelTrainLatencySensor(coordinator, name, "reconnect_downtime", "Reconnect downtime"),
+        LionelTrainThroughputSensor(coordinator, name),
+        LionelTrainSignalSensor(coordinator, name),
     ], True)
 
 
@@ -67,17 +86,18 @@ class LionelTrainStatusSensor(SensorEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
     @property
     def extra_state_attributes(self) -> dict[str, any]:
         """Return additional state attributes."""
+        state = self._coordinator.state
         return {
-            "speed": self._coordinator.speed,
-            "direction_forward": self._coordinator.direction_forward,
-            "lights_on": self._coordinator.lights_on,
-            "bell_on": self._coordinator.bell_on,
-            "horn_on": self._coordinator.horn_on,
+            "speed": state.speed,
+            "direction_forward": state.direction_forward,
+            "lights_on": state.lights_on,
+            "bell_on": state.bell_on,
+            "horn_on": state.horn_on,
         }
 
 
@@ -124,21 +144,30 @@ class LionelTrainDirectionSensor(SensorEntity):
             "identifiers": {(DOMAIN, coordinator.mac_address)},
             "name": device_name,
         }
-        self._coordinator.add_update_callback(self.async_write_ha_state)
+        self._written: tuple[int, bool] | None = None  # (state version, available)
+        self._coordinator.add_update_callback(self._async_state_updated)
 
     async def async_will_remove_from_hass(self) -> None:
         """Entity being removed from hass."""
-        self._coordinator.remove_update_callback(self.async_write_ha_state)
+        self._coordinator.remove_update_callback(self._async_state_updated)
+
+    @callback
+    def _async_state_updated(self) -> None:
+        """Write the state only if the snapshot or availability changed."""
+        written = (self._coordinator.state.version, self.available)
+        if written != self._written:
+            self._written = written
+            self.async_write_ha_state()
 
     @property
     def native_value(self) -> str:
         """Return the direction as forward or reverse."""
-        return "forward" if self._coordinator.direction_forward else "reverse"
+        return "forward" if self._coordinator.state.direction_forward else "reverse"
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
 
 class LionelTrainDiagnosticsSensor(SensorEntity):
@@ -186,6 +215,151 @@ class LionelTrainDiagnosticsSensor(SensorEntity):
             "connection_attempts": self._coordinator.connection_attempts,
             "successful_commands": self._coordinator.successful_commands,
             "failed_commands": self._coordinator.failed_commands,
+            "timed_out_commands": self._coordinator.timed_out_commands,
+            "command_timeout": self._coordinator.command_timeout,
+            "queued_commands": self._coordinator.queue_stats,
+            "startup_timings": self._coordinator.startup_timings,
+            "running_sequence": self._coordinator.running_sequence,
+            "last_sequence": self._coordinator.last_sequence_report,
+            "recording": self._coordinator.recording,
             "connected": self._coordinator.connected,
             "auto_reconnect_enabled": self._coordinator.auto_reconnect_enabled,
         }
+
+
+class LionelTrainMetricsSensor(SensorEntity):
+    """Base for link metric sensors, published on a fixed timer.
+
+    Metrics change with every command, so instead of writing state on each
+    update these sensors publish a snapshot every METRICS_PUBLISH_INTERVAL
+    seconds to keep the recorder load constant. Subclasses implement
+    _async_sample.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _publish_interval = METRICS_PUBLISH_INTERVAL
+
+    def __init__(self, coordinator: LionelTrainCoordinator, device_name: str) -> None:
+        """Initialize the sensor."""
+        self._coordinator = coordinator
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.mac_address)},
+            "name": device_name,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Start the publish timer."""
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_publish, timedelta(seconds=self._publish_interval)
+            )
+        )
+
+    @callback
+    def _async_publish(self, now: datetime) -> None:
+        """Take a metrics snapshot and write it."""
+        self._async_sample()
+        self.async_write_ha_state()
+
+    @abstractmethod
+    @callback
+    def _async_sample(self) -> None:
+        """Update the cached value and attributes from the coordinator's metrics."""
+
+    async def async_update(self) -> None:
+        """Take the initial snapshot when the entity is added."""
+        self._async_sample()
+
+
+class LionelTrainLatencySensor(LionelTrainMetricsSensor):
+    """Median of a latency histogram, with p95/p99 as attributes."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(
+        self, coordinator: LionelTrainCoordinator, device_name: str, metric: str, name: str
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, device_name)
+        self._metric = metric
+        self._attr_name = name
+        self._attr_unique_id = f"{coordinator.mac_address}_{metric}_latency"
+
+    @callback
+    def _async_sample(self) -> None:
+        """Snapshot the histogram."""
+        histogram: LatencyHistogram = getattr(self._coordinator.metrics, self._metric)
+        stats = histogram.as_dict()
+        self._attr_native_value = stats["p50_ms"]
+        self._attr_extra_state_attributes = stats
+
+
+class LionelTrainThroughputSensor(LionelTrainMetricsSensor):
+    """Frames written per second, with byte and notification rates as attributes."""
+
+    _attr_name = "Command rate"
+    _attr_native_unit_of_measurement = "frames/s"
+    _attr_icon = "mdi:speedometer"
+
+    def __init__(self, coordinator: LionelTrainCoordinator, device_name: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, device_name)
+        self._attr_unique_id = f"{coordinator.mac_address}_throughput"
+
+    @callback
+    def _async_sample(self) -> None:
+        """Sample rates since the previous publish."""
+        metrics = self._coordinator.metrics
+        rates = metrics.sample_rates()
+        self._attr_native_value = rates["frames_per_s"]
+        self._attr_extra_state_attributes = {
+            "bytes_per_s": rates["bytes_per_s"],
+            "notifications_per_s": rates["notifications_per_s"],
+            "frames_sent": metrics.frames_sent,
+            "bytes_sent": metrics.bytes_sent,
+            "notifications": metrics.notifications,
+        }
+
+
+class LionelTrainSignalSensor(LionelTrainMetricsSensor):
+    """Smoothed RSSI of the train's advertisements, from the presence tracker.
+
+    Advertisements can arrive several times a second; the value is
+    published at most every SIGNAL_PUBLISH_INTERVAL seconds, and only
+    when the rounded RSSI or interval changed.
+    """
+
+    _attr_name = "Signal strength"
+    _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
+    _attr_native_unit_of_measurement = SIGNAL_STRENGTH_DECIBELS_MILLIWATT
+    _publish_interval = SIGNAL_PUBLISH_INTERVAL
+
+    def __init__(self, coordinator: LionelTrainCoordinator, device_name: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, device_name)
+        self._attr_unique_id = f"{coordinator.mac_address}_rssi"
+
+    @callback
+    def _async_publish(self, now: datetime) -> None:
+        """Write the reading only if it changed since the last publish."""
+        previous = (self._attr_native_value, self._attr_extra_state_attributes)
+        self._async_sample()
+        if (self._attr_native_value, self._attr_extra_state_attributes) != previous:
+            self.async_write_ha_state()
+
+    @callback
+    def _async_sample(self) -> None:
+        """Read the tracker."""
+        presence = self._coordinator.presence
+        self._attr_native_value = None if presence.rssi is None else round(presence.rssi)
+        self._attr_extra_state_attributes = {
+            "advertisement_interval_s": (
+                None if presence.interval is None else round(presence.interval, 1)
+            ),
+            "present": self._coordinator.present,
+        }
@@ -0,0 +1,168 @@
+"""Timed sequences (horn signals, departures, announcements) for a train."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from homeassistant.helpers import config_validation as cv
+
+if TYPE_CHECKING:
+    from . import LionelTrainCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SEQUENCE_ACTIONS = ("horn", "bell", "speed", "direction", "lights", "announcement")
+
+# Horn signal lengths (seconds)
+_LONG = 1.0
+_SHORT = 0.4
+_GAP = 0.5
+
+# Built-in patterns, written as steps in the same format the run_sequence service accepts
+BUILTIN_SEQUENCES: dict[str, list[dict[str, Any]]] = {
+    # Long, long, short, long
+    "grade_crossing": [
+        {"action": "horn", "duration": _LONG},
+        {"action": "horn", "duration": _LONG, "delay": _GAP},
+        {"action": "horn", "duration": _SHORT, "delay": _GAP},
+        {"action": "horn", "duration": 2 * _LONG, "delay": _GAP},
+    ],
+    # One long: approaching a station
+    "approaching_station": [
+        {"action": "horn", "duration": 1.5 * _LONG},
+    ],
+    # Two short: releasing brakes, proceeding
+    "proceed": [
+        {"action": "horn", "duration": _SHORT},
+        {"action": "horn", "duration": _SHORT, "delay": _GAP},
+    ],
+    # Three short: backing up
+    "backing_up": [
+        {"action": "horn", "duration": _SHORT},
+        {"action": "horn", "duration": _SHORT, "delay": _GAP},
+        {"action": "horn", "duration": _SHORT, "delay": _GAP},
+    ],
+    # Bell, two short blasts, then pull away slowly
+    "departure": [
+        {"action": "bell", "duration": 3.0},
+        {"action": "horn", "duration": _SHORT, "delay": _GAP},
+        {"action": "horn", "duration": _SHORT, "delay": _GAP},
+        {"action": "speed", "value": 20, "delay": _GAP},
+    ],
+}
+
+
+class Frame(NamedTuple):
+    """One command at a fixed offset from the start of a sequence."""
+
+    offset: float
+    action: str
+    value: Any
+
+
+def _frame_value(action: str, value: Any) -> Any:
+    """Validate and normalize the value of a step."""
+    if action in ("horn", "bell", "lights"):
+        return True if value is None else cv.boolean(value)
+    if action == "speed":
+        speed = int(value)
+        if not 0 <= speed <= 100:
+            raise ValueError("Speed must be between 0 and 100")
+        return speed
+    if action == "direction":
+        if value not in ("forward", "reverse"):
+            raise ValueError("Direction must be 'forward' or 'reverse'")
+        return value == "forward"
+    if action == "announcement":
+        code = int(value)
+        if not 0 <= code <= 255:
+            raise ValueError("Announcement code must be between 0 and 255")
+        return code
+    raise ValueError(f"Unknown sequence action {action}")
+
+
+def compile_sequence(steps: list[dict[str, Any]]) -> list[Frame]:
+    """Compile steps into a frame schedule sorted by offset.
+
+    Each step starts at ``at`` seconds from the start of the sequence, or
+    ``delay`` seconds after the previous step ended. Horn and bell steps
+    with a ``duration`` become an on frame and an off frame; other actions
+    are instantaneous and reject a ``duration``.
+    """
+    frames: list[Frame] = []
+    cursor = 0.0
+    for step in steps:
+        action = step["action"]
+        start = step["at"] if step.get("at") is not None else cursor + step.get("delay", 0.0)
+        if start < 0:
+            raise ValueError("Sequence steps cannot start before the sequence")
+        duration = step.get("duration")
+        if duration is not None and action not in ("horn", "bell"):
+            raise ValueError(f"Only horn and bell steps take a duration, not {action}")
+        if duration is not None:
+            frames.append(Frame(start, action, True))
+            frames.append(Frame(start + duration, action, False))
+            cursor = start + duration
+        else:
+            frames.append(Frame(start, action, _frame_value(action, step.get("value"))))
+            cursor = start
+    frames.sort(key=lambda frame: frame.offset)
+    return frames
+
+
+async def async_apply_frame(
+    coordinator: LionelTrainCoordinator, frame: Frame, timeout: float | None = None
+) -> bool:
+    """Send the command for one frame through the coordinator."""
+    action, value = frame.action, frame.value
+    if action == "horn":
+        return await coordinator.async_set_horn(value, timeout)
+    if action == "bell":
+        return await coordinator.async_set_bell(value, timeout)
+    if action == "speed":
+        return await coordinator.async_set_speed(value, timeout)
+    if action == "direction":
+        return await coordinator.async_set_direction(value, timeout)
+    if action == "lights":
+        return await coordinator.async_set_lights(value, timeout)
+    return await coordinator.async_play_announcement(value, timeout)
+
+
+async def async_play_frames(
+    coordinator: LionelTrainCoordinator, frames: list[Frame]
+) -> dict[str, Any]:
+    """Play a frame schedule against the loop clock and report timing error.
+
+    Every frame is scheduled at an absolute loop time (start + offset), so
+    a slow write delays only the frames right behind it instead of pushing
+    the whole remaining sequence back.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    lateness: list[float] = []
+    failed = 0
+
+    for frame in frames:
+        target = start + frame.offset
+        if (delay := target - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        lateness.append(loop.time() - target)
+        if not await async_apply_frame(coordinator, frame):
+            failed += 1
+
+    elapsed = loop.time() - start
+    planned = frames[-1].offset if frames else 0.0
+    _LOGGER.debug(
+        "Sequence of %d frames on %s took %.3fs (planned %.3fs), max error %.1f ms",
+        len(frames), coordinator.name, elapsed, planned,
+        max(lateness, default=0.0) * 1000,
+    )
+    return {
+        "frames": len(frames),
+        "failed_frames": failed,
+        "planned_s": round(planned, 3),
+        "elapsed_s": round(elapsed, 3),
+        "mean_error_ms": round(sum(lateness) / len(lateness) * 1000, 2) if lateness else 0.0,
+        "max_error_ms": round(max(lateness) * 1000, 2) if lateness else 0.0,
+    }
@@ -0,0 +1,637 @@
+"""Service handlers for the Lionel Train Controller integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_AREA_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .consist import ConsistMember, LionelConsist
+from .const import (
+    CMD_BELL,
+    CMD_HORN,
+    DATA_CONSISTS,
+    DATA_DEVICE_INDEX,
+    DEFAULT_FLEET_CONCURRENCY,
+    DEFAULT_HORN_DURATION,
+    DOMAIN,
+    MAX_COMMAND_TIMEOUT,
+    MAX_FLEET_CONCURRENCY,
+    MAX_PULSE_DURATION,
+    MAX_REPLAY_RATE,
+    MIN_COMMAND_TIMEOUT,
+    MIN_PULSE_DURATION,
+    MIN_REPLAY_RATE,
+    SESSIONS_DIR,
+)
+from .fleet import async_fleet_broadcast
+from .recording import list_sessions, load_session, save_session
+from .sequence import BUILTIN_SEQUENCES, SEQUENCE_ACTIONS, compile_sequence
+
+if TYPE_CHECKING:
+    from . import LionelTrainCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Keys that make a service call target specific trains
+_TARGET_KEYS = (ATTR_ENTITY_ID, ATTR_DEVICE_ID, ATTR_AREA_ID, "floor_id", "label_id")
+
+# Optional per-call override of the coordinator's command deadline
+TIMEOUT_FIELD = vol.Optional("timeout")
+TIMEOUT_VALIDATOR = vol.All(
+    vol.Coerce(float), vol.Range(min=MIN_COMMAND_TIMEOUT, max=MAX_COMMAND_TIMEOUT)
+)
+
+# Service schemas
+SPEED_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    vol.Required("speed"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+DIRECTION_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    vol.Required("direction"): vol.In(["forward", "reverse"]),
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+ANNOUNCEMENT_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    vol.Required("announcement"): vol.Coerce(int),
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+COMMAND_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+# How long a horn/bell pulse lasts
+DURATION_FIELD = vol.Optional("duration", default=DEFAULT_HORN_DURATION)
+DURATION_VALIDATOR = vol.All(
+    vol.Coerce(float), vol.Range(min=MIN_PULSE_DURATION, max=MAX_PULSE_DURATION)
+)
+
+PULSE_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    DURATION_FIELD: DURATION_VALIDATOR,
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+# Fleet services address every configured train, so they take no target
+FLEET_FIELDS = {
+    vol.Optional("max_concurrency", default=DEFAULT_FLEET_CONCURRENCY): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_FLEET_CONCURRENCY)
+    ),
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+}
+
+FLEET_SCHEMA = vol.Schema(FLEET_FIELDS)
+
+FLEET_LIGHTS_SCHEMA = vol.Schema({
+    **FLEET_FIELDS,
+    vol.Required("lights"): cv.boolean,
+})
+
+FLEET_HORN_SCHEMA = vol.Schema({
+    **FLEET_FIELDS,
+    DURATION_FIELD: DURATION_VALIDATOR,
+})
+
+FLEET_SCENE_SCHEMA = vol.All(
+    vol.Schema({
+        **FLEET_FIELDS,
+        vol.Optional("speed"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+        vol.Optional("direction"): vol.In(["forward", "reverse"]),
+        vol.Optional("lights"): cv.boolean,
+        vol.Optional("master_volume"): vol.All(vol.Coerce(int), vol.Range(min=0, max=7)),
+    }),
+    cv.has_at_least_one_key("speed", "direction", "lights", "master_volume"),
+)
+
+CONSIST_MEMBER_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("trim", default=0): vol.All(vol.Coerce(int), vol.Range(min=-50, max=50)),
+    vol.Optional("reverse", default=False): cv.boolean,
+})
+
+CREATE_CONSIST_SCHEMA = vol.Schema({
+    vol.Required("consist_id"): cv.slug,
+    vol.Required("members"): vol.All(
+        cv.ensure_list, [CONSIST_MEMBER_SCHEMA], vol.Length(min=2)
+    ),
+})
+
+CONSIST_SCHEMA = vol.Schema({
+    vol.Required("consist_id"): cv.slug,
+})
+
+CONSIST_SPEED_SCHEMA = vol.Schema({
+    vol.Required("consist_id"): cv.slug,
+    vol.Required("speed"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+CONSIST_DIRECTION_SCHEMA = vol.Schema({
+    vol.Required("consist_id"): cv.slug,
+    vol.Required("direction"): vol.In(["forward", "reverse"]),
+    TIMEOUT_FIELD: TIMEOUT_VALIDATOR,
+})
+
+# Seconds from sequence start, or after the previous step
+SEQUENCE_TIME_VALIDATOR = vol.All(vol.Coerce(float), vol.Range(min=0, max=600))
+
+SEQUENCE_STEP_SCHEMA = vol.Schema({
+    vol.Required("action"): vol.In(SEQUENCE_ACTIONS),
+    vol.Exclusive("at", "start"): SEQUENCE_TIME_VALIDATOR,
+    vol.Exclusive("delay", "start"): SEQUENCE_TIME_VALIDATOR,
+    vol.Optional("duration"): DURATION_VALIDATOR,
+    vol.Optional("value"): vol.Any(bool, int, cv.string),
+})
+
+RUN_SEQUENCE_SCHEMA = vol.All(
+    vol.Schema({
+        **cv.ENTITY_SERVICE_FIELDS,
+        vol.Exclusive("pattern", "sequence"): vol.In(list(BUILTIN_SEQUENCES)),
+        vol.Exclusive("steps", "sequence"): vol.All(
+            cv.ensure_list, [SEQUENCE_STEP_SCHEMA], vol.Length(min=1)
+        ),
+        vol.Optional("wait", default=False): cv.boolean,
+    }),
+    cv.has_at_least_one_key("pattern", "steps"),
+)
+
+STOP_RECORDING_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    vol.Required("session"): cv.slug,
+})
+
+REPLAY_SESSION_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    vol.Required("session"): cv.slug,
+    vol.Optional("rate", default=1.0): vol.All(
+        vol.Coerce(float), vol.Range(min=MIN_REPLAY_RATE, max=MAX_REPLAY_RATE)
+    ),
+    vol.Optional("wait", default=False): cv.boolean,
+})
+
+DUMP_TRACES_SCHEMA = vol.Schema({
+    **cv.ENTITY_SERVICE_FIELDS,
+    vol.Optional("clear", default=False): cv.boolean,
+})
+
+
+@callback
+def async_resolve_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[LionelTrainCoordinator]:
+    """Resolve the trains targeted by a service call.
+
+    Entities, devices and areas are mapped to coordinators through the
+    device index kept in ``hass.data[DOMAIN]``. Calls without a target are
+    only accepted while exactly one train is configured.
+    """
+    index: dict[str, LionelTrainCoordinator] = hass.data[DOMAIN][DATA_DEVICE_INDEX]
+
+    if not any(key in call.data for key in _TARGET_KEYS):
+        if len(index) == 1:
+            return list(index.values())
+        raise HomeAssistantError(
+            f"{len(index)} Lionel trains are configured; select a target for {call.service}"
+        )
+
+    selected = async_extract_referenced_entity_ids(hass, call)
+    coordinators: dict[str, LionelTrainCoordinator] = {}
+
+    for device_id in selected.referenced_devices:
+        if (coordinator := index.get(device_id)) is not None:
+            coordinators[device_id] = coordinator
+
+    ent_reg = er.async_get(hass)
+    for entity_id in selected.referenced | selected.indirectly_referenced:
+        entity = ent_reg.async_get(entity_id)
+        if entity is None or entity.device_id is None:
+            continue
+        if (coordinator := index.get(entity.device_id)) is not None:
+            coordinators[entity.device_id] = coordinator
+
+    if not coordinators:
+        raise HomeAssistantError(f"No Lionel trains match the target of {call.service}")
+    return list(coordinators.values())
+
+
+async def _async_dispatch(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    action: Callable[[LionelTrainCoordinator], Awaitable[Any]],
+) -> None:
+    """Run an action on every targeted train concurrently."""
+    coordinators = async_resolve_coordinators(hass, call)
+    _LOGGER.debug(
+        "Dispatching %s to %d train(s)", call.service, len(coordinators)
+    )
+    await asyncio.gather(*(action(coordinator) for coordinator in coordinators))
+
+
+@callback
+def async_fleet_coordinators(hass: HomeAssistant) -> list[LionelTrainCoordinator]:
+    """Return every configured train."""
+    return list(hass.data[DOMAIN][DATA_DEVICE_INDEX].values())
+
+
+@callback
+def _async_get_consist(hass: HomeAssistant, consist_id: str) -> LionelConsist:
+    """Return a consist by id."""
+    try:
+        return hass.data[DOMAIN][DATA_CONSISTS][consist_id]
+    except KeyError as err:
+        raise HomeAssistantError(f"Unknown consist {consist_id}") from err
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register Home Assistant services for train control."""
+    if hass.services.has_service(DOMAIN, "set_speed"):
+        return
+
+    async def set_speed_service(call: ServiceCall) -> None:
+        """Service to set train speed."""
+        speed = call.data["speed"]
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Setting train speed to %d via service", speed)
+        await _async_dispatch(
+            hass, call, lambda c: c.async_set_speed(speed, timeout=timeout)
+        )
+
+    async def set_direction_service(call: ServiceCall) -> None:
+        """Service to set train direction."""
+        direction = call.data["direction"]
+        forward = direction == "forward"
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Setting train direction to %s via service", direction)
+        await _async_dispatch(
+            hass, call, lambda c: c.async_set_direction(forward, timeout=timeout)
+        )
+
+    async def stop_service(call: ServiceCall) -> None:
+        """Service to stop the train."""
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Stopping train via service")
+        await _async_dispatch(hass, call, lambda c: c.async_set_speed(0, timeout=timeout))
+
+    async def horn_service(call: ServiceCall) -> None:
+        """Service to sound the horn."""
+        duration = call.data["duration"]
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Sounding horn for %.1fs via service", duration)
+        await _async_dispatch(
+            hass, call, lambda c: c.async_pulse(CMD_HORN, duration, timeout=timeout)
+        )
+
+    async def bell_service(call: ServiceCall) -> None:
+        """Service to ring the bell."""
+        duration = call.data["duration"]
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Ringing bell for %.1fs via service", duration)
+        await _async_dispatch(
+            hass, call, lambda c: c.async_pulse(CMD_BELL, duration, timeout=timeout)
+        )
+
+    async def lights_on_service(call: ServiceCall) -> None:
+        """Service to turn lights on."""
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Turning lights on via service")
+        await _async_dispatch(hass, call, lambda c: c.async_set_lights(True, timeout=timeout))
+
+    async def lights_off_service(call: ServiceCall) -> None:
+        """Service to turn lights off."""
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Turning lights off via service")
+        await _async_dispatch(hass, call, lambda c: c.async_set_lights(False, timeout=timeout))
+
+    async def play_announcement_service(call: ServiceCall) -> None:
+        """Service to play an announcement."""
+        announcement = call.data["announcement"]
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Playing announcement %d via service", announcement)
+        await _async_dispatch(
+            hass, call, lambda c: c.async_play_announcement(announcement, timeout=timeout)
+        )
+
+    async def connect_service(call: ServiceCall) -> None:
+        """Service to connect to the train."""
+        _LOGGER.debug("Connecting to train via service")
+        await _async_dispatch(hass, call, lambda c: c.async_force_reconnect())
+
+    async def disconnect_service(call: ServiceCall) -> None:
+        """Service to disconnect from the train."""
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Disconnecting from train via service")
+        await _async_dispatch(hass, call, lambda c: c.async_disconnect(timeout=timeout))
+
+    async def fleet_stop_service(call: ServiceCall) -> ServiceResponse:
+        """Service to stop every train."""
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Stopping all trains via service")
+        return await async_fleet_broadcast(
+            async_fleet_coordinators(hass),
+            lambda c: c.async_set_speed(0, timeout=timeout),
+            call.data["max_concurrency"],
+        )
+
+    async def fleet_lights_service(call: ServiceCall) -> ServiceResponse:
+        """Service to switch the lights of every train."""
+        lights = call.data["lights"]
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Turning all train lights %s via service", "on" if lights else "off")
+        return await async_fleet_broadcast(
+            async_fleet_coordinators(hass),
+            lambda c: c.async_set_lights(lights, timeout=timeout),
+            call.data["max_concurrency"],
+        )
+
+    async def fleet_horn_service(call: ServiceCall) -> ServiceResponse:
+        """Service to sound the horn of every train together."""
+        duration = call.data["duration"]
+        timeout = call.data.get("timeout")
+        _LOGGER.debug("Sounding all horns via service")
+        return await async_fleet_broadcast(
+            async_fleet_coordinators(hass),
+            lambda c: c.async_pulse(CMD_HORN, duration, timeout=timeout),
+            call.data["max_concurrency"],
+        )
+
+    async def fleet_apply_scene_service(call: ServiceCall) -> ServiceResponse:
+        """Service to apply the same speed/direction/lights/volume to every train."""
+        timeout = call.data.get("timeout")
+        speed = call.data.get("speed")
+        direction = call.data.get("direction")
+        lights = call.data.get("lights")
+        master_volume = call.data.get("master_volume")
+        _LOGGER.debug("Applying scene to all trains via service")
+
+        async def _apply(coordinator: LionelTrainCoordinator) -> bool:
+            success = True
+            if direction is not None:
+                success &= await coordinator.async_set_direction(direction == "forward", timeout=timeout)
+            if speed is not None:
+                success &= await coordinator.async_set_speed(speed, timeout=timeout)
+            if lights is not None:
+                success &= await coordinator.async_set_lights(lights, timeout=timeout)
+            if master_volume is not None:
+                success &= await coordinator.async_set_master_volume(master_volume, timeout=timeout)
+            return success
+
+        return await async_fleet_broadcast(
+            async_fleet_coordinators(hass), _apply, call.data["max_concurrency"]
+        )
+
+    async def create_consist_service(call: ServiceCall) -> ServiceResponse:
+        """Service to group locomotives into a consist."""
+        consist_id = call.data["consist_id"]
+        index = hass.data[DOMAIN][DATA_DEVICE_INDEX]
+        members = []
+        for member in call.data["members"]:
+            coordinator = index.get(member["device_id"])
+            if coordinator is None:
+                raise HomeAssistantError(f"Device {member['device_id']} is not a Lionel train")
+            if any(m.coordinator is coordinator for m in members):
+                raise HomeAssistantError(f"{coordinator.name} is listed twice in consist {consist_id}")
+            members.append(ConsistMember(coordinator, member["trim"], member["reverse"]))
+
+        consist = LionelConsist(consist_id, members)
+        hass.data[DOMAIN][DATA_CONSISTS][consist_id] = consist
+        _LOGGER.info("Created consist %s with %d locomotives", consist_id, len(members))
+        return consist.as_dict()
+
+    async def remove_consist_service(call: ServiceCall) -> None:
+        """Service to dissolve a consist."""
+        consist_id = call.data["consist_id"]
+        _async_get_consist(hass, consist_id)
+        del hass.data[DOMAIN][DATA_CONSISTS][consist_id]
+        _LOGGER.info("Removed consist %s", consist_id)
+
+    async def consist_set_speed_service(call: ServiceCall) -> ServiceResponse:
+        """Service to set the speed of every locomotive in a consist."""
+        consist = _async_get_consist(hass, call.data["consist_id"])
+        return await consist.async_set_speed(call.data["speed"], timeout=call.data.get("timeout"))
+
+    async def consist_set_direction_service(call: ServiceCall) -> ServiceResponse:
+        """Service to set the direction of every locomotive in a consist."""
+        consist = _async_get_consist(hass, call.data["consist_id"])
+        return await consist.async_set_direction(
+            call.data["direction"] == "forward", timeout=call.data.get("timeout")
+        )
+
+    async def list_consists_service(call: ServiceCall) -> ServiceResponse:
+        """Service to list consists with their skew statistics."""
+        return {
+            consist_id: consist.as_dict()
+            for consist_id, consist in hass.data[DOMAIN][DATA_CONSISTS].items()
+        }
+
+    async def run_sequence_service(call: ServiceCall) -> ServiceResponse:
+        """Service to play a built-in or custom timed sequence."""
+        name = call.data.get("pattern", "custom")
+        try:
+            frames = compile_sequence(BUILTIN_SEQUENCES.get(name) or call.data["steps"])
+        except (ValueError, vol.Invalid) as err:
+            raise HomeAssistantError(f"Invalid sequence: {err}") from err
+        wait = call.data["wait"]
+        coordinators = async_resolve_coordinators(hass, call)
+        _LOGGER.debug("Playing sequence %s (%d frames) via service", name, len(frames))
+        reports = await asyncio.gather(
+            *(c.async_run_sequence(name, frames, wait) for c in coordinators)
+        )
+        return {
+            coordinator.mac_address: report if wait else {"name": name, "started": True}
+            for coordinator, report in zip(coordinators, reports)
+        }
+
+    async def cancel_sequence_service(call: ServiceCall) -> None:
+        """Service to stop the sequence playing on a train."""
+        _LOGGER.debug("Cancelling sequence via service")
+        await _async_dispatch(hass, call, lambda c: c.async_cancel_sequence())
+
+    async def list_sequences_service(call: ServiceCall) -> ServiceResponse:
+        """Service to list built-in sequences and what each train is playing."""
+        patterns = {}
+        for name, steps in BUILTIN_SEQUENCES.items():
+            frames = compile_sequence(steps)
+            patterns[name] = {"frames": len(frames), "length_s": frames[-1].offset}
+        return {
+            "patterns": patterns,
+            "trains": {
+                coordinator.mac_address: {
+                    "name": coordinator.name,
+                    "running": coordinator.running_sequence,
+                    "last_report": coordinator.last_sequence_report,
+                }
+                for coordinator in async_fleet_coordinators(hass)
+            },
+        }
+
+    async def start_recording_service(call: ServiceCall) -> None:
+        """Service to start recording the commands sent to a train."""
+        coordinators = async_resolve_coordinators(hass, call)
+        _LOGGER.info("Recording commands of %d train(s) via service", len(coordinators))
+        for coordinator in coordinators:
+            coordinator.start_recording()
+
+    async def stop_recording_service(call: ServiceCall) -> ServiceResponse:
+        """Service to stop recording and save the session file."""
+        session = call.data["session"]
+        coordinators = async_resolve_coordinators(hass, call)
+        if len(coordinators) != 1:
+            raise HomeAssistantError("Select exactly one train to save a recording from")
+        coordinator = coordinators[0]
+        if not coordinator.recording:
+            raise HomeAssistantError(f"{coordinator.name} is not recording")
+        frames = coordinator.stop_recording()
+        size = await hass.async_add_executor_job(
+            save_session, hass.config.path(SESSIONS_DIR), session, frames
+        )
+        _LOGGER.info("Saved session %s with %d commands", session, len(frames))
+        return {
+            "session": session,
+            "frames": len(frames),
+            "length_s": round(frames[-1][0], 3) if frames else 0.0,
+            "bytes": size,
+        }
+
+    async def replay_session_service(call: ServiceCall) -> ServiceResponse:
+        """Service to replay a recorded session."""
+        session = call.data["session"]
+        rate = call.data["rate"]
+        wait = call.data["wait"]
+        try:
+            frames = await hass.async_add_executor_job(
+                load_session, hass.config.path(SESSIONS_DIR), session
+            )
+        except FileNotFoundError as err:
+            raise HomeAssistantError(f"Unknown session {session}") from err
+        except (OSError, ValueError) as err:
+            raise HomeAssistantError(f"Could not read session {session}: {err}") from err
+        coordinators = async_resolve_coordinators(hass, call)
+        _LOGGER.debug("Replaying session %s at %.2fx via service", session, rate)
+        reports = await asyncio.gather(
+            *(c.async_replay_session(session, frames, rate, wait) for c in coordinators)
+        )
+        return {
+            coordinator.mac_address: report if wait else {"name": session, "started": True}
+            for coordinator, report in zip(coordinators, reports)
+        }
+
+    async def list_sessions_service(call: ServiceCall) -> ServiceResponse:
+        """Service to list recorded session files."""
+        return await hass.async_add_executor_job(
+            list_sessions, hass.config.path(SESSIONS_DIR)
+        )
+
+    async def dump_traces_service(call: ServiceCall) -> ServiceResponse:
+        """Service to return recorded command traces and per-command stage latencies."""
+        traces = {}
+        for coordinator in async_resolve_coordinators(hass, call):
+            traces[coordinator.mac_address] = {
+                "name": coordinator.name, **coordinator.tracer.as_dict()
+            }
+            if call.data["clear"]:
+                coordinator.tracer.clear()
+        return traces
+
+    hass.services.async_register(DOMAIN, "set_speed", set_speed_service, schema=SPEED_SCHEMA)
+    hass.services.async_register(DOMAIN, "set_direction", set_direction_service, schema=DIRECTION_SCHEMA)
+    hass.services.async_register(DOMAIN, "stop", stop_service, schema=COMMAND_SCHEMA)
+    hass.services.async_register(DOMAIN, "horn", horn_service, schema=PULSE_SCHEMA)
+    hass.services.async_register(DOMAIN, "bell", bell_service, schema=PULSE_SCHEMA)
+    hass.services.async_register(DOMAIN, "lights_on", lights_on_service, schema=COMMAND_SCHEMA)
+    hass.services.async_register(DOMAIN, "lights_off", lights_off_service, schema=COMMAND_SCHEMA)
+    hass.services.async_register(DOMAIN, "play_announcement", play_announcement_service, schema=ANNOUNCEMENT_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, "connect", connect_service, schema=vol.Schema(cv.ENTITY_SERVICE_FIELDS)
+    )
+    hass.services.async_register(DOMAIN, "disconnect", disconnect_service, schema=COMMAND_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, "fleet_stop", fleet_stop_service,
+        schema=FLEET_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "fleet_lights", fleet_lights_service,
+        schema=FLEET_LIGHTS_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "fleet_horn", fleet_horn_service,
+        schema=FLEET_HORN_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "fleet_apply_scene", fleet_apply_scene_service,
+        schema=FLEET_SCENE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "create_consist", create_consist_service,
+        schema=CREATE_CONSIST_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "remove_consist", remove_consist_service, schema=CONSIST_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, "consist_set_speed", consist_set_speed_service,
+        schema=CONSIST_SPEED_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "consist_set_direction", consist_set_direction_service,
+        schema=CONSIST_DIRECTION_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "list_consists", list_consists_service,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN, "run_sequence", run_sequence_service,
+        schema=RUN_SEQUENCE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "cancel_sequence", cancel_sequence_service,
+        schema=vol.Schema(cv.ENTITY_SERVICE_FIELDS),
+    )
+    hass.services.async_register(
+        DOMAIN, "list_sequences", list_sequences_service,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, "start_recording", start_recording_service,
+        schema=vol.Schema(cv.ENTITY_SERVICE_FIELDS),
+    )
+    hass.services.async_register(
+        DOMAIN, "stop_recording", stop_recording_service,
+        schema=STOP_RECORDING_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "replay_session", replay_session_service,
+        schema=REPLAY_SESSION_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "list_sessions", list_sessions_service,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, "dump_traces", dump_traces_service,
+        schema=DUMP_TRACES_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+
+    _LOGGER.info("Registered Lionel Train services")
@@ -0,0 +1,136 @@
+"""Slotted state snapshots for a train."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any
+
+from .const import (
+    CMD_BELL,
+    CMD_DIRECTION,
+    CMD_HORN,
+    CMD_LIGHTS,
+    CMD_MASTER_VOLUME,
+    CMD_SMOKE,
+    CMD_SOUND_VOLUME,
+    CMD_SPEED,
+    DEFAULT_PITCH,
+    DEFAULT_VOLUME,
+    DIRECTION_FORWARD,
+    SOUND_SOURCE_BELL,
+    SOUND_SOURCE_ENGINE,
+    SOUND_SOURCE_HORN,
+    SOUND_SOURCE_SPEECH,
+)
+
+# TrainState field prefix for each sound source
+SOUND_SOURCE_FIELDS = {
+    SOUND_SOURCE_HORN: "horn",
+    SOUND_SOURCE_BELL: "bell",
+    SOUND_SOURCE_SPEECH: "speech",
+    SOUND_SOURCE_ENGINE: "engine",
+}
+
+# TrainState field switched by each on/off command
+_SWITCH_FIELDS = {
+    CMD_LIGHTS: "lights_on",
+    CMD_HORN: "horn_on",
+    CMD_BELL: "bell_on",
+    CMD_SMOKE: "smoke_on",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class TrainState:
+    """Immutable snapshot of a train's controllable state.
+
+    Every change produces a new snapshot with ``version`` incremented, so
+    entities and persistence detect a change with a single integer
+    comparison instead of comparing fields.
+    """
+
+    speed: int = 0
+    direction_forward: bool = True
+    lights_on: bool = True  # Locomotive lights are on when it powers up
+    horn_on: bool = False
+    bell_on: bool = False
+    smoke_on: bool = False
+    master_volume: int = DEFAULT_VOLUME
+    horn_volume: int = DEFAULT_VOLUME
+    bell_volume: int = DEFAULT_VOLUME
+    speech_volume: int = DEFAULT_VOLUME
+    engine_volume: int = DEFAULT_VOLUME
+    horn_pitch: int = DEFAULT_PITCH
+    bell_pitch: int = DEFAULT_PITCH
+    speech_pitch: int = DEFAULT_PITCH
+    engine_pitch: int = DEFAULT_PITCH
+    version: int = 0
+
+    def evolve(self, **changes: Any) -> TrainState:
+        """Return a snapshot with changes applied, or self if nothing changed."""
+        for name, value in changes.items():
+            if getattr(self, name) != value:
+                return replace(self, version=self.version + 1, **changes)
+        return self
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceDetails:
+    """Device information read from the locomotive's GATT characteristics."""
+
+    model_number: str | None = None
+    serial_number: str | None = None
+    firmware_revision: str | None = None
+    hardware_revision: str | None = None
+    software_revision: str | None = None
+    manufacturer_name: str | None = None
+
+
+@dataclass(slots=True)
+class CommandCounters:
+    """Mutable command and connection counters, updated on the hot path."""
+
+    connection_attempts: int = 0
+    successful_commands: int = 0
+    failed_commands: int = 0
+    timed_out_commands: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a dict."""
+        return asdict(self)
+
+
+# TrainState fields persisted across restarts. Motion is excluded because a
+# train powers up stopped and motion is never replayed; horn/bell are transient
+PERSISTED_STATE_FIELDS = tuple(
+    field.name for field in fields(TrainState)
+    if field.name not in ("speed", "direction_forward", "horn_on", "bell_on", "version")
+)
+DEVICE_DETAIL_FIELDS = tuple(field.name for field in fields(DeviceDetails))
+
+
+def command_state_changes(command: list[int] | bytes) -> dict[str, Any]:
+    """Return the TrainState changes a raw command frame makes once written.
+
+    Used for frames that do not come from the typed setters, such as a
+    replayed session. Frames that change no tracked state return {}.
+    """
+    if len(command) < 3:
+        return {}
+    code, value = command[1], command[2]
+    if code == CMD_SPEED:
+        return {"speed": int((value / 31) * 100)}  # 0-31 back to 0-100%
+    if code == CMD_DIRECTION:
+        return {"direction_forward": value == DIRECTION_FORWARD}
+    if (name := _SWITCH_FIELDS.get(code)) is not None:
+        return {name: value != 0}
+    if code == CMD_MASTER_VOLUME:
+        return {"master_volume": value}
+    if code == CMD_SOUND_VOLUME and len(command) > 3:
+        if (prefix := SOUND_SOURCE_FIELDS.get(value)) is None:
+            return {}
+        changes: dict[str, Any] = {f"{prefix}_volume": command[3]}
+        if len(command) > 4:
+            pitch = command[4]
+            changes[f"{prefix}_pitch"] = pitch - 0x100 if pitch > 0x7F else pitch
+        return changes
+    return {}
@@ -50,7 +50,7 @@ class LionelTrainSwitchBase(SwitchEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.connected
+        return self._coordinator.state_available
 
 
 class LionelTrainLightsSwitch(LionelTrainSwitchBase):
@@ -67,7 +67,7 @@ class LionelTrainLightsSwitch(LionelTrainSwitchBase):
     @property
     def is_on(self) -> bool:
         """Return True if the lights are on."""
-        return self._coordinator.lights_on
+        return self._coordinator.state.lights_on
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the lights."""
@@ -0,0 +1,122 @@
+"""Optional per-command lifecycle tracing."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+import time
+from typing import Any
+
+# Completed traces kept per train
+TRACE_BUFFER_SIZE = 200
+
+# Lifecycle stages, in the order a command normally reaches them
+TRACE_STAGES = (
+    "enqueue",
+    "lock_acquired",
+    "connect",
+    "write_start",
+    "write_done",
+    "state_published",
+)
+
+# Trace of the command being sent by the current task. Child tasks (the
+# deadline wrapper) inherit it, and so does the entity setter that awaits
+# the send and then publishes the new state.
+_current_trace: ContextVar[CommandTrace | None] = ContextVar(
+    "lionel_command_trace", default=None
+)
+
+
+class CommandTrace:
+    """Stage timestamps (ms since enqueue) of one command."""
+
+    __slots__ = ("code", "frame", "started", "marks", "success", "closed")
+
+    def __init__(self, command: list[int]) -> None:
+        """Start a trace at the enqueue stage."""
+        self.code = command[1]
+        self.frame = bytes(command).hex()
+        self.started = time.perf_counter()
+        self.marks: dict[str, float] = {"enqueue": 0.0}
+        self.success: bool | None = None
+        self.closed = False
+
+    def mark(self, stage: str) -> None:
+        """Record reaching a stage; later marks of the same stage win."""
+        if not self.closed:
+            self.marks[stage] = round((time.perf_counter() - self.started) * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace for the dump service."""
+        return {"command": self.frame, "success": self.success, "stages_ms": dict(self.marks)}
+
+
+def trace_mark(stage: str) -> None:
+    """Mark a stage on the command traced by the current task, if any."""
+    if (trace := _current_trace.get()) is not None:
+        trace.mark(stage)
+
+
+class CommandTracer:
+    """Bounded buffer of command traces with per-command-code aggregates."""
+
+    def __init__(self, max_traces: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize the tracer (disabled)."""
+        self.enabled = False
+        self._recent: deque[CommandTrace] = deque(maxlen=max_traces)
+        # command code -> stage -> [count, total ms, max ms]
+        self._stats: dict[int, dict[str, list[float]]] = {}
+
+    def start(self, command: list[int]) -> CommandTrace | None:
+        """Begin tracing a command issued by the current task."""
+        if not self.enabled:
+            return None
+        trace = CommandTrace(command)
+        _current_trace.set(trace)
+        return trace
+
+    def finish(self, trace: CommandTrace, success: bool) -> None:
+        """Close a trace once the caller has had a chance to publish state.
+
+        The caller resumes in the same loop iteration the send returns in,
+        so a trace closed with ``call_soon`` still sees the state_published
+        mark of the entity setter.
+        """
+        trace.success = success
+        asyncio.get_running_loop().call_soon(self._close, trace)
+
+    def _close(self, trace: CommandTrace) -> None:
+        """Store a finished trace and fold it into the aggregates."""
+        trace.closed = True
+        self._recent.append(trace)
+        stages = self._stats.setdefault(trace.code, {})
+        for stage, elapsed in trace.marks.items():
+            stat = stages.setdefault(stage, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] = max(stat[2], elapsed)
+
+    def clear(self) -> None:
+        """Drop all traces and aggregates."""
+        self._recent.clear()
+        self._stats.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return recent traces and per-command-code stage statistics."""
+        return {
+            "enabled": self.enabled,
+            "recent": [trace.as_dict() for trace in self._recent],
+            "by_command": {
+                f"0x{code:02x}": {
+                    stage: {
+                        "count": int(stages[stage][0]),
+                        "mean_ms": round(stages[stage][1] / stages[stage][0], 3),
+                        "max_ms": stages[stage][2],
+                    }
+                    for stage in TRACE_STAGES
+                    if stage in stages
+                }
+                for code, stages in sorted(self._stats.items())
+            },
+        }
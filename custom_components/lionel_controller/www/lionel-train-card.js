@@ -3,15 +3,50 @@
  * A custom Lovelace card for controlling Lionel LionChief trains
  */
 
+// Shortest gap between throttle service calls while dragging (ms); override with throttle_interval
+const THROTTLE_SEND_INTERVAL = 150;
+// Show the slider position until the entity confirms it, but no longer than this (ms)
+const OPTIMISTIC_TIMEOUT = 3000;
+// Smoothing factor of the round-trip latency average (weight of the newest sample)
+const LATENCY_ALPHA = 0.3;
+
+// The locomotive has 32 speed steps: a value set is rounded down to a step,
+// and status notifications report the step back as a rounded-down percentage
+const reportedSpeed = (value) => Math.floor((Math.floor((value / 100) * 31) * 100) / 31);
+
 class LionelTrainCard extends HTMLElement {
   constructor() {
     super();
     this.attachShadow({ mode: 'open' });
+    this._states = {};
+    this._frame = null;
+
+    // Throttle delivery: last value sent, when, and the value shown until confirmed
+    this._sendTimer = null;
+    this._lastSendAt = -Infinity;
+    this._sentValue = null;
+    this._sentAt = null;
+    this._optimistic = null;
+    this._optimisticTimer = null;
+    this._latency = null;
   }
 
   set hass(hass) {
     this._hass = hass;
-    this._updateCard();
+    if (!this._config) return;
+
+    // hass is replaced on every state change in the house; state objects of
+    // unchanged entities keep their identity, so compare just the watched ones
+    let changed = false;
+    for (const entityId of this._watched) {
+      const state = hass.states[entityId];
+      if (state !== this._states[entityId]) {
+        this._states[entityId] = state;
+        changed = true;
+        if (entityId === this._entities.throttle) this._confirmThrottle(state);
+      }
+    }
+    if (changed) this._scheduleUpdate();
   }
 
   setConfig(config) {
@@ -19,14 +54,51 @@ class LionelTrainCard extends HTMLElement {
       throw new Error('You need to define an entity (the throttle number entity)');
     }
     this._config = config;
+    this._sendInterval = config.throttle_interval ?? THROTTLE_SEND_INTERVAL;
     this._entityBase = config.entity.replace('_throttle', '').replace('number.', '');
+
+    // Resolve entity IDs once instead of on every update
+    this._entities = {
+      connection: `binary_sensor.${this._getEntityId('connection')}`,
+      throttle: `number.${this._getEntityId('throttle')}`,
+      lights: `switch.${this._getEntityId('lights')}`,
+    };
+    this._buttons = {};
+    for (const action of ['stop', 'forward', 'reverse', 'horn', 'bell', 'disconnect']) {
+      this._buttons[action] = `button.${this._getEntityId(action)}`;
+    }
+    this._watched = Object.values(this._entities);
+    this._states = {};
+
     this._render();
+    if (this._hass) this.hass = this._hass;
+  }
+
+  connectedCallback() {
+    // A frame cancelled while detached is redrawn on reattach
+    if (this._hass && this._config) this._scheduleUpdate();
+  }
+
+  disconnectedCallback() {
+    if (this._frame !== null) {
+      cancelAnimationFrame(this._frame);
+      this._frame = null;
+    }
   }
 
   _getEntityId(suffix) {
     return `${this._entityBase}_${suffix}`;
   }
 
+  _scheduleUpdate() {
+    // Coalesce all changes within a frame into one batch of DOM writes
+    if (this._frame !== null) return;
+    this._frame = requestAnimationFrame(() => {
+      this._frame = null;
+      this._updateCard();
+    });
+  }
+
   _render() {
     this.shadowRoot.innerHTML = `
       <style>
@@ -100,6 +172,11 @@ class LionelTrainCard extends HTMLElement {
           color: var(--primary-color);
         }
         
+        .latency {
+          font-size: 0.75em;
+          color: var(--secondary-text);
+        }
+        
         .throttle-slider {
           width: 100%;
           height: 40px;
@@ -266,7 +343,7 @@ class LionelTrainCard extends HTMLElement {
           
           <div class="throttle-section">
             <div class="throttle-label">
-              <span>Throttle</span>
+              <span>Throttle <span class="latency" id="latency" title="Round trip of the last throttle change"></span></span>
               <span class="speed-value" id="speed-display">0%</span>
             </div>
             <input type="range" class="throttle-slider" id="throttle" min="0" max="100" value="0">
@@ -324,11 +401,21 @@ class LionelTrainCard extends HTMLElement {
       </ha-card>
     `;
 
+    const root = this.shadowRoot;
+    this._els = {
+      card: root.querySelector('.card'),
+      status: root.getElementById('status'),
+      throttle: root.getElementById('throttle'),
+      speedDisplay: root.getElementById('speed-display'),
+      latency: root.getElementById('latency'),
+      lights: root.getElementById('btn-lights'),
+    };
+
     this._setupEventListeners();
   }
 
   _setupEventListeners() {
-    const throttle = this.shadowRoot.getElementById('throttle');
+    const throttle = this._els.throttle;
     const btnStop = this.shadowRoot.getElementById('btn-stop');
     const btnForward = this.shadowRoot.getElementById('btn-forward');
     const btnReverse = this.shadowRoot.getElementById('btn-reverse');
@@ -344,9 +431,13 @@ class LionelTrainCard extends HTMLElement {
 
     // Stop button
     btnStop.addEventListener('click', () => {
+      // A trailing throttle update must not restart the train after a stop
+      clearTimeout(this._sendTimer);
+      this._sendTimer = null;
       this._pressButton('stop');
-      throttle.value = 0;
-      this.shadowRoot.getElementById('speed-display').textContent = '0%';
+      this._sentValue = 0;
+      this._sentAt = performance.now();
+      this._showOptimistic(0);
     });
 
     // Direction buttons
@@ -361,69 +452,114 @@ class LionelTrainCard extends HTMLElement {
   }
 
   _setThrottle(value) {
-    const entityId = `number.${this._getEntityId('throttle')}`;
+    this._showOptimistic(value);
+
+    // Send at most once per interval; the timer delivers the final value of a drag
+    const wait = this._lastSendAt + this._sendInterval - performance.now();
+    if (wait <= 0) {
+      this._sendThrottle();
+    } else if (this._sendTimer === null) {
+      this._sendTimer = setTimeout(() => {
+        this._sendTimer = null;
+        this._sendThrottle();
+      }, wait);
+    }
+  }
+
+  _sendThrottle() {
+    const value = this._optimistic;
+    if (value === null) return;
+    // Skip only a repeat of a send still awaiting confirmation; once confirmed,
+    // the speed may have changed elsewhere, so the same value is sent again
+    const inFlight = this._sentAt !== null
+      && performance.now() - this._sentAt < OPTIMISTIC_TIMEOUT;
+    if (inFlight && value === this._sentValue) return;
+    this._lastSendAt = performance.now();
+    this._sentValue = value;
+    this._sentAt = this._lastSendAt;
     this._hass.callService('number', 'set_value', {
-      entity_id: entityId,
+      entity_id: this._entities.throttle,
       value: value
+    }).catch(() => {
+      // Rejected: stop overriding the entity's value
+      this._sentAt = null;
+      this._clearOptimistic();
     });
-    this.shadowRoot.getElementById('speed-display').textContent = `${value}%`;
+  }
+
+  _showOptimistic(value) {
+    this._optimistic = value;
+    this._els.throttle.value = value;
+    this._els.speedDisplay.textContent = `${value}%`;
+    clearTimeout(this._optimisticTimer);
+    this._optimisticTimer = setTimeout(() => this._clearOptimistic(), OPTIMISTIC_TIMEOUT);
+  }
+
+  _clearOptimistic() {
+    clearTimeout(this._optimisticTimer);
+    this._optimisticTimer = null;
+    this._optimistic = null;
+    this._scheduleUpdate();
+  }
+
+  _confirmThrottle(state) {
+    // Values from earlier in a drag are still arriving; wait for the last one sent
+    if (!state || this._sentAt === null) return;
+    const value = parseFloat(state.state) || 0;
+    if (value !== this._sentValue && value !== reportedSpeed(this._sentValue)) return;
+
+    const roundTrip = performance.now() - this._sentAt;
+    this._latency = this._latency === null
+      ? roundTrip
+      : this._latency + LATENCY_ALPHA * (roundTrip - this._latency);
+    this._sentAt = null;
+    if (this._sendTimer === null && this._optimistic === this._sentValue) {
+      this._clearOptimistic();
+    }
   }
 
   _pressButton(action) {
-    const entityId = `button.${this._getEntityId(action)}`;
     this._hass.callService('button', 'press', {
-      entity_id: entityId
+      entity_id: this._buttons[action]
     });
   }
 
   _toggleSwitch(action) {
-    const entityId = `switch.${this._getEntityId(action)}`;
     this._hass.callService('switch', 'toggle', {
-      entity_id: entityId
+      entity_id: this._entities[action]
     });
   }
 
   _updateCard() {
     if (!this._hass || !this._config) return;
+    const els = this._els;
 
     // Update connection status
-    const connectionEntity = `binary_sensor.${this._getEntityId('connected')}`;
-    const connectionState = this._hass.states[connectionEntity];
-    const statusEl = this.shadowRoot.getElementById('status');
-    
+    const connectionState = this._states[this._entities.connection];
     if (connectionState) {
       const isConnected = connectionState.state === 'on';
-      statusEl.textContent = isConnected ? 'Connected' : 'Disconnected';
-      statusEl.className = `status ${isConnected ? 'connected' : 'disconnected'}`;
-      
+      els.status.textContent = isConnected ? 'Connected' : 'Disconnected';
+      els.status.className = `status ${isConnected ? 'connected' : 'disconnected'}`;
+
       // Disable controls if disconnected
-      const card = this.shadowRoot.querySelector('.card');
-      if (!isConnected) {
-        card.classList.add('unavailable');
-      } else {
-        card.classList.remove('unavailable');
-      }
+      els.card.classList.toggle('unavailable', !isConnected);
     }
 
-    // Update throttle value
-    const throttleEntity = `number.${this._getEntityId('throttle')}`;
-    const throttleState = this._hass.states[throttleEntity];
-    if (throttleState) {
+    // Update throttle value, unless a value the user set is still unconfirmed
+    const throttleState = this._states[this._entities.throttle];
+    if (throttleState && this._optimistic === null) {
       const value = parseFloat(throttleState.state) || 0;
-      this.shadowRoot.getElementById('throttle').value = value;
-      this.shadowRoot.getElementById('speed-display').textContent = `${Math.round(value)}%`;
+      els.throttle.value = value;
+      els.speedDisplay.textContent = `${Math.round(value)}%`;
+    }
+    if (this._latency !== null) {
+      els.latency.textContent = `${Math.round(this._latency)} ms`;
     }
 
     // Update lights button state
-    const lightsEntity = `switch.${this._getEntityId('lights')}`;
-    const lightsState = this._hass.states[lightsEntity];
-    const lightsBtn = this.shadowRoot.getElementById('btn-lights');
-    if (lightsState && lightsBtn) {
-      if (lightsState.state === 'on') {
-        lightsBtn.classList.add('active');
-      } else {
-        lightsBtn.classList.remove('active');
-      }
+    const lightsState = this._states[this._entities.lights];
+    if (lightsState) {
+      els.lights.classList.toggle('active', lightsState.state === 'on');
     }
   }
 
@@ -0,0 +1 @@
+"""Tests for the Lionel Train Controller integration."""
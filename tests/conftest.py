@@ -0,0 +1,2 @@
+"""Fixtures for the Lionel Train Controller tests."""
+pytest_plugins = "pytest_homeassistant_custom_component"
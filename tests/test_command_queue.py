@@ -0,0 +1,65 @@
+"""Tests for the offline command queue."""
+from custom_components.lionel_controller.command_queue import PendingCommandQueue, command_kind
+from custom_components.lionel_controller.const import CMD_HORN, CMD_LIGHTS, CMD_SOUND_VOLUME, CMD_SPEED
+
+
+def test_command_kind_keys_sound_volume_per_source() -> None:
+    """Sound volume commands coalesce per source, everything else per command."""
+    assert command_kind([0x00, CMD_SPEED, 10, 0x00]) == (CMD_SPEED,)
+    assert command_kind([0x00, CMD_SOUND_VOLUME, 0x01, 5, 0x00]) == (CMD_SOUND_VOLUME, 0x01)
+    assert command_kind([0x00, CMD_SOUND_VOLUME, 0x02, 5, 0x00]) == (CMD_SOUND_VOLUME, 0x02)
+
+
+def test_put_replaces_pending_command_of_same_kind() -> None:
+    """Only the latest command of a kind survives, in the order of the latest updates."""
+    queue = PendingCommandQueue(max_size=10, ttl=60)
+    queue.put([0x00, CMD_SPEED, 5, 0x00])
+    queue.put([0x00, CMD_LIGHTS, 1, 0x00])
+    queue.put([0x00, CMD_SPEED, 20, 0x00])
+
+    assert len(queue) == 2
+    assert queue.drain() == [[0x00, CMD_LIGHTS, 1, 0x00], [0x00, CMD_SPEED, 20, 0x00]]
+    assert queue.coalesced == 1
+    assert len(queue) == 0
+
+
+def test_put_keeps_sound_sources_apart() -> None:
+    """Volume changes for different sound sources do not replace each other."""
+    queue = PendingCommandQueue(max_size=10, ttl=60)
+    queue.put([0x00, CMD_SOUND_VOLUME, 0x01, 3, 0x00])
+    queue.put([0x00, CMD_SOUND_VOLUME, 0x02, 4, 0x00])
+
+    assert len(queue) == 2
+    assert queue.coalesced == 0
+
+
+def test_drain_drops_expired_commands() -> None:
+    """Commands past their TTL are counted and not returned."""
+    queue = PendingCommandQueue(max_size=10, ttl=60)
+    queue.put([0x00, CMD_SPEED, 10, 0x00], ttl=-1)
+    queue.put([0x00, CMD_LIGHTS, 0, 0x00])
+
+    assert queue.drain() == [[0x00, CMD_LIGHTS, 0, 0x00]]
+    assert queue.expired == 1
+
+
+def test_replacing_a_command_renews_its_ttl() -> None:
+    """A fresh command of a kind is not dropped for the age of the one it replaced."""
+    queue = PendingCommandQueue(max_size=10, ttl=60)
+    queue.put([0x00, CMD_SPEED, 10, 0x00], ttl=-1)
+    queue.put([0x00, CMD_SPEED, 12, 0x00])
+
+    assert queue.drain() == [[0x00, CMD_SPEED, 12, 0x00]]
+    assert queue.expired == 0
+
+
+def test_full_queue_drops_oldest_kind() -> None:
+    """A new kind in a full queue evicts the oldest pending command."""
+    queue = PendingCommandQueue(max_size=2, ttl=60)
+    queue.put([0x00, CMD_SPEED, 10, 0x00])
+    queue.put([0x00, CMD_LIGHTS, 1, 0x00])
+    queue.put([0x00, CMD_HORN, 1, 0x00])
+
+    assert (CMD_SPEED,) not in queue
+    assert queue.drain() == [[0x00, CMD_LIGHTS, 1, 0x00], [0x00, CMD_HORN, 1, 0x00]]
+    assert queue.as_dict() == {"pending": 0, "coalesced": 0, "expired": 0, "dropped": 1}
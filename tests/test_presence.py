@@ -0,0 +1,110 @@
+"""Tests for the advertisement presence tracker."""
+import pytest
+
+from custom_components.lionel_controller.const import (
+    PRESENCE_ENTER_ADVERTISEMENTS,
+    PRESENCE_EXIT_RSSI,
+    PRESENCE_MISSED_INTERVALS,
+    PRESENCE_TIMEOUT,
+)
+from custom_components.lionel_controller.presence import (
+    INTERVAL_ALPHA,
+    RSSI_ALPHA,
+    AdvertisementTracker,
+)
+
+
+def test_rssi_and_interval_are_smoothed() -> None:
+    """The first sample seeds each average and later samples move it by alpha."""
+    tracker = AdvertisementTracker()
+    tracker.record(-60, 100.0)
+    assert tracker.rssi == -60
+    assert tracker.interval is None
+
+    tracker.record(-70, 101.0)
+    assert tracker.rssi == pytest.approx(-60 + RSSI_ALPHA * -10)
+    assert tracker.interval == pytest.approx(1.0)
+
+    tracker.record(-70, 103.0)
+    assert tracker.interval == pytest.approx(1.0 + INTERVAL_ALPHA * 1.0)
+
+
+def test_present_after_enough_strong_advertisements() -> None:
+    """A single advertisement is not enough to count as present."""
+    tracker = AdvertisementTracker()
+    changes = [tracker.record(-60, float(i)) for i in range(PRESENCE_ENTER_ADVERTISEMENTS)]
+
+    assert changes == [False] * (PRESENCE_ENTER_ADVERTISEMENTS - 1) + [True]
+    assert tracker.present
+
+
+def test_weak_signal_does_not_make_a_train_present() -> None:
+    """Advertisements below the enter threshold leave the train absent."""
+    tracker = AdvertisementTracker()
+    for i in range(10):
+        assert not tracker.record(-93, float(i))
+    assert not tracker.present
+
+
+def test_hysteresis_between_enter_and_exit_thresholds() -> None:
+    """A present train stays present between the thresholds and leaves below the exit one."""
+    tracker = AdvertisementTracker()
+    for i in range(PRESENCE_ENTER_ADVERTISEMENTS):
+        tracker.record(-85, float(i))
+    assert tracker.present
+
+    now = float(PRESENCE_ENTER_ADVERTISEMENTS)
+    for _ in range(30):
+        assert not tracker.record(-94, now)  # Below the enter threshold, above the exit one
+        now += 1
+    assert tracker.rssi < -93
+    assert tracker.present
+
+    while tracker.rssi >= PRESENCE_EXIT_RSSI:
+        changed = tracker.record(-110, now)
+        now += 1
+    assert changed
+    assert not tracker.present
+
+
+def test_silent_train_times_out() -> None:
+    """Silence longer than the timeout makes a train absent, once."""
+    tracker = AdvertisementTracker()
+    for i in range(PRESENCE_ENTER_ADVERTISEMENTS):
+        tracker.record(-60, float(i))
+    last = tracker.last_seen
+
+    assert not tracker.check(last + PRESENCE_TIMEOUT)
+    assert tracker.check(last + PRESENCE_TIMEOUT + 1)
+    assert not tracker.check(last + PRESENCE_TIMEOUT + 2)
+    assert not tracker.present
+
+
+def test_timeout_scales_with_slow_advertisers() -> None:
+    """A train advertising slowly gets several of its own intervals before timing out."""
+    tracker = AdvertisementTracker()
+    tracker.record(-60, 0.0)
+    tracker.record(-60, 20.0)
+
+    assert tracker.timeout == 20.0 * PRESENCE_MISSED_INTERVALS
+
+
+def test_reappearing_train_needs_a_new_streak() -> None:
+    """After timing out, a train again needs several advertisements to be present."""
+    tracker = AdvertisementTracker()
+    for i in range(PRESENCE_ENTER_ADVERTISEMENTS):
+        tracker.record(-60, float(i))
+    tracker.check(1000.0)
+    assert not tracker.present
+
+    assert not tracker.record(-60, 1000.0)
+    assert tracker.interval == pytest.approx(1.0)  # The long gap is not an interval
+    assert tracker.record(-60, 1001.0)
+
+
+def test_connection_marks_train_present() -> None:
+    """A live connection is proof of presence without advertisements."""
+    tracker = AdvertisementTracker()
+    assert tracker.mark_seen(5.0)
+    assert not tracker.mark_seen(6.0)
+    assert tracker.present
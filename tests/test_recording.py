@@ -0,0 +1,90 @@
+"""Tests for the session recording format and replay thinning."""
+import pytest
+
+from custom_components.lionel_controller.const import CMD_HORN, CMD_SOUND_VOLUME, CMD_SPEED
+from custom_components.lionel_controller.recording import (
+    SESSION_MAGIC,
+    coalesce_frames,
+    decode_session,
+    encode_session,
+    list_sessions,
+    load_session,
+    save_session,
+)
+
+
+def _speed(offset: float, value: int) -> tuple[float, bytes]:
+    return (offset, bytes((0x00, CMD_SPEED, value, 0x00)))
+
+
+def test_session_round_trip() -> None:
+    """Frames survive encoding at millisecond resolution."""
+    frames = [
+        _speed(0.0, 5),
+        (0.1234, bytes((0x00, CMD_SOUND_VOLUME, 0x01, 4, 0xFE, 0x00))),
+        (61.5, bytes((0x00, CMD_HORN, 0x01, 0x00))),
+    ]
+    data = encode_session(frames)
+
+    assert data.startswith(SESSION_MAGIC)
+    assert decode_session(data) == [frames[0], (0.123, frames[1][1]), frames[2]]
+
+
+def test_empty_session_round_trip() -> None:
+    """A session with no frames is just the magic."""
+    assert encode_session([]) == SESSION_MAGIC
+    assert decode_session(SESSION_MAGIC) == []
+
+
+@pytest.mark.parametrize("cut", [1, 3, 6])
+def test_truncated_session_is_rejected(cut: int) -> None:
+    """A file cut short in a header or a frame is not silently shortened."""
+    data = encode_session([_speed(0.0, 5), _speed(0.5, 10)])
+    with pytest.raises(ValueError, match="Truncated"):
+        decode_session(data[:-cut])
+
+
+def test_foreign_file_is_rejected() -> None:
+    """Data without the magic is not a session."""
+    with pytest.raises(ValueError, match="Not a Lionel session"):
+        decode_session(b"RIFF\x00\x00")
+
+
+def test_save_load_and_list(tmp_path) -> None:
+    """Sessions on disk are listed with their frame count and length; bad files are skipped."""
+    frames = [_speed(0.0, 5), _speed(2.5, 0)]
+    size = save_session(str(tmp_path), "yard", frames)
+    (tmp_path / "broken.lcs").write_bytes(b"nope")
+
+    assert load_session(str(tmp_path), "yard") == frames
+    assert list_sessions(str(tmp_path)) == {"yard": {"frames": 2, "length_s": 2.5, "bytes": size}}
+    assert list_sessions(str(tmp_path / "missing")) == {}
+
+
+def test_coalesce_keeps_last_frame_of_each_burst() -> None:
+    """A slider drag faster than the link is thinned, but its final value is kept."""
+    drag = [_speed(i * 0.01, i) for i in range(10)]
+    kept = coalesce_frames(drag, 0.03)
+
+    assert kept[0] == drag[0]
+    assert kept[-1] == drag[-1]
+    assert len(kept) < len(drag)
+    assert all(b[0] - a[0] >= 0.03 for a, b in zip(kept, kept[1:-1]))
+
+
+def test_coalesce_keeps_frames_of_other_kinds() -> None:
+    """Thinning one kind never drops a frame of another kind."""
+    horn_on = (0.005, bytes((0x00, CMD_HORN, 0x01, 0x00)))
+    horn_off = (0.015, bytes((0x00, CMD_HORN, 0x00, 0x00)))
+    frames = [_speed(0.0, 1), horn_on, _speed(0.01, 2), horn_off, _speed(0.02, 3)]
+
+    kept = coalesce_frames(frames, 0.03)
+
+    assert horn_on in kept and horn_off in kept
+    assert kept[-1] == _speed(0.02, 3)
+
+
+def test_coalesce_leaves_slow_sessions_alone() -> None:
+    """Frames already further apart than the link needs are all kept."""
+    frames = [_speed(i * 0.5, i) for i in range(5)]
+    assert coalesce_frames(frames, 0.03) == frames
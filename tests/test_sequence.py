@@ -0,0 +1,99 @@
+"""Tests for the timed sequence engine."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.lionel_controller.sequence import (
+    BUILTIN_SEQUENCES,
+    Frame,
+    async_play_frames,
+    compile_sequence,
+)
+
+
+def test_grade_crossing_schedule() -> None:
+    """Long, long, short, long with gaps measured from the end of each blast."""
+    assert compile_sequence(BUILTIN_SEQUENCES["grade_crossing"]) == [
+        Frame(0.0, "horn", True),
+        Frame(1.0, "horn", False),
+        Frame(1.5, "horn", True),
+        Frame(2.5, "horn", False),
+        Frame(3.0, "horn", True),
+        Frame(3.4, "horn", False),
+        Frame(3.9, "horn", True),
+        Frame(5.9, "horn", False),
+    ]
+
+
+def test_at_is_absolute_and_frames_are_sorted() -> None:
+    """Steps with ``at`` start at a fixed offset, even before earlier steps."""
+    frames = compile_sequence([
+        {"action": "bell", "duration": 2.0},
+        {"action": "horn", "at": 0.5},
+        {"action": "speed", "value": 30, "delay": 0.25},
+    ])
+
+    assert frames == [
+        Frame(0.0, "bell", True),
+        Frame(0.5, "horn", True),
+        Frame(0.75, "speed", 30),
+        Frame(2.0, "bell", False),
+    ]
+
+
+def test_step_values_are_normalized() -> None:
+    """Direction, lights and announcement values become what the setters take."""
+    frames = compile_sequence([
+        {"action": "direction", "value": "reverse"},
+        {"action": "lights", "value": "off"},
+        {"action": "announcement", "value": 3},
+    ])
+
+    assert [frame.value for frame in frames] == [False, False, 3]
+
+
+@pytest.mark.parametrize(
+    "step",
+    [
+        {"action": "speed", "value": 101},
+        {"action": "direction", "value": "sideways"},
+        {"action": "announcement", "value": 256},
+        {"action": "fly"},
+        {"action": "speed", "value": 20, "duration": 1.0},
+        {"action": "lights", "duration": 1.0},
+    ],
+)
+def test_invalid_steps_are_rejected(step: dict) -> None:
+    """Out-of-range values, unknown actions and misplaced durations raise ValueError."""
+    with pytest.raises(ValueError):
+        compile_sequence([step])
+
+
+async def test_frames_play_on_schedule() -> None:
+    """Frames are sent at their offsets and a slow write does not shift later frames."""
+    loop = asyncio.get_running_loop()
+    sent: list[tuple[str, float]] = []
+    start = loop.time()
+
+    async def set_horn(on: bool, timeout: float | None = None) -> bool:
+        sent.append(("horn", loop.time() - start))
+        await asyncio.sleep(0.05)  # A slow write
+        return True
+
+    coordinator = MagicMock()
+    coordinator.async_set_horn = set_horn
+    coordinator.async_set_speed = AsyncMock(return_value=False)
+
+    report = await async_play_frames(coordinator, [
+        Frame(0.0, "horn", True),
+        Frame(0.1, "horn", False),
+        Frame(0.2, "speed", 10),
+    ])
+
+    assert sent[0][1] == pytest.approx(0.0, abs=0.03)
+    assert sent[1][1] == pytest.approx(0.1, abs=0.03)
+    assert report["frames"] == 3
+    assert report["failed_frames"] == 1
+    assert report["planned_s"] == 0.2
+    assert report["max_error_ms"] < 30
@@ -0,0 +1,93 @@
+"""End-to-end tests of the integration against the simulated locomotive."""
+import asyncio
+import os
+import sys
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lionel_controller.const import (
+    CONF_MAC_ADDRESS,
+    CONF_SERVICE_UUID,
+    DOMAIN,
+    LIONCHIEF_SERVICE_UUID,
+)
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks"))
+
+from simulator import SimulatedLocomotive, SimulationProfile, simulated_trains  # noqa: E402
+
+ADDRESS = "AA:BB:CC:DD:EE:01"
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    """Wait until predicate() is true."""
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def expected_lingering_timers() -> bool:
+    """Allow the mocked Bluetooth scanner's expiry timer to outlive a test."""
+    return True
+
+
+@pytest.fixture
+async def train(hass: HomeAssistant, enable_custom_integrations, enable_bluetooth):
+    """Set up a config entry connected to a simulated locomotive."""
+    loco = SimulatedLocomotive(ADDRESS, profile=SimulationProfile(connect_latency=0.01), seed=1)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=ADDRESS,
+        data={CONF_MAC_ADDRESS: ADDRESS, CONF_NAME: "LC-Sim", CONF_SERVICE_UUID: LIONCHIEF_SERVICE_UUID},
+    )
+    entry.add_to_hass(hass)
+    with simulated_trains(loco):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        await _wait_for(lambda: coordinator.connected)
+        await hass.async_block_till_done()
+        yield loco, coordinator
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_speed_reaches_the_locomotive(hass: HomeAssistant, train) -> None:
+    """A throttle change is written to the train and confirmed by its status notification."""
+    loco, coordinator = train
+
+    assert await coordinator.async_set_speed(50)
+    await _wait_for(lambda: loco.notifications_sent > 0)
+
+    assert loco.speed == int(50 / 100 * 31)
+    assert coordinator.state.speed == int(loco.speed / 31 * 100)
+
+
+async def test_sequence_is_played_in_order(hass: HomeAssistant, train) -> None:
+    """A built-in horn pattern reaches the train as alternating on and off frames."""
+    loco, coordinator = train
+    await hass.services.async_call(
+        DOMAIN,
+        "run_sequence",
+        {"pattern": "proceed", "wait": True},
+        blocking=True,
+        return_response=True,
+    )
+
+    horn = [frame[2] for frame in loco.frames if frame[1] == 0x48]
+    assert horn == [1, 0, 1, 0]
+
+
+async def test_reconnects_after_link_loss(hass: HomeAssistant, train) -> None:
+    """A dropped link comes back and the next command goes through."""
+    loco, coordinator = train
+    loco.drop_link()
+    await _wait_for(lambda: not coordinator.connected)
+
+    assert await coordinator.async_set_lights(False)
+    assert coordinator.connected
+    assert loco.lights is False
+    assert loco.connections == 2